@@ -0,0 +1,4 @@
+"""
+Audio engine: timeline-based audio rendering.
+"""
+__version__ = "0.1.0"
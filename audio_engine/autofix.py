@@ -1,11 +1,14 @@
-from typing import Dict
-from pydub import AudioSegment
+from typing import Dict, Optional
 
+from audio_engine.exceptions import FileError
+from audio_engine.utils.metadata import MetadataProvider, get_metadata_provider
 
-def auto_fix_overlaps(track: Dict, min_gap: float = 0.0) -> None:
+
+def auto_fix_overlaps(track: Dict, min_gap: float = 0.0, metadata: Optional[MetadataProvider] = None) -> None:
     """
     Shifts overlapping clips forward on the same track.
     min_gap: optional silence (seconds) to keep between clips.
+    metadata: duration provider (header-only probing); defaults to the shared one.
     """
 
     clips = track.get("clips",[])
@@ -16,6 +19,9 @@ def auto_fix_overlaps(track: Dict, min_gap: float = 0.0) -> None:
 
     if len(clips) < 2:
         return
+
+    metadata = metadata or get_metadata_provider()
+    metadata.prefetch(c["file"] for c in clips if not c.get("loop") and c.get("file"))
     
     #sort by time
     clips.sort(key=lambda c:c["start"])
@@ -30,8 +36,10 @@ def auto_fix_overlaps(track: Dict, min_gap: float = 0.0) -> None:
             end = clip.get("loop_until", start)
         
         else:
-            audio = AudioSegment.from_file(clip["file"])
-            end = start + (len(audio) / 1000.0)
+            duration = metadata.duration(clip["file"])
+            if duration is None:
+                raise FileError(f"Cannot read duration of audio file: {clip['file']}")
+            end = start + duration
 
         # If overlap, shift this clip forward
 
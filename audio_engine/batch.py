@@ -0,0 +1,325 @@
+"""
+Batch rendering: many (timeline, output) jobs on one long-lived worker pool.
+
+Workers import the engine once and keep their renderer, decoded-asset cache
+and metadata cache across jobs. All workers share the durations the parent
+probed, one SharedAssetStore of decoded sources and one loudness analysis
+cache on disk. Jobs are admitted against a memory budget using a per-job
+estimate, so large full-memory renders do not overlap.
+"""
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from audio_engine.exceptions import FileError
+from audio_engine.utils.analysis_cache import DEFAULT_ANALYSIS_ENTRIES
+from audio_engine.utils.cache_dir import user_cache_dir
+from audio_engine.utils.logger import get_logger
+from audio_engine.utils.metadata import get_metadata_provider, timeline_audio_files
+
+logger = get_logger(__name__)
+
+DEFAULT_ASSET_CACHE_MB = 1024
+
+# Working copies held at once by a full-memory render, in project-length
+# buffers: canvas, the track being rendered, its clip overlays and master copies.
+_FULL_RENDER_BUFFERS = 4
+
+
+@dataclass
+class BatchJob:
+    index: int
+    timeline: str
+    output: str
+    streaming: bool = False
+    estimated_bytes: int = 0
+    force: bool = False
+    audio_files: List[str] = field(default_factory=list)
+
+
+@dataclass
+class JobResult:
+    index: int
+    timeline: str
+    output: str
+    ok: bool
+    elapsed_sec: float
+    error: Optional[str] = None
+    worker_pid: Optional[int] = None
+
+
+@dataclass
+class BatchReport:
+    results: List[JobResult] = field(default_factory=list)
+    elapsed_sec: float = 0.0
+
+    @property
+    def failures(self) -> List[JobResult]:
+        return [r for r in self.results if not r.ok]
+
+    def to_dict(self) -> Dict:
+        return {
+            "jobs": len(self.results),
+            "succeeded": len(self.results) - len(self.failures),
+            "failed": len(self.failures),
+            "elapsed_sec": round(self.elapsed_sec, 3),
+            "results": [asdict(r) for r in sorted(self.results, key=lambda r: r.index)],
+        }
+
+    def summary_lines(self) -> List[str]:
+        lines = [
+            f"Batch finished: {len(self.results) - len(self.failures)}/{len(self.results)} succeeded "
+            f"in {self.elapsed_sec:.1f}s"
+        ]
+        for r in sorted(self.results, key=lambda r: r.index):
+            status = "ok" if r.ok else f"FAILED: {r.error}"
+            lines.append(f"  [{r.index}] {r.timeline} -> {r.output} ({r.elapsed_sec:.1f}s) {status}")
+        return lines
+
+
+def estimate_job_memory(timeline: Dict) -> int:
+    """Rough peak bytes for rendering `timeline`, from its length and track count."""
+    settings = timeline.get("settings", {})
+    streaming = settings.get("streaming", {})
+    duration = float(timeline.get("project", {}).get("duration", 0.0))
+    sample_rate = int(streaming.get("sample_rate", 44100))
+    channels = int(streaming.get("channels", 2))
+    sample_width = int(streaming.get("sample_width", 2))
+    bytes_per_sec = sample_rate * channels * sample_width
+    num_tracks = len(timeline.get("tracks", []))
+
+    if streaming.get("enabled"):
+        # Chunk buffers per track, plus a full-file read for two-pass loudness
+        chunk_size = streaming.get("chunk_size_sec", 1.0)
+        # "auto" picks at most the largest calibration candidate
+        chunk_size = 4.0 if chunk_size == "auto" else float(chunk_size)
+        chunk_bytes = chunk_size * bytes_per_sec * max(1, num_tracks) * 4
+        loudness_bytes = duration * bytes_per_sec if settings.get("loudness", {}).get("enabled") else 0
+        return int(chunk_bytes + loudness_bytes)
+
+    return int(duration * bytes_per_sec * (num_tracks + _FULL_RENDER_BUFFERS))
+
+
+def default_memory_budget() -> int:
+    """Half of physical memory, or 4 GiB if it cannot be read."""
+    try:
+        return int(os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") * 0.5)
+    except (AttributeError, ValueError, OSError):
+        return 4 << 30
+
+
+def pick_next_job(
+    pending: Sequence[BatchJob],
+    running_bytes: int,
+    running_count: int,
+    memory_budget: int,
+) -> Optional[BatchJob]:
+    """
+    First pending job that fits next to the running ones. A job larger than
+    the whole budget is only started when nothing else is running.
+    """
+    for job in pending:
+        if running_count == 0 or running_bytes + job.estimated_bytes <= memory_budget:
+            return job
+    return None
+
+
+def load_manifest(path: str) -> Tuple[List[BatchJob], Dict]:
+    """
+    Read a batch manifest: either a list of {"timeline", "output"} entries or
+    {"jobs": [...], ...options}. Returns the jobs (with memory estimates) and
+    the options.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise FileError(f"Failed to load batch manifest {path}: {e}")
+
+    if isinstance(manifest, list):
+        entries, options = manifest, {}
+    else:
+        entries = manifest.get("jobs", [])
+        options = {k: v for k, v in manifest.items() if k != "jobs"}
+
+    jobs = []
+    for index, entry in enumerate(entries):
+        job = BatchJob(
+            index=index,
+            timeline=entry["timeline"],
+            output=entry["output"],
+            force=bool(entry.get("force", options.get("force", False))),
+        )
+        try:
+            with open(job.timeline, "r", encoding="utf-8") as f:
+                timeline = json.load(f)
+            job.streaming = bool(timeline.get("settings", {}).get("streaming", {}).get("enabled", False))
+            job.estimated_bytes = estimate_job_memory(timeline)
+            job.audio_files = list(timeline_audio_files(timeline))
+        except Exception as e:
+            # The job will fail again (and be reported) when it runs
+            logger.warning(f"Could not pre-read timeline {job.timeline}: {e}")
+        jobs.append(job)
+    return jobs, options
+
+
+# Per-worker state, kept across jobs
+_worker_renderer = None
+
+
+def warm_durations(jobs: Sequence[BatchJob]) -> Dict[str, Optional[float]]:
+    """Probe every job's audio files once, in this process, for the workers to seed from."""
+    provider = get_metadata_provider()
+    paths = [path for job in jobs for path in job.audio_files]
+    provider.prefetch(paths)
+    return {path: provider.duration(path) for path in paths}
+
+
+def _init_worker(
+    asset_cache_bytes: int,
+    asset_store_cfg: Optional[Dict],
+    analysis_dir: Optional[str],
+    durations: Dict[str, Optional[float]],
+) -> None:
+    global _worker_renderer
+    from audio_engine.renderer import TimelineRenderer
+    from audio_engine.streaming.asset_store import get_asset_store
+    from audio_engine.utils.analysis_cache import configure_analysis_cache
+    from audio_engine.utils.asset_cache import configure_asset_cache
+
+    # Passed explicitly: spawn and forkserver workers do not inherit the parent's caches
+    get_metadata_provider().seed(durations)
+    configure_asset_cache(asset_cache_bytes, get_asset_store(asset_store_cfg))
+    configure_analysis_cache(DEFAULT_ANALYSIS_ENTRIES, analysis_dir)
+    _worker_renderer = TimelineRenderer()
+
+
+def _run_job(job: BatchJob) -> JobResult:
+    start = time.time()
+    try:
+        if job.streaming:
+            _worker_renderer.render_streaming(job.timeline, job.output, force=job.force)
+        else:
+            _worker_renderer.render(job.timeline, job.output, force=job.force)
+        error = None
+    except Exception as e:
+        logger.debug(traceback.format_exc())
+        error = f"{type(e).__name__}: {e}"
+    return JobResult(
+        index=job.index,
+        timeline=job.timeline,
+        output=job.output,
+        ok=error is None,
+        elapsed_sec=time.time() - start,
+        error=error,
+        worker_pid=os.getpid(),
+    )
+
+
+class BatchRenderer:
+    """Schedules render jobs on a process pool under a memory budget."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        memory_budget_bytes: Optional[int] = None,
+        asset_cache_bytes: int = DEFAULT_ASSET_CACHE_MB << 20,
+        asset_store: Optional[Dict] = None,
+        analysis_dir: Optional[str] = None,
+    ):
+        """
+        `asset_store` is a settings["streaming"]["asset_store"] block for the
+        workers' shared decodes (default: enabled in the user cache
+        directory); `analysis_dir` holds shared loudness measurements
+        (default: the user cache directory).
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.memory_budget = memory_budget_bytes or default_memory_budget()
+        self.asset_cache_bytes = asset_cache_bytes
+        self.asset_store = asset_store if asset_store is not None else {"enabled": True}
+        self.analysis_dir = analysis_dir or user_cache_dir("analysis")
+
+    def run(self, jobs: Sequence[BatchJob]) -> BatchReport:
+        report = BatchReport()
+        start = time.time()
+        pending = list(jobs)
+        running: Dict[Future, BatchJob] = {}
+
+        logger.info(
+            f"Batch: {len(pending)} jobs, {self.max_workers} workers, "
+            f"{self.memory_budget / (1 << 30):.1f} GiB memory budget"
+        )
+
+        durations = warm_durations(pending)
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.asset_cache_bytes, self.asset_store, self.analysis_dir, durations),
+        ) as executor:
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    running_bytes = sum(j.estimated_bytes for j in running.values())
+                    job = pick_next_job(pending, running_bytes, len(running), self.memory_budget)
+                    if job is None:
+                        break
+                    pending.remove(job)
+                    running[executor.submit(_run_job, job)] = job
+                    logger.debug(f"Started job {job.index} (~{job.estimated_bytes / (1 << 20):.0f} MB)")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Worker process died (e.g. killed for memory)
+                        result = JobResult(job.index, job.timeline, job.output, False, 0.0, f"{type(e).__name__}: {e}")
+                    report.results.append(result)
+                    if result.ok:
+                        logger.info(f"Job {job.index} done in {result.elapsed_sec:.1f}s: {job.output}")
+                    else:
+                        logger.error(f"Job {job.index} failed: {result.error}")
+
+        report.elapsed_sec = time.time() - start
+        return report
+
+
+def render_batch(manifest_path: str, report_path: Optional[str] = None, force: bool = False) -> BatchReport:
+    """
+    Render every job in a manifest and write a JSON report.
+
+    Manifest options: max_workers, memory_budget_mb, asset_cache_mb,
+    asset_store, analysis_dir, report, force. Jobs whose outputs are up to date are skipped unless `force` is
+    set (here, in the manifest options or on the job).
+    """
+    jobs, options = load_manifest(manifest_path)
+    if force:
+        for job in jobs:
+            job.force = True
+    memory_budget_mb = options.get("memory_budget_mb")
+    renderer = BatchRenderer(
+        max_workers=options.get("max_workers"),
+        memory_budget_bytes=int(memory_budget_mb) << 20 if memory_budget_mb else None,
+        asset_cache_bytes=int(options.get("asset_cache_mb", DEFAULT_ASSET_CACHE_MB)) << 20,
+        asset_store=options.get("asset_store"),
+        analysis_dir=options.get("analysis_dir"),
+    )
+    report = renderer.run(jobs)
+
+    for line in report.summary_lines():
+        logger.info(line)
+
+    report_path = report_path or options.get("report")
+    if report_path:
+        report_dir = os.path.dirname(report_path)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        logger.info(f"Batch report written to {report_path}")
+
+    return report
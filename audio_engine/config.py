@@ -2,7 +2,7 @@
 Configuration dataclass for render settings.
 """
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 @dataclass
@@ -18,10 +18,28 @@ class RenderConfig:
     streaming_enabled: bool = False
     chunk_size_sec: float = 1.0
     streaming_max_workers: int = 4
+    streaming_auto_chunk_size: bool = False
+    streaming_auto_workers: bool = False
+    streaming_auto_memory_mb: float = 512.0
+    streaming_calibration_sec: float = 8.0
     streaming_two_pass_lufs: bool = True
     streaming_sample_rate: int = 44100
     streaming_channels: int = 2
     streaming_sample_width: int = 2
+    streaming_pipeline: bool = True
+    streaming_shards: int = 1
+    streaming_shard_warmup_sec: float = 5.0
+    streaming_asset_store: Optional[Dict[str, Any]] = None
+    streaming_chunk_cache: Optional[Dict[str, Any]] = None
+    streaming_incremental: bool = False
+    streaming_state_tail_sec: float = 5.0
+    clip_cache: Optional[Dict[str, Any]] = None
+    track_freeze: Optional[Dict[str, Any]] = None
+    plan_cache: Optional[Dict[str, Any]] = None
+    stem_export: Optional[Dict[str, Any]] = None
+    outputs: Optional[List[Dict[str, Any]]] = None
+    parallel_tracks_enabled: bool = False
+    parallel_track_workers: Optional[int] = None
     
     @classmethod
     def from_timeline_settings(cls, settings: Dict[str, Any]) -> 'RenderConfig':
@@ -29,6 +47,18 @@ class RenderConfig:
         loudness_cfg = settings.get("loudness", {})
         fade_cfg = settings.get("master_fade_out", {})
         streaming_cfg = settings.get("streaming", {})
+        parallel_cfg = settings.get("parallel_tracks", {})
+        clip_cache_cfg = settings.get("clip_cache", {})
+        freeze_cfg = settings.get("track_freeze", {})
+        plan_cache_cfg = settings.get("plan_cache", {})
+        stem_export_cfg = settings.get("stem_export", {})
+        asset_store_cfg = streaming_cfg.get("asset_store", {})
+        chunk_cache_cfg = streaming_cfg.get("chunk_cache", {})
+        chunk_size = streaming_cfg.get("chunk_size_sec", 1.0)
+        max_workers = streaming_cfg.get("max_workers", 4)
+        incremental_cfg = streaming_cfg.get("incremental", {})
+        if isinstance(incremental_cfg, bool):
+            incremental_cfg = {"enabled": incremental_cfg}
         
         return cls(
             target_lufs=loudness_cfg.get("target_lufs", -20.0) if loudness_cfg.get("enabled") else -20.0,
@@ -39,10 +69,28 @@ class RenderConfig:
             loudness=loudness_cfg if loudness_cfg.get("enabled") else None,
             default_silence=settings.get("default_silence", 0.0),
             streaming_enabled=bool(streaming_cfg.get("enabled", False)),
-            chunk_size_sec=float(streaming_cfg.get("chunk_size_sec", 1.0)),
-            streaming_max_workers=int(streaming_cfg.get("max_workers", 4)),
+            chunk_size_sec=1.0 if chunk_size == "auto" else float(chunk_size),
+            streaming_max_workers=4 if max_workers == "auto" else int(max_workers),
+            streaming_auto_chunk_size=chunk_size == "auto",
+            streaming_auto_workers=max_workers == "auto",
+            streaming_auto_memory_mb=float(streaming_cfg.get("auto_memory_mb", 512)),
+            streaming_calibration_sec=float(streaming_cfg.get("calibration_sec", 8.0)),
             streaming_two_pass_lufs=bool(streaming_cfg.get("two_pass_lufs", True)),
             streaming_sample_rate=int(streaming_cfg.get("sample_rate", 44100)),
             streaming_channels=int(streaming_cfg.get("channels", 2)),
             streaming_sample_width=int(streaming_cfg.get("sample_width", 2)),
+            streaming_pipeline=bool(streaming_cfg.get("pipeline", True)),
+            streaming_shards=int(streaming_cfg.get("shards", 1)),
+            streaming_shard_warmup_sec=float(streaming_cfg.get("shard_warmup_sec", 5.0)),
+            streaming_asset_store=asset_store_cfg if asset_store_cfg.get("enabled") else None,
+            streaming_chunk_cache=chunk_cache_cfg if chunk_cache_cfg.get("enabled") else None,
+            streaming_incremental=bool(incremental_cfg.get("enabled", False)),
+            streaming_state_tail_sec=float(incremental_cfg.get("state_tail_sec", 5.0)),
+            clip_cache=clip_cache_cfg if clip_cache_cfg.get("enabled") else None,
+            track_freeze=freeze_cfg or None,
+            plan_cache=plan_cache_cfg if plan_cache_cfg.get("enabled") else None,
+            stem_export=stem_export_cfg if stem_export_cfg.get("enabled") else None,
+            outputs=list(settings.get("outputs") or []) or None,
+            parallel_tracks_enabled=bool(parallel_cfg.get("enabled", False)),
+            parallel_track_workers=parallel_cfg.get("max_workers"),
         )
@@ -0,0 +1,507 @@
+"""
+Local render daemon: a warm engine process that takes jobs over HTTP.
+
+Imports, the metadata cache and the decoded-asset cache stay warm across
+jobs, so short renders skip the 2-4 s interpreter and probe start-up. The
+server speaks a small JSON-over-HTTP/1.1 protocol on a Unix socket (e.g.
+`curl --unix-socket`, created 0o600) or on localhost TCP:
+
+    POST   /jobs               {"timeline": ..., "output": ..., "streaming": bool?}
+    GET    /jobs               all jobs
+    GET    /jobs/<id>          job status
+    GET    /jobs/<id>/events   progress events as NDJSON until the job ends
+    DELETE /jobs/<id>          cancel
+    GET    /health
+
+A job keeps its latest progress event and a capped event history, and
+finished jobs are dropped after a TTL or once too many have piled up, so a
+long-running daemon does not grow without bound.
+
+Any local process, and any web page the user opens, can reach a localhost
+port. Requests that carry an Origin header (browsers always send one on
+cross-origin requests) are refused, bodies must be declared
+application/json (which a page cannot send without a CORS preflight) and
+are capped at MAX_REQUEST_BYTES.
+"""
+import asyncio
+import collections
+import itertools
+import json
+import os
+import socket
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from audio_engine.exceptions import FileError, RenderCancelled
+from audio_engine.utils.cache_dir import ensure_private_dir, user_cache_dir
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DAEMON_WORKERS = 2
+DEFAULT_MAX_QUEUED = 256
+DEFAULT_EVENT_HISTORY = 256
+DEFAULT_FINISHED_JOB_TTL_SEC = 3600.0
+DEFAULT_MAX_FINISHED_JOBS = 1000
+MAX_REQUEST_BYTES = 64 << 10
+MAX_REQUEST_HEADERS = 100
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+_TERMINAL = {DONE, FAILED, CANCELLED}
+
+_HTTP_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    503: "Service Unavailable",
+}
+
+
+class RequestRejected(Exception):
+    """A request refused before routing, answered with `status`."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def default_socket_path() -> str:
+    """Per-user socket path, in a directory only the current user can enter."""
+    return os.path.join(ensure_private_dir(user_cache_dir("daemon")), "render.sock")
+
+
+class RenderJob:
+    """A submitted render, its latest progress and a capped event history."""
+
+    def __init__(
+        self,
+        job_id: str,
+        timeline: str,
+        output: str,
+        streaming: bool,
+        max_events: int = DEFAULT_EVENT_HISTORY,
+    ):
+        self.id = job_id
+        self.timeline = timeline
+        self.output = output
+        self.streaming = streaming
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: Deque[Dict] = collections.deque(maxlen=max(1, max_events))
+        # Events ever published; the oldest kept one is number published - len(events)
+        self.published = 0
+        self.progress: Optional[Dict] = None
+        self.cancel_requested = threading.Event()
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event: Dict) -> None:
+        """Record an event and wake any listeners (event-loop thread only)."""
+        self.events.append(event)
+        self.published += 1
+        if event.get("event") == "progress":
+            self.progress = event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def set_status(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        now = time.time()
+        if status == RUNNING:
+            self.started_at = now
+        elif status in _TERMINAL:
+            self.finished_at = now
+        self.publish({"event": "status", "status": status, "error": error})
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _TERMINAL
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "timeline": self.timeline,
+            "output": self.output,
+            "streaming": self.streaming,
+            "status": self.status,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+        }
+
+
+def _timeline_wants_streaming(timeline_path: str) -> bool:
+    try:
+        with open(timeline_path, "r", encoding="utf-8") as f:
+            timeline = json.load(f)
+        return bool(timeline.get("settings", {}).get("streaming", {}).get("enabled", False))
+    except Exception:
+        # Let the render itself report an unreadable timeline
+        return False
+
+
+class RenderDaemon:
+    """Async job API over a bounded pool of render threads."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_DAEMON_WORKERS,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        max_events: int = DEFAULT_EVENT_HISTORY,
+        finished_job_ttl_sec: float = DEFAULT_FINISHED_JOB_TTL_SEC,
+        max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max_queued
+        self.max_events = max_events
+        self.finished_job_ttl_sec = finished_job_ttl_sec
+        self.max_finished_jobs = max(0, max_finished_jobs)
+        # Insertion order is submission order, which prune relies on
+        self.jobs: Dict[str, RenderJob] = {}
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="render")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._servers: List[asyncio.AbstractServer] = []
+
+    # -- job API ----------------------------------------------------------
+
+    def submit(self, timeline: str, output: str, streaming: Optional[bool] = None) -> RenderJob:
+        """Queue a render and return its job. Must be called on the event loop."""
+        self.prune()
+        active = sum(1 for job in self.jobs.values() if not job.finished)
+        if active >= self.max_queued:
+            raise RuntimeError(f"Render queue is full ({self.max_queued} jobs)")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        if streaming is None:
+            streaming = _timeline_wants_streaming(timeline)
+        job = RenderJob(f"job-{next(self._ids)}", timeline, output, bool(streaming), self.max_events)
+        self.jobs[job.id] = job
+        job.publish({"event": "status", "status": QUEUED, "error": None})
+        job.task = asyncio.get_running_loop().create_task(self._execute(job))
+        logger.info(f"Queued {job.id}: {timeline} -> {output}")
+        return job
+
+    def cancel(self, job_id: str) -> Optional[RenderJob]:
+        """Cancel a queued job outright, or ask a running one to stop at its next chunk."""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested.set()
+        if job.status == QUEUED:
+            # A task cancelled before it first runs never reaches its handlers
+            job.set_status(CANCELLED)
+            if job.task is not None:
+                job.task.cancel()
+        return job
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        return self.jobs.get(job_id)
+
+    def prune(self, now: Optional[float] = None) -> List[str]:
+        """Drop finished jobs older than the TTL, then the oldest beyond max_finished_jobs."""
+        now = time.time() if now is None else now
+        finished = [job for job in self.jobs.values() if job.finished]
+        expired = [job for job in finished if now - job.finished_at >= self.finished_job_ttl_sec]
+        kept = [job for job in finished if job not in expired]
+        expired += kept[:max(0, len(kept) - self.max_finished_jobs)]
+        for job in expired:
+            del self.jobs[job.id]
+        if expired:
+            logger.debug(f"Pruned {len(expired)} finished jobs")
+        return [job.id for job in expired]
+
+    async def wait(self, job_id: str) -> Optional[RenderJob]:
+        job = self.jobs.get(job_id)
+        if job is not None and job.task is not None:
+            await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict]:
+        """
+        Replay a job's kept events, then follow new ones until it finishes.
+        A listener that falls further behind than the history skips ahead.
+        """
+        job = self.jobs[job_id]
+        sent = 0
+        while True:
+            changed = job._changed
+            oldest = job.published - len(job.events)
+            sent = max(sent, oldest)
+            for event in list(job.events)[sent - oldest:]:
+                yield event
+                sent += 1
+            if job.finished and sent >= job.published:
+                return
+            await changed.wait()
+
+    async def _execute(self, job: RenderJob) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._slots:
+                if job.cancel_requested.is_set():
+                    raise asyncio.CancelledError()
+                job.set_status(RUNNING)
+                await loop.run_in_executor(self._executor, self._render, job, loop)
+        except asyncio.CancelledError:
+            if not job.finished:
+                job.set_status(CANCELLED)
+        except RenderCancelled:
+            job.set_status(CANCELLED)
+        except Exception as e:
+            logger.error(f"{job.id} failed: {e}")
+            job.set_status(FAILED, f"{type(e).__name__}: {e}")
+        else:
+            job.set_status(DONE)
+            logger.info(f"{job.id} finished in {job.finished_at - job.started_at:.2f}s")
+        self.prune()
+
+    @staticmethod
+    def _render(job: RenderJob, loop: asyncio.AbstractEventLoop) -> None:
+        from audio_engine.renderer import TimelineRenderer
+
+        def progress(event: Dict) -> None:
+            if job.cancel_requested.is_set():
+                raise RenderCancelled(f"{job.id} cancelled")
+            loop.call_soon_threadsafe(job.publish, dict(event, event="progress"))
+
+        renderer = TimelineRenderer()
+        if job.streaming:
+            renderer.render_streaming(job.timeline, job.output, progress=progress)
+        else:
+            renderer.render(job.timeline, job.output, progress=progress)
+        if job.cancel_requested.is_set():
+            raise RenderCancelled(f"{job.id} cancelled")
+
+    # -- HTTP -------------------------------------------------------------
+
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        self._servers.append(server)
+        logger.info(f"Render daemon listening on http://{host}:{server.sockets[0].getsockname()[1]}")
+        return server
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        Listen on a Unix socket only the current user can connect to. A stale
+        socket left by a dead daemon is replaced; anything else at `path`
+        (a live daemon, a regular file) raises FileError.
+        """
+        _remove_stale_socket(path)
+        # Bind 0o600 from the start so there is no window before the chmod
+        previous_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle_connection, path)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(path, 0o600)
+        self._servers.append(server)
+        logger.info(f"Render daemon listening on unix:{path}")
+        return server
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+        pending = [job.task for job in self.jobs.values() if job.task is not None]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, path, body = await _read_request(reader)
+            await self._route(method, path, body, writer)
+        except RequestRejected as e:
+            await _send_json(writer, e.status, {"error": str(e)})
+        except (ValueError, json.JSONDecodeError) as e:
+            await _send_json(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+
+        if parts == ["health"]:
+            await _send_json(writer, 200, {"status": "ok", "jobs": len(self.jobs)})
+            return
+
+        if not parts or parts[0] != "jobs":
+            await _send_json(writer, 404, {"error": f"Unknown path {path}"})
+            return
+
+        if len(parts) == 1:
+            if method == "GET":
+                await _send_json(writer, 200, [job.to_dict() for job in self.jobs.values()])
+            elif method == "POST":
+                payload = json.loads(body or b"{}")
+                if "timeline" not in payload or "output" not in payload:
+                    raise ValueError("'timeline' and 'output' are required")
+                try:
+                    job = self.submit(payload["timeline"], payload["output"], payload.get("streaming"))
+                except RuntimeError as e:
+                    await _send_json(writer, 503, {"error": str(e)})
+                    return
+                await _send_json(writer, 202, job.to_dict())
+            else:
+                await _send_json(writer, 405, {"error": f"{method} not allowed"})
+            return
+
+        job = self.jobs.get(parts[1])
+        if job is None:
+            await _send_json(writer, 404, {"error": f"Unknown job {parts[1]}"})
+            return
+
+        if len(parts) == 3 and parts[2] == "events" and method == "GET":
+            writer.write(_status_line(200, "application/x-ndjson"))
+            await writer.drain()
+            async for event in self.events(job.id):
+                writer.write(json.dumps(event).encode() + b"\n")
+                await writer.drain()
+        elif len(parts) == 2 and method == "GET":
+            await _send_json(writer, 200, job.to_dict())
+        elif len(parts) == 2 and method == "DELETE":
+            self.cancel(job.id)
+            await _send_json(writer, 200, job.to_dict())
+        else:
+            await _send_json(writer, 405, {"error": f"{method} not allowed"})
+
+
+def _remove_stale_socket(path: str) -> None:
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode):
+        raise FileError(f"Refusing to replace {path}: it is not a socket")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Nobody is listening: left behind by a daemon that did not shut down
+        os.remove(path)
+        return
+    finally:
+        probe.close()
+    raise FileError(f"Another render daemon is listening on {path}")
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """
+    Read one request. Raises RequestRejected for cross-origin requests,
+    bodies that are not declared JSON and bodies over MAX_REQUEST_BYTES.
+    """
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise ConnectionError("Empty request")
+    try:
+        method, path, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise ValueError(f"Malformed request line: {request_line!r}")
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        if len(headers) >= MAX_REQUEST_HEADERS:
+            raise RequestRejected(400, "Too many headers")
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "origin" in headers:
+        raise RequestRejected(403, "Cross-origin requests are not allowed")
+
+    try:
+        content_length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise ValueError(f"Malformed Content-Length: {headers['content-length']!r}")
+    if content_length < 0:
+        raise ValueError(f"Malformed Content-Length: {content_length}")
+    if content_length > MAX_REQUEST_BYTES:
+        raise RequestRejected(413, f"Request body over {MAX_REQUEST_BYTES} bytes")
+
+    if content_length or method.upper() in ("POST", "PUT", "PATCH"):
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        if content_type != "application/json":
+            raise RequestRejected(415, "Content-Type must be application/json")
+
+    body = await reader.readexactly(content_length) if content_length else b""
+    return method.upper(), path, body
+
+
+def _status_line(status: int, content_type: str, length: Optional[int] = None) -> bytes:
+    headers = [
+        f"HTTP/1.1 {status} {_HTTP_REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        "Connection: close",
+    ]
+    if length is not None:
+        headers.append(f"Content-Length: {length}")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload) -> None:
+    body = json.dumps(payload).encode()
+    writer.write(_status_line(status, "application/json", len(body)) + body)
+    await writer.drain()
+
+
+async def run_daemon(
+    host: str = "127.0.0.1",
+    port: Optional[int] = None,
+    socket_path: Optional[str] = None,
+    max_workers: int = DEFAULT_DAEMON_WORKERS,
+    asset_cache_mb: int = 1024,
+    finished_job_ttl_sec: float = DEFAULT_FINISHED_JOB_TTL_SEC,
+    max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS,
+) -> None:
+    """
+    Serve until cancelled (Ctrl+C): on `socket_path` (default: a per-user
+    socket) and, only if `port` is given, on TCP as well.
+    """
+    from audio_engine.utils.asset_cache import configure_asset_cache
+    import audio_engine.renderer  # noqa: F401  warm the import graph before the first job
+
+    configure_asset_cache(asset_cache_mb << 20)
+    daemon = RenderDaemon(
+        max_workers=max_workers,
+        finished_job_ttl_sec=finished_job_ttl_sec,
+        max_finished_jobs=max_finished_jobs,
+    )
+    await daemon.serve_unix(socket_path or default_socket_path())
+    if port is not None:
+        await daemon.serve_tcp(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await daemon.close()
@@ -1,6 +1,14 @@
+import json
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
 from pydub import AudioSegment
 
-from audio_engine.utils.ranges import merge_ranges
+from audio_engine.dsp.eq import _numpy_to_audiosegment
+from audio_engine.dsp.loudness import audiosegment_to_float
+from audio_engine.utils.ranges import Range, RangeIndex, merge_ranges
 
 
 def apply_envelope_ducking(audio: AudioSegment, clip_start_sec: float, dialogue_ranges, cfg: dict) -> AudioSegment:
@@ -55,3 +63,183 @@ def apply_envelope_ducking(audio: AudioSegment, clip_start_sec: float, dialogue_
             )
 
     return output
+
+
+
+@dataclass(frozen=True)
+class CompiledDuckRule:
+    """A ducking rule with its `sfx:` targets parsed and its trigger ranges merged."""
+    index: int
+    when: str
+    duck_roles: FrozenSet[str]
+    duck_semantic_roles: FrozenSet[str]
+    ranges: RangeIndex
+
+    def targets(self, track_role: Optional[str], semantic_role: Optional[str]) -> bool:
+        if track_role in self.duck_roles:
+            return True
+        return track_role == "sfx" and semantic_role in self.duck_semantic_roles
+
+
+class DuckingPlan:
+    """
+    Ducking for one ducking config: rules compiled once, gain curves computed
+    once per (rule, window) and shared by every clip that falls in that window.
+
+    The curve matches apply_envelope_ducking: for each merged trigger range,
+    a linear fade to silence over fade_down_ms before the (onset-delayed)
+    start, duck_amount during the range, and a linear fade back up over
+    fade_up_ms after it. Overlapping contributions multiply.
+    """
+
+    def __init__(self, cfg: Dict, range_index_for: Callable[[str, int], Optional[RangeIndex]]):
+        self.mode = cfg.get("mode")
+        self.duck_db = float(cfg.get("duck_amount", 0.0))
+        self.fade_down_sec = float(cfg.get("fade_down_ms", 0)) / 1000.0
+        self.fade_up_sec = float(cfg.get("fade_up_ms", 0)) / 1000.0
+        self.delay_sec = float(cfg.get("onset_delay_ms", 0)) / 1000.0
+        min_pause = cfg.get("min_pause_ms", 0)
+
+        self.rules: List[CompiledDuckRule] = []
+        for index, rule in enumerate(cfg.get("rules", [])):
+            when_role = rule["when"]
+            ranges = range_index_for(when_role, min_pause)
+            if ranges is None:
+                continue
+
+            duck_targets = rule.get("duck", [])
+            self.rules.append(CompiledDuckRule(
+                index=index,
+                when=when_role,
+                duck_roles=frozenset(t for t in duck_targets if not t.startswith("sfx:")),
+                duck_semantic_roles=frozenset(t.split(":", 1)[1] for t in duck_targets if t.startswith("sfx:")),
+                ranges=ranges,
+            ))
+
+        self._curves: Dict[int, Tuple[Tuple[float, float, int], np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def rules_for(self, track_role: Optional[str], semantic_role: Optional[str]) -> List[CompiledDuckRule]:
+        return [rule for rule in self.rules if rule.targets(track_role, semantic_role)]
+
+    def gain_curve(
+        self,
+        rule: CompiledDuckRule,
+        window_start: float,
+        window_end: float,
+        sample_rate: int,
+    ) -> np.ndarray:
+        """
+        Per-sample linear gain for [window_start, window_end). The most recent
+        window is cached per rule, so every clip slice in a chunk reuses it.
+        """
+        key = (window_start, window_end, sample_rate)
+        with self._lock:
+            cached = self._curves.get(rule.index)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        num_samples = max(0, int(round((window_end - window_start) * sample_rate)))
+        gain = np.ones(num_samples, dtype=np.float32)
+        duck_lin = float(10 ** (self.duck_db / 20.0))
+
+        def index_of(t: float) -> int:
+            return min(num_samples, max(0, int(round((t - window_start) * sample_rate))))
+
+        def times(lo: int, hi: int) -> np.ndarray:
+            return window_start + np.arange(lo, hi, dtype=np.float64) / sample_rate
+
+        # Ranges whose fade-down lead-in or fade-up tail reaches the window
+        lo_index, hi_index = rule.ranges.overlapping_slice(
+            window_start - self.fade_up_sec,
+            window_end + self.fade_down_sec,
+        )
+        for i in range(lo_index, hi_index):
+            start = rule.ranges.starts[i] + self.delay_sec
+            end = rule.ranges.ends[i]
+            if start - self.fade_down_sec >= window_end:
+                break
+            if start >= end:
+                continue
+
+            lo, hi = index_of(start - self.fade_down_sec), index_of(start)
+            if hi > lo and self.fade_down_sec > 0:
+                gain[lo:hi] *= np.clip((start - times(lo, hi)) / self.fade_down_sec, 0.0, 1.0)
+
+            lo, hi = index_of(start), index_of(end)
+            gain[lo:hi] *= duck_lin
+
+            lo, hi = index_of(end), index_of(end + self.fade_up_sec)
+            if hi > lo and self.fade_up_sec > 0:
+                gain[lo:hi] *= np.clip((times(lo, hi) - end) / self.fade_up_sec, 0.0, 1.0)
+
+        with self._lock:
+            self._curves[rule.index] = (key, gain)
+        return gain
+
+
+class DuckingPlanner:
+    """
+    Builds DuckingPlans from the role ranges of one render. Plans are cached
+    per distinct ducking config, so scene overrides each compile once.
+    """
+
+    def __init__(self, role_ranges: Dict[str, List[Range]]):
+        self.role_ranges = role_ranges
+        self._plans: Dict[str, DuckingPlan] = {}
+        self._indexes: Dict[Tuple[str, int], RangeIndex] = {}
+        self._lock = threading.Lock()
+
+    def range_index(self, role: str, min_pause_ms: int = 0) -> Optional[RangeIndex]:
+        """Merged index of a role's ranges, shared by every plan that uses it."""
+        if role not in self.role_ranges:
+            return None
+        key = (role, min_pause_ms)
+        index = self._indexes.get(key)
+        if index is None:
+            index = RangeIndex(self.role_ranges[role], min_pause_ms)
+            self._indexes[key] = index
+        return index
+
+    @staticmethod
+    def _config_key(cfg: Dict) -> str:
+        return json.dumps(cfg, sort_keys=True, default=str)
+
+    def plan_for(self, cfg: Dict) -> DuckingPlan:
+        key = self._config_key(cfg)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                plan = DuckingPlan(cfg, self.range_index)
+                self._plans[key] = plan
+        return plan
+
+
+def apply_gain_curve_to_segment(
+    audio: AudioSegment,
+    gain: np.ndarray,
+    offset_samples: int = 0,
+) -> AudioSegment:
+    """
+    Multiply audio by gain[offset_samples:offset_samples + len(audio)].
+    Samples beyond the end of the curve are left at unity.
+    """
+    samples = audiosegment_to_float(audio)
+    lo = max(0, offset_samples)
+    hi = min(gain.shape[0], offset_samples + samples.shape[0])
+    if hi <= lo:
+        return audio
+
+    segment_gain = gain[lo:hi]
+    dst = slice(lo - offset_samples, hi - offset_samples)
+    if samples.ndim > 1:
+        samples[dst] *= segment_gain[:, np.newaxis]
+    else:
+        samples[dst] *= segment_gain
+
+    return _numpy_to_audiosegment(
+        samples,
+        sample_rate=audio.frame_rate,
+        sample_width=audio.sample_width,
+        channels=audio.channels,
+    )
@@ -37,6 +37,7 @@ from audio_engine.dsp.eq_presets import (
     get_preset_for_role,
     get_tilt_config,
 )
+from audio_engine.dsp.streaming_eq import SceneTonalShaper, shelf_coefficients
 
 logger = get_logger(__name__)
 
@@ -344,35 +345,7 @@ def apply_shelf(
     
     # Design shelving filter using biquad coefficients
     # Based on Audio EQ Cookbook
-    A = 10 ** (gain_db / 40)
-    omega = 2 * np.pi * freq_hz / sample_rate
-    sin_omega = np.sin(omega)
-    cos_omega = np.cos(omega)
-    
-    # Use a moderate slope (S = 1)
-    S = 1.0
-    alpha = sin_omega / 2 * np.sqrt((A + 1/A) * (1/S - 1) + 2)
-    
-    if shelf_type == "low":
-        # Low shelf
-        b0 = A * ((A + 1) - (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha)
-        b1 = 2 * A * ((A - 1) - (A + 1) * cos_omega)
-        b2 = A * ((A + 1) - (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha)
-        a0 = (A + 1) + (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha
-        a1 = -2 * ((A - 1) + (A + 1) * cos_omega)
-        a2 = (A + 1) + (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha
-    else:
-        # High shelf
-        b0 = A * ((A + 1) + (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha)
-        b1 = -2 * A * ((A - 1) + (A + 1) * cos_omega)
-        b2 = A * ((A + 1) + (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha)
-        a0 = (A + 1) - (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha
-        a1 = 2 * ((A - 1) - (A + 1) * cos_omega)
-        a2 = (A + 1) - (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha
-    
-    # Normalize coefficients
-    b = np.array([b0/a0, b1/a0, b2/a0])
-    a = np.array([1.0, a1/a0, a2/a0])
+    b, a = shelf_coefficients(freq_hz, gain_db, sample_rate, shelf_type)
     
     # Apply filter
     if samples.ndim == 1:
@@ -477,56 +450,14 @@ def apply_scene_tonal_shaping(audio: AudioSegment, scene_eq: Dict[str, Any]) ->
     if not scene_eq:
         return audio
     
-    result = audio
-    
-    # Apply tilt preset
-    if "tilt" in scene_eq:
-        try:
-            tilt_config = get_tilt_config(scene_eq["tilt"])
-            
-            # Apply low shelf from tilt
-            if "low_shelf_gain" in tilt_config and tilt_config["low_shelf_gain"] != 0:
-                result = apply_shelf(
-                    result,
-                    freq_hz=tilt_config.get("low_shelf_freq", 200),
-                    gain_db=tilt_config["low_shelf_gain"],
-                    shelf_type="low"
-                )
-            
-            # Apply high shelf from tilt
-            if "high_shelf_gain" in tilt_config and tilt_config["high_shelf_gain"] != 0:
-                result = apply_shelf(
-                    result,
-                    freq_hz=tilt_config.get("high_shelf_freq", 4000),
-                    gain_db=tilt_config["high_shelf_gain"],
-                    shelf_type="high"
-                )
-            
-            logger.debug(f"Applied tilt preset '{scene_eq['tilt']}'")
-            
-        except ValueError as e:
-            logger.warning(f"Failed to apply tilt preset: {e}")
-    
-    # Apply explicit high shelf override
-    if "high_shelf" in scene_eq and scene_eq["high_shelf"] != 0:
-        result = apply_shelf(
-            result,
-            freq_hz=4000,  # Fixed corner frequency for scene-level
-            gain_db=scene_eq["high_shelf"],
-            shelf_type="high"
-        )
-        logger.debug(f"Applied scene high shelf: {scene_eq['high_shelf']} dB")
-    
-    # Apply explicit low shelf override
-    if "low_shelf" in scene_eq and scene_eq["low_shelf"] != 0:
-        result = apply_shelf(
-            result,
-            freq_hz=200,  # Fixed corner frequency for scene-level
-            gain_db=scene_eq["low_shelf"],
-            shelf_type="low"
-        )
-        logger.debug(f"Applied scene low shelf: {scene_eq['low_shelf']} dB")
+    # Tilt and shelves are compiled into one SOS cascade and run over the
+    # audio in blocks, so the full signal is never held as float at once.
+    shaper = SceneTonalShaper(scene_eq, audio.frame_rate)
+    if not shaper.is_active:
+        return audio
     
+    result = shaper.process_segment(audio)
+    logger.debug(f"Applied scene tonal shaping: {scene_eq} ({shaper.sos.shape[0]} sections)")
     return result
 
 
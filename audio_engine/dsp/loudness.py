@@ -3,6 +3,7 @@ import pyloudnorm as pyln
 
 from pydub import AudioSegment
 
+from audio_engine.utils.analysis_cache import get_analysis_cache
 
 
 def audiosegment_to_float(audio: AudioSegment) -> np.ndarray:
@@ -36,6 +37,11 @@ def measure_integrated_lufs(audio: AudioSegment) -> float:
     if not hasattr(audio, 'frame_rate') or audio.frame_rate is None:
         raise ValueError(f"Cannot measure LUFS: audio has invalid frame_rate (audio type: {type(audio)})")
 
+    # Served from the analysis cache when a batch has enabled it
+    return get_analysis_cache().measure("integrated_lufs", audio, _integrated_loudness)
+
+
+def _integrated_loudness(audio: AudioSegment) -> float:
     meter = pyln.Meter(audio.frame_rate)
     samples = audiosegment_to_float(audio)
 
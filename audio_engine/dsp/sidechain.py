@@ -0,0 +1,246 @@
+"""
+Sidechain ducking: derive duck gain from the signal on a trigger bus.
+
+Unlike range-based ducking (dsp/ducking.py), which ducks over whole clip
+extents, the sidechain follows the actual level of the trigger tracks, so
+music only dips while someone is speaking.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+from audio_engine.dsp.ducking import apply_gain_curve_to_segment
+from audio_engine.dsp.streaming_eq import _PCM_DTYPES
+
+SIDECHAIN_MODE = "sidechain"
+
+# Detector resolution. Gain is computed per frame and held across its samples.
+DETECTOR_FRAME_MS = 1.0
+
+# ln(100): a time constant of ms / 4.6 reaches 99% of the step in `ms`
+_SETTLE_FACTOR = 4.6
+
+
+def is_sidechain_mode(ducking_cfg: Optional[Dict]) -> bool:
+    """True if ducking is enabled and configured for sidechain mode."""
+    return bool(
+        ducking_cfg
+        and ducking_cfg.get("enabled")
+        and ducking_cfg.get("mode") == SIDECHAIN_MODE
+    )
+
+
+def track_matches_role(track: Dict, role: str) -> bool:
+    """
+    Check whether a track belongs to a mix role ("voice") or an SFX
+    semantic role ("sfx:impact"). Semantic roles are matched at track level.
+    """
+    track_role = track.get("role")
+    if role.startswith("sfx:"):
+        return track_role == "sfx" and track.get("semantic_role") == role.split(":", 1)[1]
+    return track_role == role
+
+
+@dataclass
+class SidechainRoute:
+    rule_index: int
+    when: str
+    trigger_track_ids: List[str]
+    target_track_ids: List[str]
+
+
+def build_sidechain_routes(ducking_cfg: Dict, tracks: List[Dict]) -> List[SidechainRoute]:
+    """
+    Resolve each ducking rule to the track ids that key it and the track ids it ducks.
+    Rules without triggers or targets are dropped.
+    """
+    routes = []
+    for index, rule in enumerate(ducking_cfg.get("rules", [])):
+        when_role = rule.get("when", "")
+        triggers = [t.get("id", "unknown") for t in tracks if track_matches_role(t, when_role)]
+        targets = [
+            t.get("id", "unknown")
+            for t in tracks
+            if any(track_matches_role(t, target) for target in rule.get("duck", []))
+        ]
+        if triggers and targets:
+            routes.append(SidechainRoute(index, when_role, triggers, targets))
+    return routes
+
+
+class SidechainDucker:
+    """
+    Stateful detector + gain computer for one ducking rule.
+
+    The key is measured as RMS per DETECTOR_FRAME_MS frame. While it stays
+    above threshold_db (after onset_delay_ms), the gain moves toward
+    duck_amount over attack_ms; once it has been below threshold for
+    hold_ms, the gain recovers to 0 dB over release_ms.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        duck_amount_db: float = -6.0,
+        threshold_db: float = -40.0,
+        attack_ms: float = 500.0,
+        release_ms: float = 500.0,
+        hold_ms: float = 300.0,
+        onset_delay_ms: float = 0.0,
+    ):
+        self.sample_rate = sample_rate
+        self.duck_amount_db = duck_amount_db
+        self.threshold_db = threshold_db
+        self.hold_ms = max(0.0, hold_ms)
+        self.onset_delay_ms = max(0.0, onset_delay_ms)
+        self.frame_len = max(1, int(round(sample_rate * DETECTOR_FRAME_MS / 1000.0)))
+        self.attack_coeff = float(np.exp(-_SETTLE_FACTOR * DETECTOR_FRAME_MS / max(attack_ms, DETECTOR_FRAME_MS)))
+        self.release_coeff = float(np.exp(-_SETTLE_FACTOR * DETECTOR_FRAME_MS / max(release_ms, DETECTOR_FRAME_MS)))
+        self.reset()
+
+    @classmethod
+    def from_config(cls, cfg: Dict, sample_rate: int) -> "SidechainDucker":
+        """
+        Build from a settings["ducking"] dict. attack/release default to
+        fade_down_ms/fade_up_ms and hold defaults to min_pause_ms.
+        """
+        return cls(
+            sample_rate=sample_rate,
+            duck_amount_db=float(cfg.get("duck_amount", -6.0)),
+            threshold_db=float(cfg.get("threshold_db", -40.0)),
+            attack_ms=float(cfg.get("attack_ms", cfg.get("fade_down_ms", 500))),
+            release_ms=float(cfg.get("release_ms", cfg.get("fade_up_ms", 500))),
+            hold_ms=float(cfg.get("hold_ms", cfg.get("min_pause_ms", 300))),
+            onset_delay_ms=float(cfg.get("onset_delay_ms", 0)),
+        )
+
+    def reset(self) -> None:
+        self._gain_db = 0.0
+        self._above_ms = 0.0
+        self._since_active_ms = float("inf")
+        self._pending_sum = 0.0
+        self._pending_count = 0
+
+    def process_key(self, key: np.ndarray) -> np.ndarray:
+        """
+        Consume one block of key signal and return the per-sample linear
+        gain (float32, one value per frame of `key`).
+        """
+        num_samples = key.shape[0]
+        if num_samples == 0:
+            return np.ones((0,), dtype=np.float32)
+
+        squared = np.square(key, dtype=np.float64)
+        if squared.ndim > 1:
+            squared = squared.mean(axis=1)
+
+        # Frames sit on a global sample grid: a frame left incomplete by the
+        # previous block is finished by the first samples of this one.
+        first_len = self.frame_len - self._pending_count
+        starts = np.concatenate([[0], np.arange(first_len, num_samples, self.frame_len)]).astype(np.int64)
+        starts = starts[starts < num_samples]
+        counts = np.diff(np.append(starts, num_samples))
+        sums = np.add.reduceat(squared, starts)
+        sums[0] += self._pending_sum
+        frame_counts = counts.copy()
+        frame_counts[0] += self._pending_count
+
+        complete = frame_counts == self.frame_len
+        if not complete[-1]:
+            # Trailing partial frame: hold the current gain and carry its energy
+            self._pending_sum = float(sums[-1])
+            self._pending_count = int(frame_counts[-1])
+        else:
+            self._pending_sum = 0.0
+            self._pending_count = 0
+
+        frame_db = 10.0 * np.log10(sums / frame_counts + 1e-12)
+
+        frame_gain_db = np.empty(len(starts), dtype=np.float64)
+        gain_db = self._gain_db
+        above_ms = self._above_ms
+        since_active_ms = self._since_active_ms
+        for i, level_db in enumerate(frame_db):
+            if not complete[i]:
+                frame_gain_db[i] = gain_db
+                continue
+
+            if level_db > self.threshold_db:
+                above_ms += DETECTOR_FRAME_MS
+            else:
+                above_ms = 0.0
+
+            if above_ms > self.onset_delay_ms:
+                since_active_ms = 0.0
+            else:
+                since_active_ms += DETECTOR_FRAME_MS
+
+            target_db = self.duck_amount_db if since_active_ms <= self.hold_ms else 0.0
+            coeff = self.attack_coeff if target_db < gain_db else self.release_coeff
+            gain_db = target_db + (gain_db - target_db) * coeff
+            frame_gain_db[i] = gain_db
+
+        self._gain_db = gain_db
+        self._above_ms = above_ms
+        self._since_active_ms = since_active_ms
+
+        frame_gain = np.power(10.0, frame_gain_db / 20.0).astype(np.float32)
+        return np.repeat(frame_gain, counts)
+
+
+def apply_gain_curve(samples: np.ndarray, gain: np.ndarray) -> np.ndarray:
+    """Multiply (samples,) or (samples, channels) audio by a per-sample gain."""
+    if samples.ndim > 1:
+        return samples * gain[:, np.newaxis]
+    return samples * gain
+
+
+def duck_segment(
+    target: AudioSegment,
+    gain: np.ndarray,
+) -> AudioSegment:
+    """Apply a per-sample gain curve to an AudioSegment."""
+    return apply_gain_curve_to_segment(target, gain)
+
+
+def sidechain_duck_offline(
+    key: AudioSegment,
+    target: AudioSegment,
+    ducker: SidechainDucker,
+    block_sec: float = 10.0,
+) -> AudioSegment:
+    """
+    Duck a full-length target against a full-length key, block by block.
+    Used by the offline renderer, where track buffers span the whole project.
+    """
+    if key.frame_rate != target.frame_rate:
+        key = key.set_frame_rate(target.frame_rate)
+    if key.channels != target.channels:
+        key = key.set_channels(target.channels)
+
+    dtype = _PCM_DTYPES.get(target.sample_width)
+    if dtype is None:
+        raise ValueError(f"Unsupported sample width: {target.sample_width}")
+
+    target_pcm = np.frombuffer(target.raw_data, dtype=dtype).reshape((-1, target.channels))
+    key_pcm = np.frombuffer(key.raw_data, dtype=_PCM_DTYPES[key.sample_width]).reshape((-1, key.channels))
+    target_scale = float(2 ** (8 * target.sample_width - 1))
+    key_scale = float(2 ** (8 * key.sample_width - 1))
+    block_frames = max(1, int(block_sec * target.frame_rate))
+
+    out = np.empty_like(target_pcm)
+    for start in range(0, target_pcm.shape[0], block_frames):
+        end = min(start + block_frames, target_pcm.shape[0])
+        key_block = np.zeros((end - start, key_pcm.shape[1]), dtype=np.float32)
+        key_part = key_pcm[start:end]
+        key_block[:key_part.shape[0]] = key_part.astype(np.float32) / key_scale
+
+        gain = ducker.process_key(key_block)
+        block = target_pcm[start:end].astype(np.float32) / target_scale
+        block = np.clip(apply_gain_curve(block, gain), -1.0, 1.0)
+        out[start:end] = (block * (target_scale - 1)).astype(dtype)
+
+    return target._spawn(out.tobytes())
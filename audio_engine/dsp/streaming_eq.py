@@ -2,11 +2,24 @@
 Stateful EQ filters for chunk-by-chunk streaming processing.
 """
 
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+from pydub import AudioSegment
 from scipy import signal
 
+from audio_engine.dsp.eq_presets import get_tilt_config
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# pydub sample width (bytes) -> integer dtype of its raw PCM data
+_PCM_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# Fixed corner frequencies for explicit scene-level shelves
+SCENE_HIGH_SHELF_FREQ = 4000
+SCENE_LOW_SHELF_FREQ = 200
+
 
 class _StatefulFilter:
     """
@@ -84,3 +97,178 @@ class StreamingPeakEQ(_StatefulFilter):
         b = np.array([b0 / a0, b1 / a0, b2 / a0])
         a = np.array([1.0, a1 / a0, a2 / a0])
         super().__init__(b, a)
+
+
+def shelf_coefficients(
+    freq_hz: float,
+    gain_db: float,
+    sample_rate: int,
+    shelf_type: str = "high",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Design a shelving biquad (Audio EQ Cookbook, slope S = 1).
+
+    Returns:
+        (b, a) normalized so that a[0] == 1
+    """
+    A = 10 ** (gain_db / 40)
+    omega = 2 * np.pi * freq_hz / sample_rate
+    sin_omega = np.sin(omega)
+    cos_omega = np.cos(omega)
+
+    # Use a moderate slope (S = 1)
+    S = 1.0
+    alpha = sin_omega / 2 * np.sqrt((A + 1 / A) * (1 / S - 1) + 2)
+
+    if shelf_type == "low":
+        b0 = A * ((A + 1) - (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha)
+        b1 = 2 * A * ((A - 1) - (A + 1) * cos_omega)
+        b2 = A * ((A + 1) - (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha)
+        a0 = (A + 1) + (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha
+        a1 = -2 * ((A - 1) + (A + 1) * cos_omega)
+        a2 = (A + 1) + (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha
+    else:
+        b0 = A * ((A + 1) + (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha)
+        b1 = -2 * A * ((A - 1) + (A + 1) * cos_omega)
+        b2 = A * ((A + 1) + (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha)
+        a0 = (A + 1) - (A - 1) * cos_omega + 2 * np.sqrt(A) * alpha
+        a1 = 2 * ((A - 1) - (A + 1) * cos_omega)
+        a2 = (A + 1) - (A - 1) * cos_omega - 2 * np.sqrt(A) * alpha
+
+    b = np.array([b0 / a0, b1 / a0, b2 / a0])
+    a = np.array([1.0, a1 / a0, a2 / a0])
+    return b, a
+
+
+def compile_scene_tonal_sos(scene_eq: Dict[str, Any], sample_rate: int) -> Optional[np.ndarray]:
+    """
+    Compile scene tonal shaping settings into one SOS cascade.
+
+    Sections are ordered tilt low shelf, tilt high shelf, explicit high shelf,
+    explicit low shelf. Shelves below 0.1 dB or outside (0, Nyquist) are dropped.
+
+    Returns:
+        SOS array of shape (n_sections, 6), or None if nothing needs filtering
+    """
+    if not scene_eq:
+        return None
+
+    shelves: List[Tuple[float, float, str]] = []
+
+    if "tilt" in scene_eq:
+        try:
+            tilt_config = get_tilt_config(scene_eq["tilt"])
+            if tilt_config.get("low_shelf_gain", 0) != 0:
+                shelves.append((tilt_config.get("low_shelf_freq", 200), tilt_config["low_shelf_gain"], "low"))
+            if tilt_config.get("high_shelf_gain", 0) != 0:
+                shelves.append((tilt_config.get("high_shelf_freq", 4000), tilt_config["high_shelf_gain"], "high"))
+        except ValueError as e:
+            logger.warning(f"Failed to apply tilt preset: {e}")
+
+    if scene_eq.get("high_shelf", 0) != 0:
+        shelves.append((SCENE_HIGH_SHELF_FREQ, scene_eq["high_shelf"], "high"))
+    if scene_eq.get("low_shelf", 0) != 0:
+        shelves.append((SCENE_LOW_SHELF_FREQ, scene_eq["low_shelf"], "low"))
+
+    nyquist = sample_rate / 2
+    sections = []
+    for freq_hz, gain_db, shelf_type in shelves:
+        if abs(gain_db) < 0.1:
+            continue
+        if freq_hz >= nyquist or freq_hz <= 0:
+            logger.warning(f"Shelf freq {freq_hz}Hz outside valid range, skipping")
+            continue
+        b, a = shelf_coefficients(freq_hz, gain_db, sample_rate, shelf_type)
+        sections.append(np.concatenate([b, a]))
+
+    if not sections:
+        return None
+    return np.vstack(sections)
+
+
+class StreamingSOSFilter:
+    """
+    Stateful second-order-sections cascade using sosfilt with preserved state.
+    """
+
+    def __init__(self, sos: np.ndarray):
+        self.sos = sos
+        self._zi: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        self._zi = None
+
+    def process_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        if chunk.size == 0:
+            return chunk
+
+        if self._zi is None:
+            # Start from silence so the first block matches an offline pass
+            shape = (self.sos.shape[0], 2) if chunk.ndim == 1 else (self.sos.shape[0], 2, chunk.shape[1])
+            self._zi = np.zeros(shape)
+
+        output, self._zi = signal.sosfilt(self.sos, chunk, axis=0, zi=self._zi)
+        return output.astype(np.float32)
+
+    def process_segment(self, audio: AudioSegment, block_sec: float = 10.0) -> AudioSegment:
+        """
+        Filter an AudioSegment block by block, carrying state across blocks.
+
+        Only one block is held as float at a time, so peak memory stays close
+        to the size of the integer PCM input and output.
+        """
+        dtype = _PCM_DTYPES.get(audio.sample_width)
+        if dtype is None:
+            raise ValueError(f"Unsupported sample width: {audio.sample_width}")
+
+        pcm = np.frombuffer(audio.raw_data, dtype=dtype)
+        if pcm.size == 0:
+            return audio
+        if audio.channels > 1:
+            pcm = pcm.reshape((-1, audio.channels))
+
+        scale_in = float(2 ** (8 * audio.sample_width - 1))
+        scale_out = scale_in - 1
+        block_frames = max(1, int(block_sec * audio.frame_rate))
+
+        out = np.empty_like(pcm)
+        for start in range(0, pcm.shape[0], block_frames):
+            block = pcm[start:start + block_frames].astype(np.float32) / scale_in
+            filtered = self.process_chunk(block)
+            np.clip(filtered, -1.0, 1.0, out=filtered)
+            out[start:start + block_frames] = (filtered * scale_out).astype(dtype)
+
+        return audio._spawn(out.tobytes())
+
+
+class SceneTonalShaper(StreamingSOSFilter):
+    """
+    Scene-level tonal shaping (tilt + shelves) as a single stateful cascade.
+
+    Use one instance per render pass so the filter state runs continuously
+    across chunk boundaries.
+    """
+
+    def __init__(self, scene_eq: Dict[str, Any], sample_rate: int):
+        self.scene_eq = scene_eq
+        self.sample_rate = sample_rate
+        sos = compile_scene_tonal_sos(scene_eq, sample_rate)
+        super().__init__(sos if sos is not None else np.zeros((0, 6)))
+
+    @property
+    def is_active(self) -> bool:
+        return self.sos.shape[0] > 0
+
+    def process_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        if not self.is_active:
+            return chunk
+        return super().process_chunk(chunk)
+
+    def process_segment(self, audio: AudioSegment, block_sec: float = 10.0) -> AudioSegment:
+        if not self.is_active:
+            return audio
+        if audio.frame_rate != self.sample_rate:
+            raise ValueError(
+                f"SceneTonalShaper compiled for {self.sample_rate} Hz, got {audio.frame_rate} Hz"
+            )
+        return super().process_segment(audio, block_sec=block_sec)
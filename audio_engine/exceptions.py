@@ -29,5 +29,10 @@ class FileError(AudioEngineError):
     pass
 
 
+class RenderCancelled(AudioEngineError):
+    """Raised (typically from a progress callback) to stop a render early."""
+    pass
+
+
 # Re-export ValidationError for consistency
-__all__ = ['AudioEngineError', 'AudioProcessingError', 'DSPError', 'TimelineError', 'FileError', 'ValidationError']
+__all__ = ['AudioEngineError', 'AudioProcessingError', 'DSPError', 'TimelineError', 'FileError', 'RenderCancelled', 'ValidationError']
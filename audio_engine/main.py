@@ -5,21 +5,99 @@ from audio_engine.renderer import TimelineRenderer
 logger = get_logger(__name__)
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python main.py <timeline.json> <output.wav>")
+    if len(sys.argv) >= 2 and sys.argv[1] == "render-batch":
+        render_batch_main(sys.argv[2:])
+        return
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "render-variants":
+        render_variants_main(sys.argv[2:])
+        return
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "serve":
+        serve_main(sys.argv[2:])
+        return
+
+    # --force re-renders even when the output's manifest shows it is up to date
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    force = len(args) != len(sys.argv) - 1
+
+    if len(args) < 2:
+        print("Usage: python main.py <timeline.json> <output.wav> [--force]")
+        print("       python main.py render-batch <manifest.json> [report.json] [--force]")
+        print("       python main.py render-variants <timeline.json> <output_{variant}.wav> [--force]")
+        print("       python main.py serve [--host 127.0.0.1] [--port 8765] [--socket PATH] [--workers 2]")
         print("Example: python main.py timeline.json output/final.wav")
         sys.exit(1)
     
-    timeline_path = sys.argv[1]
-    output_path = sys.argv[2]
+    timeline_path = args[0]
+    output_path = args[1]
     
     logger.info(f"Starting audio rendering: {timeline_path} -> {output_path}")
     renderer = TimelineRenderer()
     renderer.render(
         timeline_path=timeline_path,
-        output_path=output_path
+        output_path=output_path,
+        force=force
     )
     logger.info("Audio rendered successfully!")
 
+def render_batch_main(args):
+    force = "--force" in args
+    args = [arg for arg in args if arg != "--force"]
+    if not args:
+        print("Usage: python main.py render-batch <manifest.json> [report.json] [--force]")
+        sys.exit(1)
+
+    from audio_engine.batch import render_batch
+    report = render_batch(args[0], report_path=args[1] if len(args) > 1 else None, force=force)
+    if report.failures:
+        sys.exit(1)
+
+def render_variants_main(args):
+    force = "--force" in args
+    args = [arg for arg in args if arg != "--force"]
+    if len(args) < 2:
+        print("Usage: python main.py render-variants <timeline.json> <output_{variant}.wav> [--force]")
+        sys.exit(1)
+
+    outputs = TimelineRenderer().render_variants(args[0], args[1], force=force)
+    logger.info(f"Rendered variants: {', '.join(outputs)}")
+
+def serve_main(args):
+    import argparse
+    import asyncio
+
+    from audio_engine.daemon import (
+        DEFAULT_DAEMON_WORKERS,
+        DEFAULT_FINISHED_JOB_TTL_SEC,
+        DEFAULT_MAX_FINISHED_JOBS,
+        run_daemon,
+    )
+
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Run a warm local render daemon")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="Also listen on this localhost TCP port")
+    parser.add_argument("--socket", default=None,
+                        help="Unix socket path (default: render.sock in the per-user cache directory)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_DAEMON_WORKERS)
+    parser.add_argument("--asset-cache-mb", type=int, default=1024)
+    parser.add_argument("--job-ttl", type=float, default=DEFAULT_FINISHED_JOB_TTL_SEC,
+                        help="Seconds a finished job stays queryable")
+    parser.add_argument("--max-finished-jobs", type=int, default=DEFAULT_MAX_FINISHED_JOBS)
+    opts = parser.parse_args(args)
+
+    try:
+        asyncio.run(run_daemon(
+            host=opts.host,
+            port=opts.port,
+            socket_path=opts.socket,
+            max_workers=opts.workers,
+            asset_cache_mb=opts.asset_cache_mb,
+            finished_job_ttl_sec=opts.job_ttl,
+            max_finished_jobs=opts.max_finished_jobs,
+        ))
+    except KeyboardInterrupt:
+        logger.info("Render daemon stopped")
+
 if __name__ == "__main__":
     main()
@@ -1,20 +1,37 @@
 """
 ClipProcessor handles individual clip processing with all effects.
 """
+import os
+import threading
 from typing import Optional, Dict, List, Tuple, Union
 from pydub import AudioSegment
 
+from audio_engine import __version__
+from audio_engine.utils.asset_cache import get_asset_cache
+from audio_engine.utils.clip_cache import ProcessedClipCache, clip_cache_key, get_clip_cache
 from audio_engine.utils.logger import get_logger
 from audio_engine.utils.energy_ramp import apply_energy_ramp
+from audio_engine.utils.metadata import file_identity
 from audio_engine.exceptions import FileError, AudioProcessingError, DSPError
 from audio_engine.dsp.fade_curves import FadeCurve
 from audio_engine.dsp.sfx_processor import apply_sfx_processing, get_sfx_fade_behavior
 from audio_engine.dsp.balance import apply_role_loudness
-from audio_engine.dsp.eq import apply_eq_preset, get_preset_for_role
+from audio_engine.dsp.eq import apply_eq_preset, get_preset_for_role, resolve_preset_version
+from audio_engine.dsp.ducking import DuckingPlanner, apply_gain_curve_to_segment
 
 logger = get_logger(__name__)
 
 
+def _preset_version(preset: Optional[str]) -> Optional[str]:
+    """The versioned name of an EQ preset; unknown names are kept as given."""
+    if not preset:
+        return preset
+    try:
+        return resolve_preset_version(preset)
+    except ValueError:
+        return preset
+
+
 class ClipProcessor:
     """Processes individual audio clips with gain, compression, ducking, and effects."""
     
@@ -23,7 +40,8 @@ class ClipProcessor:
         ducking_func=None,
         compression_func=None,
         fade_in_func=None,
-        fade_out_func=None
+        fade_out_func=None,
+        clip_cache: Optional[ProcessedClipCache] = None,
     ):
         """
         Initialize ClipProcessor with optional DSP function dependencies.
@@ -33,11 +51,16 @@ class ClipProcessor:
             compression_func: Function to apply compression (default: None, will import if needed)
             fade_in_func: Function to apply fade-in (default: None, will import if needed)
             fade_out_func: Function to apply fade-out (default: None, will import if needed)
+            clip_cache: Cache for processed clips (default: the process-wide cache)
         """
         self.ducking_func = ducking_func
+        self._custom_ducking = ducking_func is not None
+        self._ducking_planner: Optional[DuckingPlanner] = None
+        self._planner_lock = threading.Lock()
         self.compression_func = compression_func
         self.fade_in_func = fade_in_func
         self.fade_out_func = fade_out_func
+        self.clip_cache = clip_cache
         
         # Lazy import if not provided
         if self.ducking_func is None:
@@ -56,85 +79,124 @@ class ClipProcessor:
             from audio_engine.dsp.fades import apply_fade_out
             self.fade_out_func = apply_fade_out
     
-    def process_clip(
+    def _get_ducking_planner(self, role_ranges: Dict[str, List[Tuple[float, float]]]) -> DuckingPlanner:
+        """Return the planner for this render's role ranges, building it once."""
+        with self._planner_lock:
+            if self._ducking_planner is None or self._ducking_planner.role_ranges is not role_ranges:
+                self._ducking_planner = DuckingPlanner(role_ranges)
+            return self._ducking_planner
+
+    def _apply_ducking(
         self,
-        canvas: AudioSegment,
+        audio: AudioSegment,
         clip: Dict,
-        track_gain: float,
-        project_duration: float,
-        role_ranges: Optional[Dict[str, List[Tuple[float, float]]]] = None,
-        track_role: Optional[str] = None,
-        default_ducking: Optional[Dict] = None,
-        default_compression: Optional[Dict] = None,
-        track_semantic_role: Optional[str] = None,
-        track_eq_preset: Optional[str] = None
+        start_sec: float,
+        ducking_cfg: Dict,
+        role_ranges: Dict[str, List[Tuple[float, float]]],
+        track_role: Optional[str],
+        semantic_role: Optional[str],
     ) -> AudioSegment:
         """
-        Process a single clip and apply it to the canvas.
-        
-        Processing order (critical for reliable ducking math):
-        1. Load audio
-        2. Apply track/clip gain
-        3. Apply EQ (role preset or explicit) ← shapes frequencies before other processing
-        4. Apply SFX processing (semantic loudness, fade defaults, micro-timing)
-        5. Apply energy ramp (if applicable)
-        6. Apply ducking (lighter now due to EQ separation)
-        7. Apply dialogue compression (if voice)
-        8. Overlay to canvas
-        9. Apply canvas-level fades
-        
-        Args:
-            canvas: Audio canvas to apply clip to
-            clip: Clip dictionary with file, start, and optional effects
-            track_gain: Base gain for the track
-            project_duration: Total project duration in seconds
-            role_ranges: Dictionary of role ranges for ducking
-            track_role: Mix role of the track (voice, music, background, sfx) - where it sits in mix
-            default_ducking: Default ducking configuration
-            default_compression: Default compression configuration
-            track_semantic_role: Optional track-level semantic role (what sound represents)
-            track_eq_preset: Optional track-level EQ preset override
-        
-        Returns:
-            Updated canvas with clip applied
+        Apply every ducking rule that targets this clip's role.
+
+        Rules are compiled once per config and gain curves once per window:
+        the chunk window in streaming mode (shared by all slices in the chunk),
+        otherwise the clip's own extent.
         """
-        # Validate canvas is not None
-        if canvas is None:
-            logger.error("Canvas is None in process_clip, cannot process clip")
-            raise AudioProcessingError("Canvas is None")
-        
-        # Load audio file (allow internal override for streaming chunks)
-        if "_audio_override" in clip and clip["_audio_override"] is not None:
-            audio = clip["_audio_override"]
-        else:
-            if "file" not in clip:
-                logger.error(f"Clip missing 'file' field: {clip}")
-                raise AudioProcessingError("Clip missing 'file' field")
-            
-            try:
-                audio = AudioSegment.from_file(clip["file"])
-                # Validate audio was loaded successfully
-                if audio is None:
-                    logger.error(f"Failed to load audio file {clip['file']}: returned None")
-                    raise AudioProcessingError(f"Failed to load audio file {clip['file']}: returned None")
-            except FileNotFoundError:
-                logger.error(f"Audio file not found: {clip['file']}")
-                raise FileError(f"Audio file not found: {clip['file']}")
-            except Exception as e:
-                logger.error(f"Failed to load audio file {clip['file']}: {e}")
-                raise AudioProcessingError(f"Failed to load audio file {clip['file']}: {e}")
+        plan = self._get_ducking_planner(role_ranges).plan_for(ducking_cfg)
+        rules = plan.rules_for(track_role, semantic_role)
+        if not rules:
+            return audio
+
+        if plan.mode == "scene":
+            return audio + ducking_cfg["duck_amount"] * len(rules)
+
+        if plan.mode != "audacity":
+            return audio
+
+        if self._custom_ducking:
+            for rule in rules:
+                audio = self.ducking_func(
+                    audio=audio,
+                    clip_start_sec=start_sec,
+                    dialogue_ranges=role_ranges[rule.when],
+                    cfg=ducking_cfg
+                )
+            return audio
+
+        window_start, window_end = clip.get("_duck_window") or (start_sec, start_sec + len(audio) / 1000.0)
+        sample_rate = audio.frame_rate
+        offset_samples = int(round((start_sec - window_start) * sample_rate))
+        for rule in rules:
+            gain = plan.gain_curve(rule, window_start, window_end, sample_rate)
+            audio = apply_gain_curve_to_segment(audio, gain, offset_samples)
+        return audio
+
+    @staticmethod
+    def _load_clip_audio(clip: Dict) -> AudioSegment:
+        if "file" not in clip:
+            logger.error(f"Clip missing 'file' field: {clip}")
+            raise AudioProcessingError("Clip missing 'file' field")
         
-        clip_rules = clip.get("_rules", {})
+        try:
+            audio = get_asset_cache().load(clip["file"])
+            # Validate audio was loaded successfully
+            if audio is None:
+                logger.error(f"Failed to load audio file {clip['file']}: returned None")
+                raise AudioProcessingError(f"Failed to load audio file {clip['file']}: returned None")
+        except FileNotFoundError:
+            logger.error(f"Audio file not found: {clip['file']}")
+            raise FileError(f"Audio file not found: {clip['file']}")
+        except Exception as e:
+            logger.error(f"Failed to load audio file {clip['file']}: {e}")
+            raise AudioProcessingError(f"Failed to load audio file {clip['file']}: {e}")
+        return audio
+
+    @staticmethod
+    def _processed_clip_key(
+        clip: Dict,
+        clip_rules: Dict,
+        track_gain: float,
+        track_role: Optional[str],
+        semantic_role: Optional[str],
+        track_eq_preset: Optional[str],
+    ) -> str:
+        """
+        Cache key for _apply_source_dsp: the source file, every parameter it
+        reads, the resolved EQ preset version and the engine version.
+        """
+        eq_preset = clip.get("eq_preset") or track_eq_preset or get_preset_for_role(track_role, semantic_role)
+        return clip_cache_key({
+            "engine_version": __version__,
+            "file": os.path.abspath(clip["file"]),
+            "identity": file_identity(clip["file"]),
+            "track_gain": track_gain,
+            "clip_gain": clip.get("gain"),
+            "eq_preset": None if clip.get("_skip_eq") else _preset_version(eq_preset),
+            "track_role": track_role,
+            "semantic_role": semantic_role,
+            "scene_energy": clip_rules.get("scene_energy", 0.5),
+            "prev_scene_energy": clip_rules.get("prev_scene_energy"),
+            "energy_ramp_duration": clip_rules.get("energy_ramp_duration", 3000),
+            "dialogue_density": clip_rules.get("dialogue_density_label"),
+            "sfx_scene_energy_gain": clip_rules.get("sfx_scene_energy_gain"),
+        })
+
+    def _apply_source_dsp(
+        self,
+        audio: AudioSegment,
+        clip: Dict,
+        clip_rules: Dict,
+        track_gain: float,
+        track_role: Optional[str],
+        semantic_role: Optional[str],
+        track_eq_preset: Optional[str],
+    ) -> AudioSegment:
+        """Steps 2-5: DSP that depends only on the source audio and parameters, not on placement."""
         dialogue_density = clip_rules.get("dialogue_density_label")
         scene_energy = clip_rules.get("scene_energy", 0.5)
         prev_energy = clip_rules.get("prev_scene_energy")
 
-        ducking_cfg = clip_rules.get("ducking", default_ducking)
-        compression_cfg = clip_rules.get("dialogue_compression", default_compression)
-
-        # Get semantic role: clip-level overrides track-level
-        semantic_role = clip.get("semantic_role", track_semantic_role)
-
         # Step 2: Gain Handling
         audio = audio + track_gain
         if "gain" in clip:
@@ -210,6 +272,84 @@ class ClipProcessor:
             elif dialogue_density == "low":
                 audio = audio + 0  # let music breathe
 
+        return audio
+
+    def process_clip(
+        self,
+        canvas: AudioSegment,
+        clip: Dict,
+        track_gain: float,
+        project_duration: float,
+        role_ranges: Optional[Dict[str, List[Tuple[float, float]]]] = None,
+        track_role: Optional[str] = None,
+        default_ducking: Optional[Dict] = None,
+        default_compression: Optional[Dict] = None,
+        track_semantic_role: Optional[str] = None,
+        track_eq_preset: Optional[str] = None
+    ) -> AudioSegment:
+        """
+        Process a single clip and apply it to the canvas.
+        
+        Processing order (critical for reliable ducking math):
+        1. Load audio
+        2. Apply track/clip gain
+        3. Apply EQ (role preset or explicit) ← shapes frequencies before other processing
+        4. Apply SFX processing (semantic loudness, fade defaults, micro-timing)
+        5. Apply energy ramp (if applicable)
+        6. Apply ducking (lighter now due to EQ separation)
+        7. Apply dialogue compression (if voice)
+        8. Overlay to canvas
+        9. Apply canvas-level fades
+        
+        Args:
+            canvas: Audio canvas to apply clip to
+            clip: Clip dictionary with file, start, and optional effects
+            track_gain: Base gain for the track
+            project_duration: Total project duration in seconds
+            role_ranges: Dictionary of role ranges for ducking
+            track_role: Mix role of the track (voice, music, background, sfx) - where it sits in mix
+            default_ducking: Default ducking configuration
+            default_compression: Default compression configuration
+            track_semantic_role: Optional track-level semantic role (what sound represents)
+            track_eq_preset: Optional track-level EQ preset override
+        
+        Returns:
+            Updated canvas with clip applied
+        """
+        # Validate canvas is not None
+        if canvas is None:
+            logger.error("Canvas is None in process_clip, cannot process clip")
+            raise AudioProcessingError("Canvas is None")
+        
+        clip_rules = clip.get("_rules", {})
+        ducking_cfg = clip_rules.get("ducking", default_ducking)
+        compression_cfg = clip_rules.get("dialogue_compression", default_compression)
+
+        # Get semantic role: clip-level overrides track-level
+        semantic_role = clip.get("semantic_role", track_semantic_role)
+
+        # Steps 1-5: load and position-independent DSP, cached per file + parameters
+        if "_audio_override" in clip and clip["_audio_override"] is not None:
+            # Streaming chunk slices
+            audio = self._apply_source_dsp(
+                clip["_audio_override"], clip, clip_rules, track_gain, track_role, semantic_role, track_eq_preset
+            )
+        else:
+            cache = self.clip_cache or get_clip_cache()
+            cache_key = None
+            audio = None
+            if cache.enabled and "file" in clip:
+                cache_key = self._processed_clip_key(
+                    clip, clip_rules, track_gain, track_role, semantic_role, track_eq_preset
+                )
+                audio = cache.get(cache_key)
+            if audio is None:
+                audio = self._apply_source_dsp(
+                    self._load_clip_audio(clip), clip, clip_rules, track_gain, track_role, semantic_role, track_eq_preset
+                )
+                if cache_key is not None:
+                    cache.put(cache_key, audio)
+
         timeline_start_sec = clip.get("_timeline_start", clip["start"])
         overlay_start_sec = clip.get("_overlay_start", clip["start"])
         start_sec = timeline_start_sec
@@ -229,59 +369,18 @@ class ClipProcessor:
         # Ducking is opt-in via rules - semantic roles define eligibility, not mandatory behavior
         # Note: EQ applied earlier enables lighter ducking due to frequency separation
         if ducking_cfg and role_ranges:
-            # Get semantic role for this clip (clip-level or track-level)
-            clip_semantic_role = clip.get("semantic_role", track_semantic_role)
-            
-            for rule in ducking_cfg.get("rules", []):
-                when_role = rule["when"]
-                
-                # Check if this clip matches the "when" role
-                matches_when = False
-                if when_role == track_role:
-                    # Direct mix role match
-                    matches_when = True
-                elif when_role.startswith("sfx:") and track_role == "sfx":
-                    # Semantic role match: check if clip's semantic role matches
-                    target_semantic_role = when_role.split(":", 1)[1]
-                    if clip_semantic_role == target_semantic_role:
-                        matches_when = True
-                
-                if not matches_when:
-                    continue
-                
-                # Check if this track/clip should be ducked
-                duck_targets = rule.get("duck", [])
-                should_duck = False
-                duck_key = None
-                
-                for duck_target in duck_targets:
-                    if duck_target == track_role:
-                        # Direct mix role match
-                        should_duck = True
-                        duck_key = track_role
-                        break
-                    elif duck_target.startswith("sfx:") and track_role == "sfx":
-                        # Semantic role match: check if clip's semantic role matches
-                        target_semantic_role = duck_target.split(":", 1)[1]
-                        if clip_semantic_role == target_semantic_role:
-                            should_duck = True
-                            duck_key = duck_target
-                            break
-                
-                if should_duck and when_role in role_ranges:
-                    try:
-                        if ducking_cfg.get("mode") == "audacity":
-                            audio = self.ducking_func(
-                                audio=audio,
-                                clip_start_sec=start_sec,
-                                dialogue_ranges=role_ranges[when_role],
-                                cfg=ducking_cfg
-                            )
-                        
-                        if ducking_cfg.get("mode") == "scene":
-                            audio = audio + ducking_cfg["duck_amount"]
-                    except Exception as e:
-                        logger.warning(f"Failed to apply ducking for clip {clip.get('file', 'unknown')}: {e}")
+            try:
+                audio = self._apply_ducking(
+                    audio=audio,
+                    clip=clip,
+                    start_sec=start_sec,
+                    ducking_cfg=ducking_cfg,
+                    role_ranges=role_ranges,
+                    track_role=track_role,
+                    semantic_role=semantic_role,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to apply ducking for clip {clip.get('file', 'unknown')}: {e}")
 
         # Step 7: Dialogue Compression (if voice)
         skip_compression = bool(clip.get("_skip_compression"))
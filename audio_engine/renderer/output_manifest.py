@@ -0,0 +1,143 @@
+"""
+Output manifests: make-style skipping of renders whose inputs are unchanged.
+
+After a render, `<output>.manifest.json` records what the output was made
+from: a hash of the timeline, a fingerprint of every asset it reads, the
+engine version, the resolved EQ preset versions and the RenderConfig. The
+next render to the same output compares against it and returns straight
+away when nothing changed and the output itself is untouched.
+
+Files are compared by content. The recorded SHA-1 is trusted while a file's
+mtime and size are unchanged; otherwise the file is hashed again, so a file
+that was touched but not modified does not force a re-render.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+from audio_engine import __version__
+from audio_engine.utils.hashing import canonical_json, content_key, preset_versions
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OUTPUT_MANIFEST_VERSION = 1
+
+
+def output_manifest_path(output_path: str) -> str:
+    return f"{output_path}.manifest.json"
+
+
+def _canonical(value):
+    """`value` as it reads back from JSON, so fresh and loaded inputs compare equal."""
+    return json.loads(canonical_json(value))
+
+
+def content_hash(path: str) -> Optional[str]:
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str, previous: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    {"mtime_ns", "size", "sha1"} of a file, or None if it is missing. The
+    SHA-1 from `previous` is reused when mtime and size still match.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if previous and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("size") == stat.st_size:
+        sha1 = previous.get("sha1")
+    else:
+        sha1 = content_hash(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": sha1}
+
+
+def render_inputs(timeline: Dict, config, streaming: bool) -> Dict:
+    """Everything an output depends on besides the contents of its files."""
+    return _canonical({
+        "version": OUTPUT_MANIFEST_VERSION,
+        "engine_version": __version__,
+        "streaming": streaming,
+        "timeline": content_key(timeline),
+        "presets": preset_versions(),
+        "config": dataclasses.asdict(config),
+    })
+
+
+def load_output_manifest(output_path: str) -> Optional[Dict]:
+    try:
+        with open(output_manifest_path(output_path), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if manifest.get("inputs", {}).get("version") != OUTPUT_MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _same_content(path: str, recorded: Optional[Dict]) -> bool:
+    current = file_fingerprint(path, recorded)
+    if current is None or recorded is None:
+        return current is None and recorded is None
+    return current["sha1"] is not None and current["sha1"] == recorded.get("sha1")
+
+
+def output_is_current(
+    output_path: str,
+    inputs: Dict,
+    asset_paths: List[str],
+    extra_outputs: Sequence[str] = (),
+) -> bool:
+    """
+    True if the output exists and was rendered from exactly these inputs and
+    assets, and the files in `extra_outputs` (e.g. stems) are still as written.
+    """
+    manifest = load_output_manifest(output_path)
+    if manifest is None or manifest.get("inputs") != inputs:
+        return False
+    if manifest.get("output") is None or not _same_content(output_path, manifest["output"]):
+        return False
+    written = manifest.get("extra_outputs", {})
+    if sorted(written) != sorted(extra_outputs):
+        return False
+    if not all(written[path] is not None and _same_content(path, written[path]) for path in extra_outputs):
+        return False
+    assets = manifest.get("assets", {})
+    if sorted(assets) != sorted(asset_paths):
+        return False
+    return all(_same_content(path, assets[path]) for path in asset_paths)
+
+
+def write_output_manifest(
+    output_path: str,
+    inputs: Dict,
+    asset_paths: List[str],
+    extra_outputs: Sequence[str] = (),
+) -> None:
+    """Record what `output_path` and the files in `extra_outputs` were just rendered from."""
+    previous = load_output_manifest(output_path) or {}
+    previous_assets = previous.get("assets", {})
+    manifest = {
+        "inputs": inputs,
+        "assets": {path: file_fingerprint(path, previous_assets.get(path)) for path in asset_paths},
+        "output": file_fingerprint(output_path),
+        "extra_outputs": {path: file_fingerprint(path) for path in extra_outputs},
+    }
+    path = output_manifest_path(output_path)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write render manifest {path}: {e}")
@@ -0,0 +1,140 @@
+"""
+Extra outputs: several masters from one render.
+
+settings["outputs"] lists deliverables besides the main output:
+
+    "outputs": [
+        {"name": "podcast", "format": "mp3", "bitrate": "128k", "target_lufs": -16, "peak_dbfs": -1.0},
+        {"name": "broadcast", "sample_rate": 48000, "bit_depth": 24, "target_lufs": -23, "peak_dbfs": -2.0}
+    ]
+
+The pre-master mix is rendered once. Each output then runs its own master
+chain: the timeline's master settings with the output's loudness target,
+followed by its peak ceiling. The result is converted to the output's sample
+rate, channels and bit depth and encoded as it is written (see
+open_stream_writer). Outputs are written next to the main output as
+`<output base>.<name>.<format>` unless they give a "path".
+"""
+import dataclasses
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from pydub import AudioSegment
+
+from audio_engine.config import RenderConfig
+from audio_engine.exceptions import TimelineError
+from audio_engine.streaming.loudness import compute_lufs_gain_db, compute_peak_gain_db
+from audio_engine.streaming.stream_writer import export_segment, resample
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BIT_DEPTHS = {8: 1, 16: 2, 24: 3, 32: 4}
+
+
+@dataclass
+class OutputSpec:
+    name: str
+    path: str
+    format: str = "wav"
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    # Bytes per sample; None keeps the render's own
+    sample_width: Optional[int] = None
+    target_lufs: Optional[float] = None
+    peak_dbfs: Optional[float] = None
+    bitrate: Optional[str] = None
+
+
+def output_specs(outputs_cfg: Optional[List[Dict]], output_path: str) -> List[OutputSpec]:
+    """The extra outputs declared in settings["outputs"] for a render to `output_path`."""
+    specs = []
+    base, _ = os.path.splitext(output_path)
+    for index, entry in enumerate(outputs_cfg or []):
+        name = str(entry.get("name", index))
+        fmt = str(entry.get("format", "wav")).lower()
+        bit_depth = entry.get("bit_depth")
+        if bit_depth is not None and int(bit_depth) not in BIT_DEPTHS:
+            raise TimelineError(f"Output '{name}': unsupported bit_depth {bit_depth} (expected 8, 16, 24 or 32)")
+        path = entry.get("path") or f"{base}.{name}.{fmt}"
+        if os.path.abspath(path) == os.path.abspath(output_path):
+            raise TimelineError(f"Output '{name}' would overwrite the main output {output_path}")
+        specs.append(OutputSpec(
+            name=name,
+            path=path,
+            format=fmt,
+            sample_rate=int(entry["sample_rate"]) if entry.get("sample_rate") else None,
+            channels=int(entry["channels"]) if entry.get("channels") else None,
+            sample_width=BIT_DEPTHS[int(bit_depth)] if bit_depth is not None else None,
+            target_lufs=float(entry["target_lufs"]) if entry.get("target_lufs") is not None else None,
+            peak_dbfs=float(entry["peak_dbfs"]) if entry.get("peak_dbfs") is not None else None,
+            bitrate=entry.get("bitrate"),
+        ))
+    return specs
+
+
+def master_config(config: RenderConfig, spec: OutputSpec) -> RenderConfig:
+    """The master settings of `config` with the output's loudness target."""
+    if spec.target_lufs is None:
+        return config
+    loudness = dict(config.loudness or {}, enabled=True, target_lufs=spec.target_lufs)
+    return dataclasses.replace(config, loudness=loudness, target_lufs=spec.target_lufs)
+
+
+def apply_peak_ceiling(audio: AudioSegment, ceiling_dbfs: Optional[float]) -> AudioSegment:
+    """Turn audio down so its peak is at most `ceiling_dbfs`; quieter audio is left alone."""
+    if ceiling_dbfs is None or audio.max_dBFS == float("-inf") or audio.max_dBFS <= ceiling_dbfs:
+        return audio
+    return audio.apply_gain(ceiling_dbfs - audio.max_dBFS)
+
+
+def conform(audio: AudioSegment, spec: OutputSpec) -> AudioSegment:
+    if spec.sample_rate and audio.frame_rate != spec.sample_rate:
+        # Same conversion as the streaming writers, so both paths produce the same frame count
+        audio = resample(audio, spec.sample_rate)
+    if spec.channels and audio.channels != spec.channels:
+        audio = audio.set_channels(spec.channels)
+    # pydub cannot hold 24-bit samples; StreamWriter packs them on write
+    if spec.sample_width and spec.sample_width != 3 and audio.sample_width != spec.sample_width:
+        audio = audio.set_sample_width(spec.sample_width)
+    return audio
+
+
+def export_output(audio: AudioSegment, spec: OutputSpec) -> None:
+    output_dir = os.path.dirname(spec.path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    export_segment(audio, spec.path, spec.sample_width, spec.format, spec.bitrate)
+    logger.info(f"Output '{spec.name}' exported to {spec.path}")
+
+
+def render_output(premaster: AudioSegment, spec: OutputSpec, config: RenderConfig, master_processor) -> None:
+    """Master, convert and encode one extra output from the pre-master mix."""
+    audio = master_processor.process(premaster, master_config(config, spec))
+    audio = apply_peak_ceiling(audio, spec.peak_dbfs)
+    export_output(conform(audio, spec), spec)
+
+
+def streaming_gain_db(
+    config: RenderConfig,
+    spec: Optional[OutputSpec],
+    measured_lufs: float,
+    max_abs: float,
+) -> float:
+    """
+    Gain taking a measured streaming pre-master to an output (or, with no
+    spec, to the main output): LUFS target, then peak normalization, then
+    the output's peak ceiling, as in MasterProcessor.
+    """
+    config = master_config(config, spec) if spec is not None else config
+    gain_db = 0.0
+    if config.loudness:
+        gain_db = compute_lufs_gain_db(current_lufs=measured_lufs, target_lufs=config.target_lufs)
+    peak = max_abs * (10 ** (gain_db / 20.0))
+    if config.normalize_peak and peak > 0.0:
+        gain_db += compute_peak_gain_db(peak, config.peak_target_dbfs)
+        peak = 10 ** (config.peak_target_dbfs / 20.0)
+    if spec is not None and spec.peak_dbfs is not None and peak > 0.0:
+        gain_db += min(0.0, compute_peak_gain_db(peak, spec.peak_dbfs))
+    return gain_db
@@ -0,0 +1,168 @@
+"""
+Process-pool track rendering for the full-memory render path.
+
+Track processing is pydub and Python-level work that holds the GIL, so
+tracks are rendered in worker processes. Each worker writes its finished
+track PCM into a shared-memory block and returns only the block's name and
+format; the parent copies the PCM out once instead of unpickling it.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydub import AudioSegment
+
+from audio_engine.utils.clip_cache import configure_clip_cache
+from audio_engine.utils.logger import get_logger
+from audio_engine.utils.stem_cache import StemCache
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SharedTrackBuffer:
+    """Handle to a rendered track's PCM held in shared memory."""
+    name: str
+    nbytes: int
+    frame_rate: int
+    channels: int
+    sample_width: int
+
+
+# One TrackMixer per worker process, built on first use
+_worker_mixer = None
+
+
+def _get_worker_mixer():
+    global _worker_mixer
+    if _worker_mixer is None:
+        from audio_engine.renderer.clip_processor import ClipProcessor
+        from audio_engine.renderer.track_mixer import TrackMixer
+        _worker_mixer = TrackMixer(ClipProcessor())
+    return _worker_mixer
+
+
+def render_track_to_shared_memory(
+    track: Dict,
+    project_duration: float,
+    role_ranges: Optional[Dict[str, List[Tuple[float, float]]]],
+    default_ducking: Optional[Dict],
+    default_compression: Optional[Dict],
+    stem_cache_args: Optional[Tuple[str, bool]] = None,
+) -> SharedTrackBuffer:
+    """Worker entry point: render one track and publish its PCM."""
+    track_buffer = _get_worker_mixer().process_track(
+        track=track,
+        project_duration=project_duration,
+        role_ranges=role_ranges,
+        default_ducking=default_ducking,
+        default_compression=default_compression,
+        stem_cache=StemCache(*stem_cache_args) if stem_cache_args else None,
+    )
+
+    raw = track_buffer.raw_data
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(raw)))
+    try:
+        shm.buf[:len(raw)] = raw
+        handle = SharedTrackBuffer(
+            name=shm.name,
+            nbytes=len(raw),
+            frame_rate=track_buffer.frame_rate,
+            channels=track_buffer.channels,
+            sample_width=track_buffer.sample_width,
+        )
+    finally:
+        shm.close()
+
+    # The parent owns the block from here on; stop this process's resource
+    # tracker from unlinking it when the worker exits.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return handle
+
+
+def take_shared_track_buffer(handle: SharedTrackBuffer) -> AudioSegment:
+    """Copy a worker's track PCM into an AudioSegment and free the block."""
+    shm = shared_memory.SharedMemory(name=handle.name)
+    try:
+        data = bytes(shm.buf[:handle.nbytes])
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return AudioSegment(
+        data=data,
+        sample_width=handle.sample_width,
+        frame_rate=handle.frame_rate,
+        channels=handle.channels,
+    )
+
+
+def default_track_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+class ParallelTrackRenderer:
+    """Renders a timeline's tracks on a process pool."""
+
+    def __init__(self, max_workers: Optional[int] = None, clip_cache: Optional[Dict] = None):
+        self.max_workers = max(1, max_workers or default_track_workers())
+        # settings["clip_cache"], applied in each worker
+        self.clip_cache = clip_cache
+
+    def render_tracks(
+        self,
+        tracks: List[Dict],
+        project_duration: float,
+        role_ranges: Optional[Dict[str, List[Tuple[float, float]]]] = None,
+        default_ducking: Optional[Dict] = None,
+        default_compression: Optional[Dict] = None,
+        stem_cache: Optional[StemCache] = None,
+    ) -> Iterator[Tuple[Dict, Optional[AudioSegment]]]:
+        """
+        Submit every track, then yield (track, buffer) in timeline order so
+        the caller mixes in the same order as a serial render. A track that
+        failed yields None as its buffer.
+        """
+        workers = min(self.max_workers, max(1, len(tracks)))
+        # Workers open the same stem directory; the cache object itself holds a lock
+        stem_cache_args = (stem_cache.root, stem_cache.auto) if stem_cache is not None else None
+        logger.info(f"Rendering {len(tracks)} tracks on {workers} worker processes")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=configure_clip_cache,
+            initargs=(self.clip_cache,),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    render_track_to_shared_memory,
+                    track,
+                    project_duration,
+                    role_ranges,
+                    default_ducking,
+                    default_compression,
+                    stem_cache_args,
+                )
+                for track in tracks
+            ]
+
+            pending = list(zip(tracks, futures))
+            try:
+                while pending:
+                    track, future = pending.pop(0)
+                    try:
+                        handle = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to process track '{track.get('id', 'unknown')}' in worker: {e}")
+                        yield track, None
+                        continue
+                    yield track, take_shared_track_buffer(handle)
+            finally:
+                # Caller stopped early: free blocks for tracks it never took
+                for _, future in pending:
+                    try:
+                        take_shared_track_buffer(future.result())
+                    except Exception:
+                        pass
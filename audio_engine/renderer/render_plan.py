@@ -0,0 +1,153 @@
+"""
+Render plans: the cached result of a render's front end.
+
+Before any audio is processed, a render loads the timeline, expands scenes,
+fixes overlaps, validates, probes every file's duration, computes ducking
+role ranges and (for streaming) indexes clips for the chunk scheduler. All
+of that is a pure function of the timeline JSON and the files it reads, so
+the result is pickled under a hash of both and the engine version, and
+loaded on the next render of the same timeline instead of being recomputed.
+
+Plans are pickles, so the cache directory must be private to the current
+user (see audio_engine.utils.cache_dir).
+"""
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional, Tuple
+
+from audio_engine import __version__
+from audio_engine.exceptions import FileError
+from audio_engine.renderer.sub_timelines import timeline_files
+from audio_engine.utils.cache_dir import ensure_private_dir, user_cache_dir
+from audio_engine.utils.hashing import content_key
+from audio_engine.utils.logger import get_logger
+from audio_engine.utils.metadata import file_identity
+
+logger = get_logger(__name__)
+
+PLAN_VERSION = 1
+DEFAULT_MAX_PLANS = 256
+
+
+@dataclass
+class RenderPlan:
+    # Timeline after scene expansion and overlap fixes
+    timeline: Dict
+    warnings: List[str] = field(default_factory=list)
+    role_ranges: Optional[Dict[str, List[Tuple[float, float]]]] = None
+    # Probed duration of every clip file (None if unreadable)
+    durations: Dict[str, Optional[float]] = field(default_factory=dict)
+    # Start-sorted clip index for streaming renders
+    scheduler: Optional[object] = None
+
+
+def default_plan_dir() -> str:
+    return user_cache_dir("plans")
+
+
+def render_plan_key(timeline: Dict, streaming: bool) -> str:
+    """Hash of a loaded timeline, the identity of its files, the render path and the engine version."""
+    payload = {
+        "version": PLAN_VERSION,
+        "engine_version": __version__,
+        "streaming": streaming,
+        "timeline": timeline,
+        "files": {path: file_identity(path) for path in timeline_files(timeline)},
+    }
+    return content_key(payload)
+
+
+class RenderPlanCache:
+    """
+    Directory of pickled plans, keeping the most recently used `max_plans`.
+    Raises FileError if `root` is not private to the current user.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_plans: int = DEFAULT_MAX_PLANS):
+        self.root = ensure_private_dir(root or default_plan_dir())
+        self.max_plans = max(1, int(max_plans))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.plan")
+
+    def get(self, key: str) -> Optional[RenderPlan]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                plan = pickle.load(f)
+            # A plan pickled by other code can load cleanly and still lack fields the render reads
+            if not isinstance(plan, RenderPlan) or any(f.name not in vars(plan) for f in fields(RenderPlan)):
+                raise pickle.UnpicklingError(f"not a current RenderPlan ({type(plan).__name__})")
+            os.utime(path)  # mtime orders eviction
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable render plan {path}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return plan
+
+    def put(self, key: str, plan: RenderPlan) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning(f"Failed to write render plan {key}: {e}")
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".plan"):
+                continue
+            full = os.path.join(self.root, name)
+            try:
+                entries.append((os.stat(full).st_mtime_ns, full))
+            except OSError:
+                continue
+        for _, full in sorted(entries)[:max(0, len(entries) - self.max_plans)]:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_caches: Dict[Tuple[str, int], RenderPlanCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_render_plan_cache(cache_cfg: Optional[Dict]) -> Optional[RenderPlanCache]:
+    """
+    Process-wide cache for a settings["plan_cache"] block ({"enabled", "dir",
+    "max_plans"}), or None when it is absent or disabled, or its directory is
+    not private.
+    """
+    if not cache_cfg or not cache_cfg.get("enabled"):
+        return None
+    root = cache_cfg.get("dir") or default_plan_dir()
+    max_plans = int(cache_cfg.get("max_plans", DEFAULT_MAX_PLANS))
+    with _caches_lock:
+        cache = _caches.get((root, max_plans))
+        if cache is None:
+            try:
+                cache = RenderPlanCache(root, max_plans)
+            except FileError as e:
+                logger.warning(f"Render plan cache disabled: {e}")
+                return None
+            _caches[(root, max_plans)] = cache
+        return cache
@@ -0,0 +1,62 @@
+"""
+Stem export: per-role or per-track bus outputs written alongside the master.
+
+With settings["stem_export"] enabled, a render also writes one WAV per stem
+next to its output (or into "dir"):
+
+    "stem_export": {"enabled": true, "group_by": "role", "dir": "output/stems"}
+
+`group_by` is "role" (dialogue, music, ambience, sfx; other roles keep their
+name) or "track" (one stem per track id). A stem is the sum of its tracks'
+buffers as they enter the bus mix, after track DSP and ducking and before
+scene EQ and the master chain, so the stems add up to the pre-master mix.
+They come from the same pass that renders the master.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from audio_engine.exceptions import TimelineError
+
+# Stem names for mix roles; tracks without a role go to "other"
+ROLE_STEM_NAMES = {
+    "voice": "dialogue",
+    "music": "music",
+    "background": "ambience",
+    "sfx": "sfx",
+}
+
+
+def stem_groups(tracks: List[Dict], group_by: str = "role") -> Dict[str, str]:
+    """{track id: stem name} for every track."""
+    if group_by == "track":
+        return {track.get("id", "unknown"): track.get("id", "unknown") for track in tracks}
+    if group_by != "role":
+        raise TimelineError(f"Unknown stem_export group_by '{group_by}' (expected 'role' or 'track')")
+    groups = {}
+    for track in tracks:
+        role = track.get("role") or "other"
+        groups[track.get("id", "unknown")] = ROLE_STEM_NAMES.get(role, role)
+    return groups
+
+
+def stem_export_paths(output_path: str, names, directory: Optional[str] = None) -> Dict[str, str]:
+    """{stem name: path}: `<output base>.<stem>.wav` next to the output or in `directory`."""
+    base = os.path.splitext(os.path.basename(output_path))[0]
+    directory = directory or os.path.dirname(output_path)
+    return {name: os.path.join(directory, f"{base}.{name}.wav") for name in sorted(set(names))}
+
+
+def stem_exports_for(
+    export_cfg: Optional[Dict],
+    tracks: List[Dict],
+    output_path: str,
+) -> Optional[Tuple[Dict[str, str], Dict[str, str]]]:
+    """
+    ({track id: stem name}, {stem name: path}) for a render, or None when
+    stem export is off.
+    """
+    if not export_cfg:
+        return None
+    groups = stem_groups(tracks, export_cfg.get("group_by", "role"))
+    paths = stem_export_paths(output_path, groups.values(), export_cfg.get("dir"))
+    return groups, paths
@@ -0,0 +1,134 @@
+"""
+Sub-timelines: clips whose source is another timeline JSON.
+
+A clip whose "file" is a .json timeline is rendered through TimelineRenderer
+and replaced by the rendered WAV before the parent render starts. The
+scheduler, clip processor and validation then see an ordinary asset, and the
+clip's gain, fades and ducking apply as usual. Renders are cached under a
+hash of the sub-timeline's content, the identity of every file it reads and
+the engine and resolved EQ preset versions, so a sting shared by every
+episode is rendered once. Cached renders are mixed into other renders as
+they are, so the cache directory must be private to the current user.
+"""
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from audio_engine import __version__
+from audio_engine.exceptions import TimelineError
+from audio_engine.utils.cache_dir import ensure_private_dir, user_cache_dir
+from audio_engine.utils.hashing import content_key, preset_versions
+from audio_engine.utils.logger import get_logger
+from audio_engine.utils.metadata import file_identity
+
+logger = get_logger(__name__)
+
+SUB_TIMELINE_VERSION = 1
+
+
+def default_sub_timeline_dir() -> str:
+    return user_cache_dir("timelines")
+
+
+def is_sub_timeline(path) -> bool:
+    return isinstance(path, str) and path.lower().endswith(".json")
+
+
+def timeline_clips(timeline: Dict) -> Iterator[Dict]:
+    """Clips on tracks and in scene blocks."""
+    for track in timeline.get("tracks", []) or []:
+        yield from track.get("clips", []) or []
+    for scene in timeline.get("scenes", []) or []:
+        for clips in (scene.get("tracks") or {}).values():
+            yield from clips or []
+
+
+def timeline_files(timeline: Dict) -> List[str]:
+    """Sorted file paths read by a timeline's clips, including scene clips."""
+    return sorted({clip["file"] for clip in timeline_clips(timeline) if clip.get("file")})
+
+
+def sub_timeline_key(timeline: Dict) -> str:
+    """Hash of a (resolved) timeline, the files its clips read and the engine and preset versions."""
+    payload = {
+        "version": SUB_TIMELINE_VERSION,
+        "engine_version": __version__,
+        "presets": preset_versions(),
+        "timeline": timeline,
+        "files": {path: file_identity(path) for path in timeline_files(timeline)},
+    }
+    return content_key(payload)
+
+
+def render_sub_timeline(path: str, cache_dir: str, _stack: Tuple[str, ...] = ()) -> str:
+    """
+    Path of the rendered WAV for the timeline at `path`, rendering it if not
+    cached. Raises FileError if `cache_dir` is not private to the current user.
+    """
+    from audio_engine.config import RenderConfig
+    from audio_engine.renderer.output_manifest import output_manifest_path
+    from audio_engine.renderer.timeline_renderer import TimelineRenderer
+
+    abspath = os.path.abspath(path)
+    if abspath in _stack:
+        chain = " -> ".join(_stack + (abspath,))
+        raise TimelineError(f"Sub-timeline cycle: {chain}")
+
+    timeline = TimelineRenderer.load_timeline(path)
+    # Only the rendered mix is used; stems and extra outputs would be left behind in the cache
+    for key in ("stem_export", "outputs"):
+        timeline.get("settings", {}).pop(key, None)
+    resolve_sub_timelines(timeline, cache_dir, _stack + (abspath,))
+
+    key = sub_timeline_key(timeline)
+    # Before trusting an existing render: nobody else may have written it
+    ensure_private_dir(cache_dir)
+    output_path = os.path.join(cache_dir, f"{key}.wav")
+    if os.path.exists(output_path):
+        logger.debug(f"Sub-timeline {path} already rendered: {output_path}")
+        return output_path
+
+    tmp_base = f"{output_path}.{os.getpid()}.{threading.get_ident()}"
+    tmp_timeline, tmp_output = f"{tmp_base}.json", f"{tmp_base}.tmp.wav"
+    with open(tmp_timeline, "w", encoding="utf-8") as f:
+        json.dump(timeline, f)
+
+    renderer = TimelineRenderer()
+    try:
+        if RenderConfig.from_timeline_settings(timeline.get("settings", {})).streaming_enabled:
+            renderer.render_streaming(tmp_timeline, tmp_output)
+        else:
+            renderer.render(tmp_timeline, tmp_output)
+        # Rename into place, so a concurrent render never reads a partial file
+        os.replace(tmp_output, output_path)
+    finally:
+        for leftover in (tmp_timeline, tmp_output, output_manifest_path(tmp_output)):
+            try:
+                os.remove(leftover)
+            except OSError:
+                pass
+
+    logger.info(f"Rendered sub-timeline {path} -> {output_path}")
+    return output_path
+
+
+def resolve_sub_timelines(
+    timeline: Dict,
+    cache_dir: Optional[str] = None,
+    _stack: Tuple[str, ...] = (),
+) -> Dict:
+    """
+    Replace every sub-timeline clip source with its rendered WAV.
+    Mutates and returns timeline.
+    """
+    cache_dir = cache_dir or default_sub_timeline_dir()
+    rendered: Dict[str, str] = {}
+    for clip in timeline_clips(timeline):
+        path = clip.get("file")
+        if not is_sub_timeline(path):
+            continue
+        if path not in rendered:
+            rendered[path] = render_sub_timeline(path, cache_dir, _stack)
+        clip["file"] = rendered[path]
+    return timeline
@@ -2,10 +2,15 @@
 TimelineRenderer orchestrates the entire rendering pipeline.
 """
 import os
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple, Optional
 from pydub import AudioSegment
 
 from audio_engine.utils.logger import get_logger, log_performance
+from audio_engine.utils.asset_cache import get_asset_cache
+from audio_engine.utils.clip_cache import configure_clip_cache
+from audio_engine.utils.stem_cache import StemCache, stem_cache_for
+from audio_engine.utils.metadata import get_metadata_provider, timeline_audio_files
 from audio_engine.validation import validate_timeline
 from audio_engine.scene_preprocessor import preprocess_scenes
 from audio_engine.autofix import auto_fix_overlaps
@@ -14,21 +19,63 @@ from audio_engine.config import RenderConfig
 from audio_engine.renderer.clip_processor import ClipProcessor
 from audio_engine.renderer.track_mixer import TrackMixer
 from audio_engine.renderer.master_processor import MasterProcessor
+from audio_engine.renderer.parallel_tracks import ParallelTrackRenderer
+from audio_engine.renderer.sub_timelines import resolve_sub_timelines, timeline_files
+from audio_engine.renderer.output_manifest import output_is_current, render_inputs, write_output_manifest
+from audio_engine.renderer.render_plan import RenderPlan, get_render_plan_cache, render_plan_key
+from audio_engine.renderer.stem_export import stem_exports_for
+from audio_engine.renderer.outputs import OutputSpec, output_specs, render_output, streaming_gain_db
+from audio_engine.renderer.variants import (
+    VARIANT_PLACEHOLDER,
+    apply_variant,
+    duck_stem,
+    shared_track_key,
+    track_ducking,
+    variant_names,
+)
+from audio_engine.streaming.asset_store import get_asset_store
+from audio_engine.streaming.chunk_cache import get_chunk_cache
+from audio_engine.streaming.autotune import tune_streaming
 from audio_engine.streaming.clip_scheduler import ClipScheduler
 from audio_engine.streaming.chunk_processor import ChunkProcessor
-from audio_engine.streaming.stream_writer import StreamWriter
+from audio_engine.streaming.stream_writer import (
+    StreamWriter,
+    close_writers,
+    export_segment,
+    open_stream_writer,
+    output_format,
+)
+from audio_engine.streaming.pipeline import run_pipeline
+from audio_engine.streaming.incremental import (
+    load_manifest as load_render_manifest,
+    manifest_path_for,
+    premix_path_for,
+    render_incremental_mix,
+)
+from audio_engine.streaming.sharded import chunk_windows, iter_wav_windows, render_sharded_mix
 from audio_engine.streaming.loudness import (
     measure_lufs_from_file,
     compute_lufs_gain_db,
     StreamingPeakEstimator,
     compute_peak_gain_db,
 )
+from audio_engine.dsp.ducking import DuckingPlanner
 from audio_engine.dsp.eq import apply_scene_tonal_shaping
+from audio_engine.dsp.streaming_eq import SceneTonalShaper
+from audio_engine.dsp.sidechain import (
+    SidechainDucker,
+    build_sidechain_routes,
+    is_sidechain_mode,
+    sidechain_duck_offline,
+)
 from audio_engine.dsp.fade_curves import FadeCurve
 from audio_engine.dsp.fades import apply_fade_out
 
 logger = get_logger(__name__)
 
+# Receives progress events during a render; raise RenderCancelled to stop it
+ProgressCallback = Callable[[Dict], None]
+
 
 class TimelineRenderer:
     """Main orchestrator for the audio rendering pipeline."""
@@ -50,6 +97,11 @@ class TimelineRenderer:
         self.clip_processor = clip_processor or ClipProcessor()
         self.track_mixer = track_mixer or TrackMixer(self.clip_processor)
         self.master_processor = master_processor or MasterProcessor()
+        # Worker processes build their own default components, so injected
+        # ones can only be honoured by the serial path.
+        self._default_components = clip_processor is None and track_mixer is None
+        # Output manifests only describe renders by the stock components
+        self._writes_manifest = self._default_components and master_processor is None
     
     @staticmethod
     def load_timeline(path: str) -> Dict:
@@ -85,6 +137,10 @@ class TimelineRenderer:
         """
         role_ranges: Dict[str, List[Tuple[float, float]]] = {}
         
+        # Durations come from file headers (shared cache), not full decodes
+        metadata = get_metadata_provider()
+        metadata.prefetch(timeline_audio_files({"tracks": tracks}))
+        
         for track in tracks:
             role = track.get("role")  # mix_role
             if not role:
@@ -98,43 +154,92 @@ class TimelineRenderer:
                     logger.warning(f"Skipping clip without file or start time in track role '{role}'")
                     continue
                 
-                try:
-                    start = clip.get("start", 0)
-                    audio = AudioSegment.from_file(clip["file"])
-                    duration = len(audio) / 1000.0
-                    end = start + duration
-                    
-                    # Add mix role range
-                    role_ranges.setdefault(role, []).append((start, end))
-                    
-                    # If SFX track with semantic role, also add semantic role range
-                    if role == "sfx":
-                        # Clip-level semantic_role overrides track-level
-                        clip_semantic_role = clip.get("semantic_role", track_semantic_role)
-                        if clip_semantic_role:
-                            semantic_role_key = f"sfx:{clip_semantic_role}"
-                            role_ranges.setdefault(semantic_role_key, []).append((start, end))
-                            
-                except FileNotFoundError:
-                    logger.warning(f"Audio file not found for role range calculation: {clip['file']}")
-                    continue
-                except Exception as e:
-                    logger.warning(f"Failed to load audio file for role range: {clip.get('file', 'unknown')}: {e}")
+                start = clip.get("start", 0)
+                duration = metadata.duration(clip["file"])
+                if duration is None:
+                    logger.warning(f"Audio file not found or unreadable for role range calculation: {clip['file']}")
                     continue
+                end = start + duration
+                
+                # Add mix role range
+                role_ranges.setdefault(role, []).append((start, end))
+                
+                # If SFX track with semantic role, also add semantic role range
+                if role == "sfx":
+                    # Clip-level semantic_role overrides track-level
+                    clip_semantic_role = clip.get("semantic_role", track_semantic_role)
+                    if clip_semantic_role:
+                        semantic_role_key = f"sfx:{clip_semantic_role}"
+                        role_ranges.setdefault(semantic_role_key, []).append((start, end))
         
         return role_ranges
     
-    @log_performance
-    def render(self, timeline_path: str, output_path: str) -> None:
+    def _render_tracks_serial(
+        self,
+        tracks: List[Dict],
+        duration: float,
+        role_ranges: Optional[Dict[str, List[Tuple[float, float]]]],
+        default_ducking: Optional[Dict],
+        default_compression: Optional[Dict],
+        prerendered: Dict[str, AudioSegment],
+        stem_cache: Optional[StemCache] = None,
+    ):
         """
-        Render timeline to output audio file.
-        
-        Args:
-            timeline_path: Path to timeline JSON file
-            output_path: Path to output WAV file
+        Yield (track, buffer) one track at a time, reusing any buffers that
+        were already rendered. A track that fails yields None.
         """
-        logger.info(f"Starting render: {timeline_path} -> {output_path}")
-        
+        for track in tracks:
+            track_id = track.get("id", "unknown")
+            if track_id in prerendered:
+                yield track, prerendered[track_id]
+                continue
+            try:
+                track_buffer = self.track_mixer.process_track(
+                    track=track,
+                    project_duration=duration,
+                    role_ranges=role_ranges,
+                    default_ducking=default_ducking,
+                    default_compression=default_compression,
+                    **self._stem_cache_kwargs(stem_cache)
+                )
+            except Exception as e:
+                logger.error(f"Failed to process track '{track_id}': {e}")
+                track_buffer = None
+            yield track, track_buffer
+
+    @staticmethod
+    def _stem_cache_kwargs(stem_cache: Optional[StemCache]) -> Dict:
+        """process_track kwargs for `stem_cache`; none without one, for mixers predating the parameter."""
+        return {"stem_cache": stem_cache} if stem_cache is not None else {}
+
+    @staticmethod
+    def _apply_offline_sidechain(
+        track_id: str,
+        track_buffer: AudioSegment,
+        routes: List,
+        key_buffers: Dict[str, AudioSegment],
+        ducking_cfg: Dict,
+    ) -> AudioSegment:
+        """Duck a full-length track buffer against every sidechain rule that targets it."""
+        for route in routes:
+            if track_id not in route.target_track_ids:
+                continue
+            keys = [key_buffers[tid] for tid in route.trigger_track_ids if tid in key_buffers]
+            if not keys:
+                continue
+            key = keys[0]
+            for other in keys[1:]:
+                key = key.overlay(other)
+            try:
+                ducker = SidechainDucker.from_config(ducking_cfg, track_buffer.frame_rate)
+                track_buffer = sidechain_duck_offline(key, track_buffer, ducker)
+                logger.debug(f"Applied sidechain ducking to track '{track_id}' (when: {route.when})")
+            except Exception as e:
+                logger.warning(f"Failed to apply sidechain ducking to track '{track_id}': {e}")
+        return track_buffer
+    
+    def _load_resolved(self, timeline_path: str) -> Dict:
+        """Load a timeline and replace sub-timeline clip sources with their renders."""
         # Load timeline
         try:
             timeline = self.load_timeline(timeline_path)
@@ -143,6 +248,74 @@ class TimelineRenderer:
             logger.error(f"Failed to load timeline: {e}")
             raise
         
+        # Render clips sourced from other timelines and use the results as assets
+        try:
+            resolve_sub_timelines(timeline, timeline.get("settings", {}).get("sub_timelines", {}).get("dir"))
+        except Exception as e:
+            logger.error(f"Sub-timeline rendering failed: {e}")
+            raise
+        return timeline
+    
+    @staticmethod
+    def _extra_outputs(
+        config: RenderConfig,
+        timeline: Dict,
+        output_path: str,
+    ) -> Tuple[Optional[Tuple[Dict[str, str], Dict[str, str]]], List[OutputSpec], List[str]]:
+        """Stem exports, extra output specs and every extra file a render to `output_path` writes."""
+        stem_exports = stem_exports_for(config.stem_export, timeline["tracks"], output_path)
+        specs = output_specs(config.outputs, output_path)
+        extra_paths = sorted(stem_exports[1].values()) if stem_exports else []
+        extra_paths += [spec.path for spec in specs]
+        return stem_exports, specs, extra_paths
+    
+    def _output_up_to_date(
+        self,
+        output_path: str,
+        inputs: Dict,
+        assets: List[str],
+        force: bool,
+        extra_outputs: Optional[List[str]] = None,
+    ) -> bool:
+        """True if the manifest next to `output_path` shows it was rendered from these inputs."""
+        if force or not self._writes_manifest:
+            return False
+        if output_is_current(output_path, inputs, assets, extra_outputs or ()):
+            logger.info(f"Output is up to date, skipping render: {output_path} (force to re-render)")
+            return True
+        return False
+    
+    def prepare(
+        self,
+        timeline_path: str,
+        streaming: bool = False,
+        timeline: Optional[Dict] = None,
+    ) -> RenderPlan:
+        """
+        Run the render front end: load the timeline, render sub-timelines,
+        expand scenes, fix overlaps, validate, probe durations and compute
+        ducking role ranges (plus the clip index for streaming renders).
+        
+        `timeline`, if given, is the already loaded and resolved timeline.
+        With settings["plan_cache"] enabled, the result is cached under a
+        hash of the timeline and its files and reused while both are unchanged.
+        """
+        if timeline is None:
+            timeline = self._load_resolved(timeline_path)
+        
+        config = RenderConfig.from_timeline_settings(timeline.get("settings", {}))
+        plan_cache = get_render_plan_cache(config.plan_cache)
+        plan_key = None
+        if plan_cache is not None:
+            plan_key = render_plan_key(timeline, streaming)
+            plan = plan_cache.get(plan_key)
+            if plan is not None:
+                logger.debug(f"Loaded cached render plan {plan_key}")
+                get_metadata_provider().seed(plan.durations)
+                for w in plan.warnings:
+                    logger.warning(f"⚠ {w}")
+                return plan
+        
         # Scene Preprocessing
         try:
             timeline = preprocess_scenes(timeline)
@@ -151,6 +324,10 @@ class TimelineRenderer:
             logger.error(f"Scene preprocessing failed: {e}")
             raise TimelineError(f"Scene preprocessing failed: {e}")
         
+        # Probe every referenced file's header once, concurrently
+        metadata = get_metadata_provider()
+        metadata.prefetch(timeline_audio_files(timeline))
+        
         # Auto-fix overlaps
         settings = timeline.get("settings", {})
         min_gap = settings.get("default_silence", 0.0)
@@ -166,42 +343,71 @@ class TimelineRenderer:
         for w in warnings:
             logger.warning(f"⚠ {w}")
         
-        # Debug timeline print
-        from audio_engine.utils.debug import debug_print_timeline
-        debug_print_timeline(timeline)
-        
-        # Extract settings
-        duration = timeline["project"]["duration"]
-        default_ducking = settings.get("ducking")
-        default_compression = settings.get("dialogue_compression")
-
-        config = RenderConfig.from_timeline_settings(settings)
-        
-        # Calculate role ranges for ducking
+        # Calculate role ranges for ducking (sidechain mode keys off the rendered tracks instead)
         role_ranges = None
-        if default_ducking and default_ducking.get("enabled"):
+        default_ducking = settings.get("ducking")
+        if default_ducking and default_ducking.get("enabled") and not is_sidechain_mode(default_ducking):
             try:
                 role_ranges = self.get_role_ranges(timeline["tracks"])
                 logger.debug("Role ranges calculated for ducking")
             except Exception as e:
                 logger.warning(f"Failed to calculate role ranges, ducking may not work: {e}")
         
+        plan = RenderPlan(
+            timeline=timeline,
+            warnings=warnings,
+            role_ranges=role_ranges,
+            durations={path: metadata.duration(path) for path in set(timeline_audio_files(timeline))},
+            scheduler=ClipScheduler(timeline) if streaming else None,
+        )
+        if plan_cache is not None:
+            plan_cache.put(plan_key, plan)
+        return plan
+    
+    def _mix_and_export(
+        self,
+        rendered,
+        track_count: int,
+        duration: float,
+        settings: Dict,
+        output_path: str,
+        sidechain_routes: List,
+        key_buffers: Dict[str, AudioSegment],
+        default_ducking: Optional[Dict],
+        progress: Optional[ProgressCallback] = None,
+        stem_exports: Optional[Tuple[Dict[str, str], Dict[str, str]]] = None,
+        specs: Optional[List[OutputSpec]] = None,
+    ) -> None:
+        """
+        Overlay rendered (track, buffer) pairs in order, then apply scene EQ
+        and the master chain and export the result to `output_path`. With
+        `stem_exports` ({track id: stem}, {stem: path}), each stem's tracks are
+        also summed and exported as they enter the mix. Each of `specs` is
+        mastered from the same pre-master mix, in parallel with the main output.
+        """
+        sidechain = bool(sidechain_routes)
+        
         # Create canvas
         canvas = self.create_canvas(duration)
         logger.debug(f"Created canvas of {duration}s duration")
+        stems = {name: self.create_canvas(duration) for name in stem_exports[1]} if stem_exports else {}
         
-        # Process tracks
-        for track in timeline["tracks"]:
+        # Mix tracks
+        for done, (track, track_buffer) in enumerate(rendered, start=1):
             try:
-                track_buffer = self.track_mixer.process_track(
-                    track=track,
-                    project_duration=duration,
-                    role_ranges=role_ranges,
-                    default_ducking=default_ducking,
-                    default_compression=default_compression
-                )
+                track_id = track.get("id", "unknown")
+                if sidechain and track_buffer is not None:
+                    track_buffer = self._apply_offline_sidechain(
+                        track_id, track_buffer, sidechain_routes, key_buffers, default_ducking
+                    )
                 # Only overlay if track_buffer is valid
                 if track_buffer is not None:
+                    if stems and track_id in stem_exports[0]:
+                        name = stem_exports[0][track_id]
+                        try:
+                            stems[name] = stems[name].overlay(track_buffer)
+                        except Exception as e:
+                            logger.error(f"Failed to mix track '{track_id}' into stem '{name}': {e}")
                     try:
                         canvas = canvas.overlay(track_buffer)
                         # Validate overlay returned valid canvas
@@ -220,6 +426,13 @@ class TimelineRenderer:
                 if canvas is None:
                     canvas = self.create_canvas(duration)
                 # Continue with other tracks
+            if progress is not None:
+                progress({
+                    "stage": "track",
+                    "track": track.get("id", "unknown"),
+                    "done": done,
+                    "total": track_count,
+                })
         
         # Validate canvas before scene EQ
         if canvas is None:
@@ -245,6 +458,11 @@ class TimelineRenderer:
         
         # Master processing
         config = RenderConfig.from_timeline_settings(settings)
+        extra_pool = ThreadPoolExecutor(max_workers=len(specs)) if specs else None
+        extra_futures = [
+            (spec, extra_pool.submit(render_output, canvas, spec, config, self.master_processor))
+            for spec in specs or []
+        ]
         try:
             canvas = self.master_processor.process(canvas, config)
             # Validate master processing returned valid canvas
@@ -262,30 +480,343 @@ class TimelineRenderer:
             output_dir = os.path.dirname(output_path)
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
-            canvas.export(output_path, format="wav")
+            if output_format(output_path) == "wav":
+                canvas.export(output_path, format="wav")
+            else:
+                export_segment(canvas, output_path)
             logger.info(f"Audio exported successfully to {output_path}")
         except Exception as e:
             logger.error(f"Failed to export audio to {output_path}: {e}")
             raise FileError(f"Failed to export audio to {output_path}: {e}")
+        finally:
+            if extra_pool is not None:
+                extra_pool.shutdown(wait=True)
+        
+        for spec, future in extra_futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Failed to render output '{spec.name}' to {spec.path}: {e}")
+                raise FileError(f"Failed to render output '{spec.name}' to {spec.path}: {e}")
+        
+        for name, stem in stems.items():
+            stem_path = stem_exports[1][name]
+            try:
+                stem_dir = os.path.dirname(stem_path)
+                if stem_dir:
+                    os.makedirs(stem_dir, exist_ok=True)
+                stem.export(stem_path, format="wav")
+                logger.info(f"Stem '{name}' exported to {stem_path}")
+            except Exception as e:
+                logger.error(f"Failed to export stem '{name}' to {stem_path}: {e}")
+                raise FileError(f"Failed to export stem '{name}' to {stem_path}: {e}")
+    
+    @log_performance
+    def render(
+        self,
+        timeline_path: str,
+        output_path: str,
+        progress: Optional[ProgressCallback] = None,
+        force: bool = False,
+    ) -> None:
+        """
+        Render timeline to output audio file.
+        
+        Args:
+            timeline_path: Path to timeline JSON file
+            output_path: Path to output audio file (WAV, or a compressed
+                format such as .flac or .mp3 from its extension)
+            progress: Optional callback, called with a
+                {"stage": "track", "track", "done", "total"} event after each
+                track is mixed
+            force: Render even if the output's manifest shows it is up to date
+        """
+        logger.info(f"Starting render: {timeline_path} -> {output_path}")
+        
+        timeline = self._load_resolved(timeline_path)
+        manifest_config = RenderConfig.from_timeline_settings(timeline.get("settings", {}))
+        manifest_inputs = render_inputs(timeline, manifest_config, False)
+        assets = timeline_files(timeline)
+        stem_exports, specs, extra_paths = self._extra_outputs(manifest_config, timeline, output_path)
+        if self._output_up_to_date(output_path, manifest_inputs, assets, force, extra_paths):
+            return
+        
+        # Front end: scenes, overlap fixes, validation, role ranges
+        plan = self.prepare(timeline_path, timeline=timeline)
+        timeline = plan.timeline
+        settings = timeline.get("settings", {})
+        
+        # Debug timeline print
+        from audio_engine.utils.debug import debug_print_timeline
+        debug_print_timeline(timeline)
+        
+        # Extract settings
+        duration = timeline["project"]["duration"]
+        default_ducking = settings.get("ducking")
+        default_compression = settings.get("dialogue_compression")
+
+        config = RenderConfig.from_timeline_settings(settings)
+        if config.clip_cache:
+            configure_clip_cache(config.clip_cache)
+        
+        # Role ranges for ducking (sidechain mode keys off the rendered tracks instead)
+        role_ranges = plan.role_ranges
+        sidechain = is_sidechain_mode(default_ducking)
+        
+        tracks = timeline["tracks"]
+        stem_cache = None
+        if self._default_components:
+            stem_cache = stem_cache_for(config.track_freeze, tracks, output_path)
+        elif (config.track_freeze or {}).get("enabled") or any(track.get("freeze") for track in tracks):
+            # Stem keys only describe buffers rendered by the stock components
+            logger.warning("Custom clip processor/track mixer injected, rendering without stored stems")
+        use_pool = config.parallel_tracks_enabled and len(tracks) > 1
+        if use_pool and not self._default_components:
+            logger.warning("Custom clip processor/track mixer injected, rendering tracks serially")
+            use_pool = False
+        
+        sidechain_routes = []
+        key_buffers: Dict[str, AudioSegment] = {}
+        trigger_ids = set()
+        if sidechain:
+            sidechain_routes = build_sidechain_routes(default_ducking, tracks)
+            trigger_ids = {tid for route in sidechain_routes for tid in route.trigger_track_ids}
+        
+        if use_pool:
+            rendered = ParallelTrackRenderer(config.parallel_track_workers, config.clip_cache).render_tracks(
+                tracks,
+                project_duration=duration,
+                role_ranges=role_ranges,
+                default_ducking=default_ducking,
+                default_compression=default_compression,
+                stem_cache=stem_cache
+            )
+            if sidechain:
+                # Every buffer must exist before the trigger buses can key the ducking
+                rendered = list(rendered)
+                key_buffers = {
+                    track.get("id", "unknown"): track_buffer
+                    for track, track_buffer in rendered
+                    if track.get("id", "unknown") in trigger_ids and track_buffer is not None
+                }
+        else:
+            # Sidechain: render trigger tracks first so their buffers can key the ducking
+            for track in tracks:
+                track_id = track.get("id", "unknown")
+                if track_id not in trigger_ids:
+                    continue
+                try:
+                    key_buffers[track_id] = self.track_mixer.process_track(
+                        track=track,
+                        project_duration=duration,
+                        role_ranges=role_ranges,
+                        default_ducking=default_ducking,
+                        default_compression=default_compression,
+                        **self._stem_cache_kwargs(stem_cache)
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to process sidechain trigger track '{track_id}': {e}")
+            rendered = self._render_tracks_serial(
+                tracks, duration, role_ranges, default_ducking, default_compression, key_buffers, stem_cache
+            )
+        
+        self._mix_and_export(
+            rendered, len(tracks), duration, settings, output_path,
+            sidechain_routes, key_buffers, default_ducking, progress, stem_exports, specs
+        )
+        
+        if self._writes_manifest:
+            write_output_manifest(output_path, manifest_inputs, assets, extra_paths)
+
+    @log_performance
+    def render_variants(
+        self,
+        timeline_path: str,
+        output_template: str,
+        progress: Optional[ProgressCallback] = None,
+        force: bool = False,
+    ) -> Dict[str, str]:
+        """
+        Render every variant in the timeline's "variants" block (see
+        audio_engine.renderer.variants), one full-memory render per variant.
+        
+        Tracks that are identical in two or more variants are processed once;
+        each variant only applies its own ducking and role loudness to them.
+        
+        Args:
+            timeline_path: Path to timeline JSON file
+            output_template: Output path containing "{variant}"
+            progress: Optional callback, called with the events of render()
+                plus the "variant" they belong to
+            force: Render variants even if their manifests show they are up to date
+        
+        Returns:
+            {variant: output path}
+        """
+        if VARIANT_PLACEHOLDER not in output_template:
+            raise TimelineError(f"Output path must contain {VARIANT_PLACEHOLDER}: {output_template}")
+        logger.info(f"Starting variant render: {timeline_path} -> {output_template}")
+        
+        base = self._load_resolved(timeline_path)
+        outputs = {name: output_template.replace(VARIANT_PLACEHOLDER, name) for name in variant_names(base)}
+        
+        # Front end per variant; skip the ones that are up to date
+        pending = []
+        for name, output_path in outputs.items():
+            timeline = apply_variant(base, name)
+            manifest_config = RenderConfig.from_timeline_settings(timeline.get("settings", {}))
+            manifest_inputs = render_inputs(timeline, manifest_config, False)
+            assets = timeline_files(timeline)
+            stem_exports, specs, extra_paths = self._extra_outputs(manifest_config, timeline, output_path)
+            if self._output_up_to_date(output_path, manifest_inputs, assets, force, extra_paths):
+                continue
+            plan = self.prepare(timeline_path, timeline=timeline)
+            pending.append((name, plan, manifest_inputs, assets, stem_exports, specs, extra_paths))
+        
+        # Tracks that come out the same in several variants
+        key_counts: Dict[str, int] = {}
+        for _, plan, *_ in pending:
+            settings = plan.timeline.get("settings", {})
+            for track in plan.timeline["tracks"]:
+                key = shared_track_key(track, plan.timeline["project"]["duration"], settings.get("dialogue_compression"))
+                key_counts[key] = key_counts.get(key, 0) + 1
+        
+        # Un-ducked stems, and finished stems of shared tracks that no variant ducks
+        dry_stems: Dict[str, AudioSegment] = {}
+        finished_stems: Dict[str, AudioSegment] = {}
+        
+        for name, plan, manifest_inputs, assets, stem_exports, specs, extra_paths in pending:
+            timeline = plan.timeline
+            settings = timeline.get("settings", {})
+            duration = timeline["project"]["duration"]
+            default_ducking = settings.get("ducking")
+            default_compression = settings.get("dialogue_compression")
+            role_ranges = plan.role_ranges
+            
+            config = RenderConfig.from_timeline_settings(settings)
+            if config.clip_cache:
+                configure_clip_cache(config.clip_cache)
+            
+            tracks = timeline["tracks"]
+            planner = DuckingPlanner(role_ranges) if role_ranges else None
+            rendered = []
+            for track in tracks:
+                track_id = track.get("id", "unknown")
+                key = shared_track_key(track, duration, default_compression)
+                ducking = track_ducking(track, default_ducking)
+                try:
+                    if key_counts[key] > 1 and ducking is not None and self._default_components:
+                        track_buffer = self._shared_track_buffer(
+                            track, key, duration, default_compression, ducking, planner, dry_stems, finished_stems
+                        )
+                    else:
+                        track_buffer = self.track_mixer.process_track(
+                            track=track,
+                            project_duration=duration,
+                            role_ranges=role_ranges,
+                            default_ducking=default_ducking,
+                            default_compression=default_compression
+                        )
+                except Exception as e:
+                    logger.error(f"Failed to process track '{track_id}' for variant '{name}': {e}")
+                    track_buffer = None
+                rendered.append((track, track_buffer))
+            
+            sidechain_routes = []
+            key_buffers: Dict[str, AudioSegment] = {}
+            if is_sidechain_mode(default_ducking):
+                sidechain_routes = build_sidechain_routes(default_ducking, tracks)
+                trigger_ids = {tid for route in sidechain_routes for tid in route.trigger_track_ids}
+                key_buffers = {
+                    track.get("id", "unknown"): track_buffer
+                    for track, track_buffer in rendered
+                    if track.get("id", "unknown") in trigger_ids and track_buffer is not None
+                }
+            
+            variant_progress = None
+            if progress is not None:
+                variant_progress = lambda event, name=name: progress({**event, "variant": name})
+            self._mix_and_export(
+                rendered, len(tracks), duration, settings, outputs[name],
+                sidechain_routes, key_buffers, default_ducking, variant_progress, stem_exports, specs
+            )
+            
+            if self._writes_manifest:
+                write_output_manifest(outputs[name], manifest_inputs, assets, extra_paths)
+        
+        logger.info(
+            f"Rendered {len(pending)} of {len(outputs)} variants, "
+            f"{len(dry_stems)} shared track stems"
+        )
+        return outputs
+    
+    def _shared_track_buffer(
+        self,
+        track: Dict,
+        key: str,
+        duration: float,
+        default_compression: Optional[Dict],
+        ducking: Tuple[Optional[Dict], Optional[str]],
+        planner: Optional[DuckingPlanner],
+        dry_stems: Dict[str, AudioSegment],
+        finished_stems: Dict[str, AudioSegment],
+    ) -> AudioSegment:
+        """
+        A track shared by several variants: its clips are processed once,
+        then this variant's ducking and the role loudness are applied.
+        """
+        dry = dry_stems.get(key)
+        if dry is None:
+            dry = self.track_mixer.process_track(
+                track=track,
+                project_duration=duration,
+                default_compression=default_compression,
+                role_loudness=False
+            )
+            dry_stems[key] = dry
+        
+        ducking_cfg, semantic_role = ducking
+        rules = []
+        if planner is not None and ducking_cfg:
+            plan = planner.plan_for(ducking_cfg)
+            rules = plan.rules_for(track.get("role"), semantic_role)
+        if rules:
+            return self.track_mixer.apply_track_loudness(track, duck_stem(dry, plan, rules), duration)
+        
+        if key not in finished_stems:
+            finished_stems[key] = self.track_mixer.apply_track_loudness(track, dry, duration)
+        return finished_stems[key]
 
     @log_performance
-    def render_streaming(self, timeline_path: str, output_path: str) -> None:
+    def render_streaming(
+        self,
+        timeline_path: str,
+        output_path: str,
+        progress: Optional[ProgressCallback] = None,
+        force: bool = False,
+    ) -> None:
         """
         Render timeline using a chunked streaming pipeline.
+
+        `progress`, if given, is called with a {"stage": "chunk", "pass",
+        "position", "duration"} event after each chunk is written. Unless
+        `force` is set, nothing is rendered when the output's manifest shows
+        it is up to date. A non-WAV `output_path` (.flac, .mp3, ...) is
+        encoded chunk by chunk as it is written.
         """
         logger.info(f"Starting streaming render: {timeline_path} -> {output_path}")
 
-        timeline = self.load_timeline(timeline_path)
-        timeline = preprocess_scenes(timeline)
+        timeline = self._load_resolved(timeline_path)
+        manifest_config = RenderConfig.from_timeline_settings(timeline.get("settings", {}))
+        manifest_inputs = render_inputs(timeline, manifest_config, True)
+        assets = timeline_files(timeline)
+        stem_exports, specs, extra_paths = self._extra_outputs(manifest_config, timeline, output_path)
+        if self._output_up_to_date(output_path, manifest_inputs, assets, force, extra_paths):
+            return
 
+        plan = self.prepare(timeline_path, streaming=True, timeline=timeline)
+        timeline = plan.timeline
         settings = timeline.get("settings", {})
-        min_gap = settings.get("default_silence", 0.0)
-        for track in timeline.get("tracks", []):
-            auto_fix_overlaps(track, min_gap=min_gap)
-
-        warnings = validate_timeline(timeline)
-        for w in warnings:
-            logger.warning(f"⚠ {w}")
 
         duration = timeline["project"]["duration"]
         default_ducking = settings.get("ducking")
@@ -293,9 +824,7 @@ class TimelineRenderer:
 
         config = RenderConfig.from_timeline_settings(settings)
 
-        role_ranges = None
-        if default_ducking and default_ducking.get("enabled"):
-            role_ranges = self.get_role_ranges(timeline["tracks"])
+        role_ranges = plan.role_ranges
 
         chunk_size_sec = config.chunk_size_sec
         max_workers = config.streaming_max_workers
@@ -307,135 +836,392 @@ class TimelineRenderer:
         sample_width = config.streaming_sample_width
 
         clip_processor = self.clip_processor
-        scheduler = ClipScheduler(timeline)
+        scheduler = plan.scheduler
+        # Fall back to the store a batch worker backs its asset cache with
+        asset_store = get_asset_store(config.streaming_asset_store) or get_asset_cache().store
+
+        incremental = config.streaming_incremental
+        if stem_exports and (incremental or config.streaming_shards > 1):
+            # Stems need the track buffers, which the pre-mixed modes never keep
+            logger.warning("Stem export enabled, streaming without incremental reuse or shards")
+            incremental = False
+            config.streaming_shards = 1
+        if incremental and not self._default_components:
+            logger.warning("Custom clip processor/track mixer injected, rendering without incremental reuse")
+            incremental = False
+        if incremental and config.streaming_auto_chunk_size:
+            # Keep the previous render's chunk grid so its chunks can be reused
+            previous = load_render_manifest(manifest_path_for(output_path))
+            if previous is not None:
+                config.chunk_size_sec = float(previous["chunk_size_sec"])
+                config.streaming_auto_chunk_size = False
+
+        if config.streaming_auto_chunk_size or config.streaming_auto_workers:
+            tuning = tune_streaming(
+                timeline,
+                scheduler,
+                config,
+                role_ranges=role_ranges,
+                default_ducking=default_ducking,
+                default_compression=default_compression,
+                clip_processor=clip_processor,
+                asset_store=asset_store,
+            )
+            chunk_size_sec = tuning.chunk_size_sec
+            max_workers = tuning.max_workers
+
+        chunk_cache = get_chunk_cache(config.streaming_chunk_cache)
+        if chunk_cache is not None and not self._default_components:
+            # Chunk keys only describe mixes by the stock clip processor
+            logger.warning("Custom clip processor/track mixer injected, streaming without the chunk cache")
+            chunk_cache = None
+
         chunk_processor = ChunkProcessor(
             clip_processor=clip_processor,
             max_workers=max_workers,
             sample_rate=sample_rate,
             channels=channels,
             sample_width=sample_width,
+            asset_store=asset_store,
+            chunk_cache=chunk_cache,
         )
 
         scene_eq = settings.get("eq", {})
         temp_output = output_path
 
+        # Time-sharded mode renders the pre-master mix in worker processes;
+        # the passes below then only apply loudness, peak and fade-out to it.
+        premixed: Optional[str] = None
+        if incremental:
+            premixed = premix_path_for(output_path)
+            render_incremental_mix(
+                timeline=timeline,
+                scheduler=scheduler,
+                output_path=output_path,
+                duration=duration,
+                chunk_size_sec=chunk_size_sec,
+                state_tail_sec=config.streaming_state_tail_sec,
+                role_ranges=role_ranges,
+                default_ducking=default_ducking,
+                default_compression=default_compression,
+                scene_eq=scene_eq,
+                master_gain=config.master_gain,
+                sample_rate=sample_rate,
+                channels=channels,
+                sample_width=sample_width,
+                max_workers=max_workers,
+                num_shards=config.streaming_shards,
+                asset_store=config.streaming_asset_store,
+                chunk_cache=config.streaming_chunk_cache,
+            )
+        elif config.streaming_shards > 1:
+            if not self._default_components:
+                logger.warning("Custom clip processor/track mixer injected, streaming without shards")
+            else:
+                premixed = f"{output_path}.mix.tmp.wav"
+                render_sharded_mix(
+                    timeline=timeline,
+                    output_file=premixed,
+                    duration=duration,
+                    chunk_size_sec=chunk_size_sec,
+                    num_shards=config.streaming_shards,
+                    warmup_sec=config.streaming_shard_warmup_sec,
+                    role_ranges=role_ranges,
+                    default_ducking=default_ducking,
+                    default_compression=default_compression,
+                    scene_eq=scene_eq,
+                    master_gain=config.master_gain,
+                    sample_rate=sample_rate,
+                    channels=channels,
+                    sample_width=sample_width,
+                    max_workers=max_workers,
+                    asset_store=config.streaming_asset_store,
+                    chunk_cache=config.streaming_chunk_cache,
+                )
+
+        pass_count = [0]
+
         def render_pass(
             output_file: str,
             gain_db: float = 0.0,
             estimator=None,
             peak_estimator: Optional[StreamingPeakEstimator] = None,
             peak_gain_db: float = 0.0,
+            rolling_gains: Optional[List[float]] = None,
         ) -> None:
-            writer = StreamWriter(
+            # With `rolling_gains`, the estimator's per-chunk gains are recorded
+            # for a later pass instead of applied to this one.
+            # Temp passes are WAV; the final output is encoded as it is written
+            writer = open_stream_writer(
                 output_path=output_file,
                 sample_rate=sample_rate,
                 channels=channels,
                 sample_width=sample_width,
             )
-            writer.open()
+            # Stems are pre-master, so only the pass writing the final output (or,
+            # with extra outputs, the single pre-master pass) writes them
+            write_stems = bool(stem_exports) and (output_file == output_path or bool(specs))
+            stem_groups = stem_exports[0] if write_stems else None
+            stem_writers: Dict[str, StreamWriter] = {}
+            for name, stem_path in (stem_exports[1].items() if stem_groups is not None else ()):
+                stem_dir = os.path.dirname(stem_path)
+                if stem_dir:
+                    os.makedirs(stem_dir, exist_ok=True)
+                stem_writers[name] = StreamWriter(stem_path, sample_rate, channels, sample_width)
             chunk_processor.reset_streaming_state()
+            pass_count[0] += 1
+            # One cascade per pass so shelf state carries across chunk boundaries
+            tonal_shaper = SceneTonalShaper(scene_eq, sample_rate) if scene_eq else None
+
+            def decode_stage(window):
+                return chunk_processor.decode_chunk(scheduler, *window)
 
-            chunk_start = 0.0
-            while chunk_start < duration:
-                chunk_end = min(duration, chunk_start + chunk_size_sec)
+            def track_dsp_stage(decoded):
+                if stem_groups is not None:
+                    chunk_audio, stems = chunk_processor.process_chunk_with_stems(
+                        clip_scheduler=scheduler,
+                        chunk_start=decoded.chunk_start,
+                        chunk_end=decoded.chunk_end,
+                        stem_groups=stem_groups,
+                        role_ranges=role_ranges,
+                        default_ducking=default_ducking,
+                        default_compression=default_compression,
+                        decoded=decoded,
+                    )
+                    return decoded.chunk_start, chunk_audio, stems
                 chunk_audio = chunk_processor.process_chunk(
                     clip_scheduler=scheduler,
-                    chunk_start=chunk_start,
-                    chunk_end=chunk_end,
+                    chunk_start=decoded.chunk_start,
+                    chunk_end=decoded.chunk_end,
                     role_ranges=role_ranges,
                     default_ducking=default_ducking,
                     default_compression=default_compression,
+                    decoded=decoded,
                 )
+                return decoded.chunk_start, chunk_audio, None
 
-                if config.master_gain != 0:
-                    chunk_audio = chunk_audio.apply_gain(config.master_gain)
-
-                if estimator is not None:
-                    from audio_engine.dsp.loudness import audiosegment_to_float
-                    rolling_gain = estimator.get_estimated_gain_db()
-                    if rolling_gain != 0:
-                        chunk_audio = chunk_audio.apply_gain(rolling_gain)
-                    estimator.process_chunk(audiosegment_to_float(chunk_audio))
-                elif gain_db != 0:
-                    chunk_audio = chunk_audio.apply_gain(gain_db)
-
-                if scene_eq:
-                    chunk_audio = apply_scene_tonal_shaping(chunk_audio, scene_eq)
-
-                if peak_estimator is not None:
-                    from audio_engine.dsp.loudness import audiosegment_to_float
-                    peak_estimator.process_chunk(audiosegment_to_float(chunk_audio))
-
-                if peak_gain_db != 0:
-                    chunk_audio = chunk_audio.apply_gain(peak_gain_db)
-
-                # Master fade-out for last segment
-                if config.master_fade_out:
-                    fade_duration_sec = config.master_fade_out.get("duration", 10.0)
-                    fade_ms = int(fade_duration_sec * 1000)
-                    fade_ms = min(fade_ms, int(duration * 1000))
-                    curve_str = config.master_fade_out.get("curve", None)
-                    curve = FadeCurve.from_string(curve_str)
-                    chunk_audio = apply_fade_out(
-                        canvas=chunk_audio,
-                        clip_start_ms=int(chunk_start * 1000),
-                        clip_len_ms=len(chunk_audio),
-                        project_len_ms=int(duration * 1000),
-                        fade_ms=fade_ms,
-                        curve=curve,
-                    )
+            windows = chunk_windows(duration, chunk_size_sec)
+            if premixed is not None:
+                # Shards or the incremental mix already applied track DSP, master gain and scene EQ
+                mixed_chunks = (
+                    (chunk_start, chunk_audio, None)
+                    for chunk_start, chunk_audio in iter_wav_windows(premixed, list(windows))
+                )
+            elif chunk_processor.chunk_cache is not None and stem_groups is None:
+                # No decode-ahead: process_chunk decodes only on a cache miss
+                mixed_chunks = (
+                    (window[0], chunk_processor.process_chunk(
+                        clip_scheduler=scheduler,
+                        chunk_start=window[0],
+                        chunk_end=window[1],
+                        role_ranges=role_ranges,
+                        default_ducking=default_ducking,
+                        default_compression=default_compression,
+                    ), None)
+                    for window in windows
+                )
+            elif config.streaming_pipeline:
+                # Decode runs ahead of track DSP, which runs ahead of master + write.
+                # Each stage keeps chunk order, so stateful DSP sees chunks in sequence.
+                mixed_chunks = run_pipeline(windows, [decode_stage, track_dsp_stage])
+            else:
+                mixed_chunks = (track_dsp_stage(decode_stage(window)) for window in windows)
+
+            try:
+                # Opened inside the try, so writers already open are closed if a later one fails
+                writer.open()
+                for stem_writer in stem_writers.values():
+                    stem_writer.open()
+                for chunk_start, chunk_audio, stems in mixed_chunks:
+                    for name, stem_audio in (stems or {}).items():
+                        stem_writers[name].write_segment(stem_audio)
 
-                writer.write_segment(chunk_audio)
-                chunk_start = chunk_end
+                    if config.master_gain != 0 and premixed is None:
+                        chunk_audio = chunk_audio.apply_gain(config.master_gain)
 
-            writer.close()
+                    if estimator is not None:
+                        from audio_engine.dsp.loudness import audiosegment_to_float
+                        rolling_gain = estimator.get_estimated_gain_db()
+                        gained = chunk_audio.apply_gain(rolling_gain) if rolling_gain != 0 else chunk_audio
+                        estimator.process_chunk(audiosegment_to_float(gained))
+                        if rolling_gains is None:
+                            chunk_audio = gained
+                        else:
+                            rolling_gains.append(rolling_gain)
+                    elif gain_db != 0:
+                        chunk_audio = chunk_audio.apply_gain(gain_db)
+
+                    if tonal_shaper is not None and premixed is None:
+                        chunk_audio = tonal_shaper.process_segment(chunk_audio)
+
+                    if peak_estimator is not None:
+                        from audio_engine.dsp.loudness import audiosegment_to_float
+                        peak_estimator.process_chunk(audiosegment_to_float(chunk_audio))
+
+                    if peak_gain_db != 0:
+                        chunk_audio = chunk_audio.apply_gain(peak_gain_db)
+
+                    # Master fade-out for last segment
+                    if config.master_fade_out:
+                        fade_duration_sec = config.master_fade_out.get("duration", 10.0)
+                        fade_ms = int(fade_duration_sec * 1000)
+                        fade_ms = min(fade_ms, int(duration * 1000))
+                        curve_str = config.master_fade_out.get("curve", None)
+                        curve = FadeCurve.from_string(curve_str)
+                        chunk_audio = apply_fade_out(
+                            canvas=chunk_audio,
+                            clip_start_ms=int(chunk_start * 1000),
+                            clip_len_ms=len(chunk_audio),
+                            project_len_ms=int(duration * 1000),
+                            fade_ms=fade_ms,
+                            curve=curve,
+                        )
+
+                    writer.write_segment(chunk_audio)
+                    if progress is not None:
+                        progress({
+                            "stage": "chunk",
+                            "pass": pass_count[0],
+                            "position": chunk_start + len(chunk_audio) / 1000.0,
+                            "duration": duration,
+                        })
+            finally:
+                # Stops the pipeline threads if a stage or the progress callback raised
+                mixed_chunks.close()
+                close_writers([writer, *stem_writers.values()])
+
+        def fan_out_pass(
+            premaster_file: str,
+            measured_lufs: float,
+            max_abs: float,
+            rolling_gains: Optional[List[float]] = None,
+        ) -> None:
+            """
+            Read the pre-master once and write the main output and every
+            extra output from it, each with its own master gain and format.
+            `rolling_gains` keeps the main output on the single-pass rolling
+            LUFS estimate: one gain per chunk instead of the measured gain.
+            """
+            targets = [(None, open_stream_writer(output_path, sample_rate, channels, sample_width))]
+            for spec in specs:
+                spec_dir = os.path.dirname(spec.path)
+                if spec_dir:
+                    os.makedirs(spec_dir, exist_ok=True)
+                targets.append((spec, open_stream_writer(
+                    spec.path,
+                    spec.sample_rate or sample_rate,
+                    spec.channels or channels,
+                    spec.sample_width or sample_width,
+                    format=spec.format,
+                    bitrate=spec.bitrate,
+                )))
+            gains = [streaming_gain_db(config, spec, measured_lufs, max_abs) for spec, _ in targets]
+            pass_count[0] += 1
+
+            def write(target_index: int, chunk_audio: AudioSegment, gain_db: float) -> None:
+                targets[target_index][1].write_segment(chunk_audio.apply_gain(gain_db) if gain_db != 0 else chunk_audio)
 
-        if config.normalize_peak:
-            temp_output = f"{output_path}.tmp.wav"
-            peak_estimator = StreamingPeakEstimator()
-            render_pass(temp_output, peak_estimator=peak_estimator)
+            windows = list(chunk_windows(duration, chunk_size_sec))
+            pool = ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="output-writer")
+            try:
+                for _, writer in targets:
+                    writer.open()
+                for index, (chunk_start, chunk_audio) in enumerate(iter_wav_windows(premaster_file, windows)):
+                    chunk_gains = list(gains)
+                    if rolling_gains is not None:
+                        chunk_gains[0] = rolling_gains[index]
+                    # Every output's master gain, conversion and write run in parallel
+                    futures = [pool.submit(write, i, chunk_audio, chunk_gains[i]) for i in range(len(targets))]
+                    for future in futures:
+                        future.result()
+                    if progress is not None:
+                        progress({
+                            "stage": "chunk",
+                            "pass": pass_count[0],
+                            "position": chunk_start + len(chunk_audio) / 1000.0,
+                            "duration": duration,
+                        })
+            finally:
+                pool.shutdown(wait=True)
+                close_writers(writer for _, writer in targets)
 
-            lufs_gain_db = 0.0
-            if config.loudness:
+        try:
+            if specs:
+                # One pre-master pass, measured, then fanned out to every output
+                temp_output = f"{output_path}.tmp.wav"
+                peak_estimator = StreamingPeakEstimator()
+                estimator = None
+                rolling_gains = None
+                if config.loudness and not two_pass_lufs and not config.normalize_peak:
+                    # The main output keeps its single-pass rolling estimate; only extra outputs are measured
+                    from audio_engine.streaming.loudness import StreamingLoudnessEstimator
+                    estimator = StreamingLoudnessEstimator(sample_rate=sample_rate, target_lufs=config.target_lufs)
+                    rolling_gains = []
+                render_pass(temp_output, estimator=estimator, peak_estimator=peak_estimator, rolling_gains=rolling_gains)
                 measured_lufs = measure_lufs_from_file(temp_output)
-                lufs_gain_db = compute_lufs_gain_db(
+                logger.info(f"Streaming pre-master pass complete: measured {measured_lufs:.2f} LUFS")
+                fan_out_pass(temp_output, measured_lufs, peak_estimator.max_abs, rolling_gains)
+                try:
+                    os.remove(temp_output)
+                except OSError:
+                    logger.warning(f"Failed to remove temp file: {temp_output}")
+            elif config.normalize_peak:
+                temp_output = f"{output_path}.tmp.wav"
+                peak_estimator = StreamingPeakEstimator()
+                render_pass(temp_output, peak_estimator=peak_estimator)
+
+                lufs_gain_db = 0.0
+                if config.loudness:
+                    measured_lufs = measure_lufs_from_file(temp_output)
+                    lufs_gain_db = compute_lufs_gain_db(
+                        current_lufs=measured_lufs,
+                        target_lufs=config.target_lufs,
+                    )
+                    logger.info(
+                        "Streaming LUFS pass complete: measured %.2f, gain %.2f dB",
+                        measured_lufs,
+                        lufs_gain_db,
+                    )
+
+                peak_after_lufs = peak_estimator.max_abs * (10 ** (lufs_gain_db / 20.0))
+                peak_gain_db = compute_peak_gain_db(peak_after_lufs, config.peak_target_dbfs)
+
+                render_pass(output_path, gain_db=lufs_gain_db, peak_gain_db=peak_gain_db)
+                try:
+                    os.remove(temp_output)
+                except OSError:
+                    logger.warning(f"Failed to remove temp file: {temp_output}")
+            elif config.loudness and two_pass_lufs:
+                temp_output = f"{output_path}.tmp.wav"
+                render_pass(temp_output)
+                measured_lufs = measure_lufs_from_file(temp_output)
+                gain_db = compute_lufs_gain_db(
                     current_lufs=measured_lufs,
                     target_lufs=config.target_lufs,
                 )
-                logger.info(
-                    "Streaming LUFS pass complete: measured %.2f, gain %.2f dB",
-                    measured_lufs,
-                    lufs_gain_db,
-                )
-
-            peak_after_lufs = peak_estimator.max_abs * (10 ** (lufs_gain_db / 20.0))
-            peak_gain_db = compute_peak_gain_db(peak_after_lufs, config.peak_target_dbfs)
+                logger.info(f"Streaming LUFS pass complete: measured {measured_lufs:.2f}, gain {gain_db:.2f} dB")
+                render_pass(output_path, gain_db=gain_db)
+                try:
+                    os.remove(temp_output)
+                except OSError:
+                    logger.warning(f"Failed to remove temp file: {temp_output}")
+            elif config.loudness:
+                from audio_engine.streaming.loudness import StreamingLoudnessEstimator
+                estimator = StreamingLoudnessEstimator(sample_rate=sample_rate, target_lufs=config.target_lufs)
+                render_pass(output_path, estimator=estimator)
+            else:
+                render_pass(output_path)
+        finally:
+            chunk_processor.close()
+            # The incremental pre-master mix is kept for the next render
+            if premixed is not None and not incremental:
+                try:
+                    os.remove(premixed)
+                except OSError:
+                    logger.warning(f"Failed to remove temp file: {premixed}")
 
-            render_pass(output_path, gain_db=lufs_gain_db, peak_gain_db=peak_gain_db)
-            try:
-                os.remove(temp_output)
-            except OSError:
-                logger.warning(f"Failed to remove temp file: {temp_output}")
-        elif config.loudness and two_pass_lufs:
-            temp_output = f"{output_path}.tmp.wav"
-            render_pass(temp_output)
-            measured_lufs = measure_lufs_from_file(temp_output)
-            gain_db = compute_lufs_gain_db(
-                current_lufs=measured_lufs,
-                target_lufs=config.target_lufs,
-            )
-            logger.info(f"Streaming LUFS pass complete: measured {measured_lufs:.2f}, gain {gain_db:.2f} dB")
-            render_pass(output_path, gain_db=gain_db)
-            try:
-                os.remove(temp_output)
-            except OSError:
-                logger.warning(f"Failed to remove temp file: {temp_output}")
-        elif config.loudness:
-            from audio_engine.streaming.loudness import StreamingLoudnessEstimator
-            estimator = StreamingLoudnessEstimator(sample_rate=sample_rate, target_lufs=config.target_lufs)
-            render_pass(output_path, estimator=estimator)
-        else:
-            render_pass(output_path)
+        if self._writes_manifest:
+            write_output_manifest(output_path, manifest_inputs, assets, extra_paths)
 
 
 # Backward compatibility: maintain render_timeline function
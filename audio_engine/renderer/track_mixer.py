@@ -8,6 +8,7 @@ from audio_engine.utils.logger import get_logger
 from audio_engine.renderer.clip_processor import ClipProcessor
 from audio_engine.exceptions import FileError, AudioProcessingError
 from audio_engine.dsp.eq import apply_scene_tonal_shaping
+from audio_engine.utils.stem_cache import StemCache, track_stem_key
 
 logger = get_logger(__name__)
 
@@ -30,7 +31,9 @@ class TrackMixer:
         project_duration: float,
         role_ranges: Optional[Dict[str, List[Tuple[float, float]]]] = None,
         default_ducking: Optional[Dict] = None,
-        default_compression: Optional[Dict] = None
+        default_compression: Optional[Dict] = None,
+        stem_cache: Optional[StemCache] = None,
+        role_loudness: bool = True
     ) -> AudioSegment:
         """
         Process all clips on a track and return mixed track buffer.
@@ -41,6 +44,10 @@ class TrackMixer:
             role_ranges: Dictionary of role ranges for ducking
             default_ducking: Default ducking configuration
             default_compression: Default compression configuration
+            stem_cache: Stored track stems; an unchanged or frozen track is
+                loaded from it instead of being rendered
+            role_loudness: Apply the track's role loudness target; off for
+                stems that are ducked before apply_track_loudness is called
         
         Returns:
             Mixed audio segment for the track
@@ -52,12 +59,20 @@ class TrackMixer:
         track_eq_preset = track.get("eq_preset")  # track-level EQ preset override
         clips = track.get("clips", [])
         
+        stem_key = None
+        if stem_cache is not None:
+            stem_key = track_stem_key(track, project_duration, role_ranges, default_ducking, default_compression)
+            cached = stem_cache.load(track, stem_key, project_duration)
+            if cached is not None:
+                return cached
+        
         logger.debug(f"Processing track '{track_id}' (role: {track_role}, semantic_role: {track_semantic_role}, eq_preset: {track_eq_preset}, clips: {len(clips)})")
         
         # Create track buffer
         track_buffer = AudioSegment.silent(duration=int(project_duration * 1000))
         
         # Process each clip
+        clips_failed = False
         for clip in clips:
             try:
                 # Ensure track_buffer is valid before processing
@@ -84,17 +99,51 @@ class TrackMixer:
                     track_buffer = AudioSegment.silent(duration=int(project_duration * 1000))
             except (FileError, AudioProcessingError) as e:
                 logger.error(f"Skipping clip {clip.get('file', 'unknown')} due to error: {e}")
+                clips_failed = True
                 # Ensure track_buffer remains valid after exception
                 if track_buffer is None:
                     track_buffer = AudioSegment.silent(duration=int(project_duration * 1000))
                 continue
             except Exception as e:
                 logger.error(f"Unexpected error processing clip {clip.get('file', 'unknown')}: {e}")
+                clips_failed = True
                 # Ensure track_buffer remains valid after exception
                 if track_buffer is None:
                     track_buffer = AudioSegment.silent(duration=int(project_duration * 1000))
                 continue
         
+        if role_loudness:
+            track_buffer = self.apply_track_loudness(track, track_buffer, project_duration)
+        elif track_buffer is None:
+            track_buffer = AudioSegment.silent(duration=int(project_duration * 1000))
+        
+        # A stem missing clips that failed is not worth keeping
+        if stem_cache is not None and not clips_failed:
+            stem_cache.store(track, stem_key, project_duration, track_buffer)
+        
+        logger.debug(f"Track '{track_id}' processed successfully")
+        return track_buffer
+    
+    def apply_track_loudness(
+        self,
+        track: Dict,
+        track_buffer: Optional[AudioSegment],
+        project_duration: float
+    ) -> AudioSegment:
+        """
+        Apply the track's role loudness target to its mixed buffer.
+        
+        Args:
+            track: Track dictionary
+            track_buffer: Mixed clips of the track
+            project_duration: Total project duration in seconds
+        
+        Returns:
+            Track buffer at its role's loudness
+        """
+        track_id = track.get("id", "unknown")
+        track_role = track.get("role")
+        
         # Apply role-based loudness only if track_buffer is valid
         # Note: For SFX tracks, semantic role loudness is already applied per-clip in ClipProcessor
         # This is a fallback for non-SFX tracks or if per-clip processing was skipped
@@ -114,8 +163,6 @@ class TrackMixer:
         elif track_buffer is None:
             logger.warning(f"Track buffer is None for track '{track_id}', skipping role loudness")
             track_buffer = AudioSegment.silent(duration=int(project_duration * 1000))
-        
-        logger.debug(f"Track '{track_id}' processed successfully")
         return track_buffer
     
     @staticmethod
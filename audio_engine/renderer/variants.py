@@ -0,0 +1,95 @@
+"""
+Multi-variant renders: one timeline, several versions of some of its tracks.
+
+A timeline's "variants" block names each variant (typically a language) and
+the track clips it replaces:
+
+    "variants": {
+        "en": {"tracks": {"dialogue": [{"file": "en/line1.wav", "start": 2.0}]}},
+        "de": {"tracks": {"dialogue": [{"file": "de/line1.wav", "start": 2.1}]}}
+    }
+
+TimelineRenderer.render_variants processes every track that comes out
+identical across variants (music, ambience and SFX: the M&E) once, without
+ducking or role loudness. Each variant then ducks those stems with a gain
+envelope built from its own dialogue ranges, applies role loudness, renders
+only the tracks it changes and runs the mix and master chain.
+"""
+import copy
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from audio_engine.dsp.ducking import CompiledDuckRule, DuckingPlan, apply_gain_curve_to_segment
+from audio_engine.exceptions import TimelineError
+from audio_engine.utils.hashing import canonical_json, content_key
+
+VARIANT_PLACEHOLDER = "{variant}"
+
+
+def variant_names(timeline: Dict) -> List[str]:
+    variants = timeline.get("variants")
+    if not isinstance(variants, dict) or not variants:
+        raise TimelineError("Timeline has no 'variants' block")
+    return list(variants)
+
+
+def apply_variant(timeline: Dict, name: str) -> Dict:
+    """Copy of `timeline` with the clips of variant `name` in place and no "variants" block."""
+    variant = copy.deepcopy(timeline)
+    overrides = variant.pop("variants", {}).get(name)
+    if overrides is None:
+        raise TimelineError(f"Unknown variant '{name}'")
+
+    tracks = {track.get("id"): track for track in variant.get("tracks", [])}
+    for track_id, clips in (overrides.get("tracks") or {}).items():
+        if track_id not in tracks:
+            raise TimelineError(f"Variant '{name}' replaces clips of unknown track '{track_id}'")
+        tracks[track_id]["clips"] = clips
+    return variant
+
+
+def shared_track_key(track: Dict, project_duration: float, default_compression: Optional[Dict]) -> str:
+    """
+    Hash of a preprocessed track and what its un-ducked stem depends on. Equal
+    keys in two variants mean the track's stem can be rendered once.
+    """
+    payload = {"track": track, "duration": project_duration, "compression": default_compression}
+    return content_key(payload)
+
+
+def track_ducking(track: Dict, default_ducking: Optional[Dict]) -> Optional[Tuple[Optional[Dict], Optional[str]]]:
+    """
+    The (ducking config, semantic role) shared by every clip on the track, or
+    None when clips differ, in which case the track cannot be ducked as a whole.
+    """
+    profiles = set()
+    for clip in track.get("clips", []):
+        cfg = clip.get("_rules", {}).get("ducking", default_ducking)
+        semantic_role = clip.get("semantic_role", track.get("semantic_role"))
+        profiles.add((canonical_json(cfg), semantic_role))
+    if len(profiles) > 1:
+        return None
+    if not profiles:
+        return default_ducking, track.get("semantic_role")
+    encoded, semantic_role = profiles.pop()
+    return json.loads(encoded), semantic_role
+
+
+def duck_stem(audio: AudioSegment, plan: DuckingPlan, rules: List[CompiledDuckRule]) -> AudioSegment:
+    """
+    Apply `rules` to a whole-track stem starting at 0 s: the same gain
+    ClipProcessor applies clip by clip, as one envelope over the track.
+    """
+    if plan.mode == "scene":
+        return audio + plan.duck_db * len(rules)
+    if plan.mode != "audacity":
+        return audio
+
+    sample_rate = audio.frame_rate
+    gain = np.ones(int(audio.frame_count()), dtype=np.float32)
+    for rule in rules:
+        gain *= plan.gain_curve(rule, 0.0, len(gain) / sample_rate, sample_rate)[:len(gain)]
+    return apply_gain_curve_to_segment(audio, gain)
@@ -1,7 +1,10 @@
-from copy import deepcopy
-from typing import Dict, List, Optional
+from collections import ChainMap
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Optional
 
 from audio_engine.utils.dialogue_density import compute_dialogue_density, classify_dialogue_density
+from audio_engine.utils.ranges import RangeIndex
 from audio_engine.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -25,6 +28,53 @@ def merge_rules(global_rules: Dict, scene_rules: Dict) -> Dict:
     return merged
 
 
+class SceneRules(Mapping):
+    """
+    Read-only rules compiled once per scene and shared by every clip the
+    scene generates. Clips read them through the usual `_rules.get(...)`.
+    """
+
+    __slots__ = ("_rules",)
+
+    def __init__(self, rules: Dict):
+        self._rules = MappingProxyType(dict(rules))
+
+    def __getitem__(self, key):
+        return self._rules[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._rules)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __repr__(self) -> str:
+        return f"SceneRules({dict(self._rules)!r})"
+
+    def __reduce__(self):
+        # mappingproxy itself cannot be pickled
+        return (SceneRules, (dict(self._rules),))
+
+    def with_overrides(self, overrides: Optional[Dict]) -> Mapping:
+        """
+        Layer clip-level overrides over the shared scene rules.
+
+        Only the overridden keys are stored per clip; dict values are
+        shallow-merged into the scene's value, as in merge_rules.
+        """
+        if not overrides:
+            return self
+
+        delta = {}
+        for key, value in overrides.items():
+            base = self._rules.get(key)
+            if isinstance(base, dict) and isinstance(value, dict):
+                delta[key] = {**base, **value}
+            else:
+                delta[key] = value
+        return ChainMap(delta, self)
+
+
 def apply_scene_crossfades(track_clips: List[Dict], default_duration: float) -> None:
     
     """
@@ -103,6 +153,13 @@ def preprocess_scenes(timeline: Dict) -> Dict:
 
             dialogue_ranges.append((start, end))
 
+    # Merged + prefix-summed once, queried per scene
+    dialogue_index = RangeIndex(dialogue_ranges)
+
+    # energy ramp duration (ms)
+    energy_ramp_duration = (
+        global_settings.get("energy_ramp", {}).get("duration", 3.0) * 1000
+    )
 
     prev_scene_energy = None
 
@@ -112,7 +169,7 @@ def preprocess_scenes(timeline: Dict) -> Dict:
 
         # 🧠 Dialogue Density (scene-level)
         density_ratio = compute_dialogue_density(
-            dialogue_ranges,
+            dialogue_index,
             scene_start,
             scene_end
         )
@@ -124,10 +181,22 @@ def preprocess_scenes(timeline: Dict) -> Dict:
         scene_rules =  scene.get("rules",{})
         current_energy = scene.get("energy", 0.5)
 
-        # merge global + scene rules
+        # merge global + scene rules, compiled once and shared by the scene's clips
 
         effective_rules = merge_rules(global_settings, scene_rules)
 
+        #Dialogue density
+        effective_rules["dialogue_density"] = density_ratio
+        effective_rules["dialogue_density_label"] = density_label
+
+        # scene energy (current + previous)
+        effective_rules["scene_energy"] = current_energy
+        effective_rules["prev_scene_energy"] = prev_scene_energy
+
+        effective_rules["energy_ramp_duration"] = energy_ramp_duration
+
+        compiled_rules = SceneRules(effective_rules)
+
         for track_id, clips in scene_tracks.items():
             if track_id not in track_map:
                 raise ValueError(
@@ -139,7 +208,8 @@ def preprocess_scenes(timeline: Dict) -> Dict:
             track_semantic_role = track.get("semantic_role")
 
             for clip in clips:
-                new_clip = deepcopy(clip)
+                # Shallow copy: only top-level keys are rewritten below
+                new_clip = dict(clip)
 
                 new_clip["start"] = scene_start + clip.get("offset",0)
 
@@ -153,23 +223,8 @@ def preprocess_scenes(timeline: Dict) -> Dict:
                 if new_clip.get("loop"):
                     new_clip["loop_until"] = scene_end
 
-                # attach merged rules to clip
-                new_clip["_rules"] = effective_rules.copy()
-                
-                #Dialogue density
-                new_clip["_rules"]["dialogue_density"] = density_ratio
-                new_clip["_rules"]["dialogue_density_label"] = density_label
-
-                # scene energy (current + previous)
-                new_clip["_rules"]["scene_energy"] = current_energy
-                new_clip["_rules"]["prev_scene_energy"] = prev_scene_energy
-
-                # energy ramp duration (ms)
-                new_clip["_rules"]["energy_ramp_duration"] = (
-                    timeline.get("settings", {})
-                            .get("energy_ramp", {})
-                            .get("duration", 3.0) * 1000
-                )
+                # attach shared scene rules (plus any clip-level delta)
+                new_clip["_rules"] = compiled_rules.with_overrides(clip.get("rules"))
                 
                 track_map[track_id]["clips"].append(new_clip)
                 logger.debug(f"Added clip to track '{track_id}': {new_clip.get('file', 'unknown')}")
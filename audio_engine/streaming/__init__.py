@@ -5,7 +5,7 @@ Streaming rendering utilities for chunked processing.
 from .chunk_loader import ChunkLoader
 from .clip_scheduler import ClipScheduler, ClipSlice
 from .chunk_processor import ChunkProcessor
-from .stream_writer import StreamWriter
+from .stream_writer import EncoderStreamWriter, FlacStreamWriter, StreamWriter, open_stream_writer
 
 __all__ = [
     "ChunkLoader",
@@ -13,4 +13,7 @@ __all__ = [
     "ClipSlice",
     "ChunkProcessor",
     "StreamWriter",
+    "EncoderStreamWriter",
+    "FlacStreamWriter",
+    "open_stream_writer",
 ]
@@ -0,0 +1,252 @@
+"""
+SharedAssetStore: decoded PCM shared between processes through memmapped files.
+
+Each source file is decoded once per output format into a float32 .npy file
+under the store directory. Every process (shard workers, batch workers,
+daemon jobs) maps it read-only, so they all share the same page-cache pages
+and only copy the chunk they are rendering.
+
+Readers hold a shared flock on the files they have mapped. Eviction takes an
+exclusive non-blocking lock first, so a file in use by any process is never
+removed. File names are predictable and mapped files are used as decoded
+audio, so the store directory must be private to the current user.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from audio_engine.exceptions import FileError
+from audio_engine.utils.cache_dir import ensure_private_dir, user_cache_dir
+from audio_engine.utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: mapped files cannot be deleted anyway
+    fcntl = None
+
+logger = get_logger(__name__)
+
+DEFAULT_STORE_MAX_GB = 10.0
+
+
+def default_store_dir() -> str:
+    return user_cache_dir("assets")
+
+
+class SharedAsset:
+    """A read-only mapping of one decoded file."""
+
+    def __init__(self, npy_path: str, sample_rate: int, sample_width: int):
+        self.npy_path = npy_path
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self._lock_fd = os.open(npy_path, os.O_RDONLY)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_SH)
+            self.samples = np.load(npy_path, mmap_mode="r")
+        except BaseException:
+            # e.g. the file was evicted or replaced between the open and the load
+            os.close(self._lock_fd)
+            self._lock_fd = None
+            raise
+        self.refs = 0
+
+    @property
+    def frames(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    def read(self, start_sec: float, duration_sec: float) -> np.ndarray:
+        """
+        Copy out [start_sec, start_sec + duration_sec), using the same
+        millisecond-to-frame rounding as slicing an AudioSegment.
+        """
+        rate = self.sample_rate
+        len_ms = round(1000 * self.frames / rate)
+        start_ms = min(start_sec * 1000, len_ms)
+        end_ms = min((start_sec + duration_sec) * 1000, len_ms)
+        start = int(start_ms * (rate / 1000.0))
+        end = int(end_ms * (rate / 1000.0))
+
+        samples = np.array(self.samples[start:max(start, end)], dtype=np.float32)
+        if self.channels == 1:
+            samples = samples.reshape(-1)
+        return samples
+
+    def close(self) -> None:
+        self.samples = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # also drops the flock
+            self._lock_fd = None
+
+
+class SharedAssetStore:
+    """
+    Publishes and maps decoded assets; reference-counted within the process.
+    Raises FileError if `root` is not private to the current user.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = ensure_private_dir(root or default_store_dir())
+        self.max_bytes = int(max_bytes if max_bytes is not None else DEFAULT_STORE_MAX_GB * (1 << 30))
+        self._open: Dict[str, SharedAsset] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def _key(path: str, sample_rate: Optional[int], channels: Optional[int], sample_width: Optional[int]) -> str:
+        stat = os.stat(path)
+        ident = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{sample_rate}|{channels}|{sample_width}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def _npy_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.npy")
+
+    def _publish(self, path: str, npy_path: str, sample_rate, channels, sample_width) -> Tuple[int, int]:
+        audio = AudioSegment.from_file(path)
+        if sample_rate and audio.frame_rate != sample_rate:
+            audio = audio.set_frame_rate(sample_rate)
+        if channels and audio.channels != channels:
+            audio = audio.set_channels(channels)
+        if sample_width and audio.sample_width != sample_width:
+            audio = audio.set_sample_width(sample_width)
+
+        samples = np.array(audio.get_array_of_samples(), dtype=np.float32).reshape((-1, audio.channels))
+        samples /= float(2 ** (8 * audio.sample_width - 1))
+
+        # Write beside the target and rename, so readers never map a partial file
+        tmp_path = f"{npy_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, samples)
+        os.replace(tmp_path, npy_path)
+        logger.debug(f"Published {path} to asset store ({samples.nbytes / (1 << 20):.1f} MB)")
+        return audio.frame_rate, audio.sample_width
+
+    def acquire(
+        self,
+        path: str,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None,
+        sample_width: Optional[int] = None,
+    ) -> SharedAsset:
+        """Map `path` decoded to the given format, publishing it on first use."""
+        key = self._key(path, sample_rate, channels, sample_width)
+        with self._lock:
+            asset = self._open.get(key)
+            if asset is not None:
+                asset.refs += 1
+                return asset
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                asset = self._open.get(key)
+                if asset is not None:
+                    asset.refs += 1
+                    return asset
+
+            npy_path = self._npy_path(key)
+            try:
+                rate, width = self._read_format(path, sample_rate, sample_width)
+                asset = SharedAsset(npy_path, rate, width)
+            except FileNotFoundError:
+                # Not published yet, or evicted by another process just now
+                rate, width = self._publish(path, npy_path, sample_rate, channels, sample_width)
+                asset = SharedAsset(npy_path, rate, width)
+                self.evict()
+
+            asset.refs = 1
+            with self._lock:
+                self._open[key] = asset
+            return asset
+
+    @staticmethod
+    def _read_format(path: str, sample_rate: Optional[int], sample_width: Optional[int]) -> Tuple[int, int]:
+        if sample_rate and sample_width:
+            return sample_rate, sample_width
+        probe = AudioSegment.from_file(path, duration=0.01)
+        return sample_rate or probe.frame_rate, sample_width or probe.sample_width
+
+    def release(self, asset: SharedAsset) -> None:
+        with self._lock:
+            asset.refs -= 1
+            if asset.refs > 0:
+                return
+            for key, open_asset in list(self._open.items()):
+                if open_asset is asset:
+                    del self._open[key]
+        asset.close()
+
+    def evict(self) -> None:
+        """Delete least-recently-used files until the store fits its budget."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.root):
+            if not name.endswith(".npy"):
+                continue
+            full = os.path.join(self.root, name)
+            try:
+                stat = os.stat(full)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, full))
+            total += stat.st_size
+
+        for _, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self._try_remove(full):
+                total -= size
+
+    @staticmethod
+    def _try_remove(full: str) -> bool:
+        try:
+            fd = os.open(full, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return False  # mapped by some process
+            os.remove(full)
+            return True
+        except OSError:
+            return False
+        finally:
+            os.close(fd)
+
+
+_stores: Dict[Tuple[str, int], SharedAssetStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_asset_store(store_cfg: Optional[Dict]) -> Optional[SharedAssetStore]:
+    """
+    Process-wide store for a settings["streaming"]["asset_store"] block, or
+    None when it is absent or disabled, or its directory is not private.
+    """
+    if not store_cfg or not store_cfg.get("enabled"):
+        return None
+    root = store_cfg.get("dir") or default_store_dir()
+    max_bytes = int(float(store_cfg.get("max_gb", DEFAULT_STORE_MAX_GB)) * (1 << 30))
+    with _stores_lock:
+        store = _stores.get((root, max_bytes))
+        if store is None:
+            try:
+                store = SharedAssetStore(root, max_bytes)
+            except FileError as e:
+                logger.warning(f"Asset store disabled: {e}")
+                return None
+            _stores[(root, max_bytes)] = store
+        return store
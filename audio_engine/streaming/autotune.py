@@ -0,0 +1,220 @@
+"""
+Auto-tuning of chunk size and worker count for streaming renders.
+
+Per-chunk overheads (decoder calls, pool hand-offs, filter setup) favour
+large chunks; chunk buffers per active track grow with them. The worker
+count follows how many tracks actually sound at once, since ChunkProcessor
+parallelises over tracks. The chunk size is picked by timing a short
+calibration render of the timeline's opening seconds with each candidate
+that fits the memory budget. An untimed warm-up pass pays the cold decode,
+asset-store publish and cache costs first; the candidates are then timed in
+interleaved rounds and each keeps its fastest round.
+"""
+
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CANDIDATE_CHUNK_SIZES = (0.5, 1.0, 2.0, 4.0)
+DEFAULT_AUTO_MEMORY_MB = 512
+DEFAULT_CALIBRATION_SEC = 8.0
+DEFAULT_CALIBRATION_ROUNDS = 2
+
+# Candidates within this fraction of the fastest count as equally fast;
+# the smallest of them wins, for lower memory and latency.
+_TIE_TOLERANCE = 0.05
+
+# Buffers alive per track while a chunk moves through the pipeline
+# (decoded slice, processed track, bus copy, queued chunk), as float32 + int16.
+_BUFFERS_PER_TRACK = 4
+_BYTES_PER_SAMPLE = 6
+
+
+@dataclass
+class StreamingTuning:
+    chunk_size_sec: float
+    max_workers: int
+    peak_tracks: int
+    # candidate chunk size -> render seconds per second of audio
+    timings: Dict[float, float] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        timing = ", ".join(f"{size:g}s: {cost:.3f}" for size, cost in sorted(self.timings.items()))
+        return (
+            f"chunk_size_sec={self.chunk_size_sec:g}, max_workers={self.max_workers} "
+            f"(peak {self.peak_tracks} active tracks"
+            + (f"; cost per audio second {timing}" if timing else "")
+            + ")"
+        )
+
+
+def peak_active_tracks(scheduler, duration: float, step_sec: float = 1.0) -> int:
+    """Most tracks sounding in any `step_sec` window of the timeline."""
+    peak = 0
+    position = 0.0
+    while position < duration:
+        end = min(duration, position + step_sec)
+        peak = max(peak, len(scheduler.get_active_clips(position, end)))
+        position = end
+    return peak
+
+
+def chunk_memory_bytes(chunk_size_sec: float, tracks: int, sample_rate: int, channels: int) -> int:
+    samples = chunk_size_sec * sample_rate * channels
+    return int(samples * _BYTES_PER_SAMPLE * _BUFFERS_PER_TRACK * (max(1, tracks) + 1))
+
+
+def fitting_chunk_sizes(
+    candidates: Sequence[float],
+    tracks: int,
+    sample_rate: int,
+    channels: int,
+    memory_budget_bytes: int,
+) -> List[float]:
+    """Candidates whose chunk buffers fit the budget; the smallest one if none do."""
+    fitting = [
+        size for size in sorted(candidates)
+        if chunk_memory_bytes(size, tracks, sample_rate, channels) <= memory_budget_bytes
+    ]
+    return fitting or [min(candidates)]
+
+
+def pick_worker_count(peak_tracks: int, cpu_count: Optional[int] = None) -> int:
+    return max(1, min(cpu_count or os.cpu_count() or 1, peak_tracks))
+
+
+def pick_fastest(timings: Dict[float, float]) -> float:
+    best = min(timings.values())
+    return min(size for size, cost in timings.items() if cost <= best * (1 + _TIE_TOLERANCE))
+
+
+def calibrate_chunk_sizes(
+    timeline: Dict,
+    candidates: Sequence[float],
+    calibration_sec: float,
+    max_workers: int,
+    sample_rate: int,
+    channels: int,
+    sample_width: int,
+    role_ranges=None,
+    default_ducking=None,
+    default_compression=None,
+    clip_processor=None,
+    asset_store=None,
+    rounds: int = DEFAULT_CALIBRATION_ROUNDS,
+) -> Dict[float, float]:
+    """
+    Render the first `calibration_sec` with each chunk size and time it:
+    one untimed warm-up pass, then `rounds` rounds over the candidates in
+    alternating order. Each candidate's cost is its fastest round.
+    """
+    from audio_engine.streaming.chunk_processor import ChunkProcessor
+    from audio_engine.streaming.clip_scheduler import ClipScheduler
+
+    duration = float(timeline["project"]["duration"])
+
+    def render_window(size: float, window: float) -> float:
+        scheduler = ClipScheduler(timeline)
+        with ChunkProcessor(
+            clip_processor=clip_processor,
+            max_workers=max_workers,
+            sample_rate=sample_rate,
+            channels=channels,
+            sample_width=sample_width,
+            asset_store=asset_store,
+        ) as chunk_processor:
+            started = time.perf_counter()
+            position = 0.0
+            while position < window:
+                end = min(window, position + size)
+                chunk_processor.process_chunk(
+                    clip_scheduler=scheduler,
+                    chunk_start=position,
+                    chunk_end=end,
+                    role_ranges=role_ranges,
+                    default_ducking=default_ducking,
+                    default_compression=default_compression,
+                )
+                position = end
+            return time.perf_counter() - started
+
+    # Whole chunks only, so every candidate renders the same span
+    windows = {}
+    for size in sorted(candidates):
+        window = min(duration, size * max(1, math.floor(calibration_sec / size)))
+        if window <= 0:
+            break
+        windows[size] = window
+    if not windows:
+        return {}
+
+    render_window(min(windows), min(duration, calibration_sec))
+
+    timings: Dict[float, float] = {}
+    order = list(windows)
+    for round_index in range(max(1, rounds)):
+        for size in (order if round_index % 2 == 0 else reversed(order)):
+            cost = render_window(size, windows[size]) / windows[size]
+            timings[size] = min(cost, timings.get(size, cost))
+    return timings
+
+
+def tune_streaming(
+    timeline: Dict,
+    scheduler,
+    config,
+    role_ranges=None,
+    default_ducking=None,
+    default_compression=None,
+    clip_processor=None,
+    asset_store=None,
+) -> StreamingTuning:
+    """
+    Resolve `auto` chunk size and worker count for a streaming render.
+    Values not set to `auto` in the config are kept as given.
+    """
+    duration = float(timeline["project"]["duration"])
+    peak_tracks = peak_active_tracks(scheduler, duration)
+
+    max_workers = config.streaming_max_workers
+    if config.streaming_auto_workers:
+        max_workers = pick_worker_count(peak_tracks)
+
+    tuning = StreamingTuning(
+        chunk_size_sec=config.chunk_size_sec,
+        max_workers=max_workers,
+        peak_tracks=peak_tracks,
+    )
+    if config.streaming_auto_chunk_size:
+        candidates = fitting_chunk_sizes(
+            CANDIDATE_CHUNK_SIZES,
+            peak_tracks,
+            config.streaming_sample_rate,
+            config.streaming_channels,
+            int(config.streaming_auto_memory_mb * (1 << 20)),
+        )
+        if len(candidates) > 1:
+            tuning.timings = calibrate_chunk_sizes(
+                timeline,
+                candidates,
+                config.streaming_calibration_sec,
+                max_workers,
+                config.streaming_sample_rate,
+                config.streaming_channels,
+                config.streaming_sample_width,
+                role_ranges=role_ranges,
+                default_ducking=default_ducking,
+                default_compression=default_compression,
+                clip_processor=clip_processor,
+                asset_store=asset_store,
+            )
+        tuning.chunk_size_sec = pick_fastest(tuning.timings) if tuning.timings else candidates[0]
+
+    logger.info(f"Streaming auto-tune: {tuning.describe()}")
+    return tuning
@@ -0,0 +1,186 @@
+"""
+ChunkCache: on-disk memoization of mixed streaming chunks.
+
+A chunk's mix is fully determined by the clip slices sounding in it, the
+track and DSP settings they resolve to, and the state the stateful DSP
+(compressors, EQ filters, sidechain detectors) carries into it. ChunkProcessor
+hashes those into a key; the cache stores the mixed PCM together with the
+state the DSP carried out of the chunk, so a hit can restore it and the next
+chunk continues exactly as if the chunk had been rendered.
+
+Keys are position-independent: times are taken relative to the chunk start,
+so variants of an episode that share material at the same offsets within
+their chunks share cache entries. The engine version and the resolved EQ
+preset versions are part of every key.
+
+Entries are pickles, so the cache directory must be private to the current
+user (see audio_engine.utils.cache_dir).
+"""
+
+import os
+import pickle
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from audio_engine import __version__
+from audio_engine.exceptions import FileError
+from audio_engine.utils.cache_dir import ensure_private_dir, user_cache_dir
+from audio_engine.utils.hashing import content_key, preset_versions
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_MAX_GB = 5.0
+
+# State is hashed at this absolute resolution (about -140 dBFS for signals
+# in [-1, 1]), so DSP that has decayed to the same state after different
+# material still produces the same key.
+_STATE_DECIMALS = 7
+
+
+def default_cache_dir() -> str:
+    return user_cache_dir("chunks")
+
+
+def dsp_state(obj) -> Dict[str, Any]:
+    """The mutable state of a streaming DSP object: its underscore attributes."""
+    return {k: v for k, v in vars(obj).items() if k.startswith("_")}
+
+
+def restore_dsp_state(obj, state: Dict[str, Any]) -> None:
+    for name, value in state.items():
+        setattr(obj, name, value.copy() if isinstance(value, np.ndarray) else value)
+
+
+def _quantize(value):
+    if isinstance(value, np.ndarray):
+        return [list(value.shape), np.round(value.astype(np.float64), _STATE_DECIMALS).ravel().tolist()]
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), _STATE_DECIMALS)
+    if isinstance(value, Mapping):
+        return {str(k): _quantize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_quantize(v) for v in value]
+    return value
+
+
+def chunk_key(inputs: Dict, states: Dict[str, Dict[str, Any]]) -> str:
+    """Hash of a chunk's inputs, the quantized incoming DSP state and the engine and preset versions."""
+    payload = {
+        "engine_version": __version__,
+        "presets": preset_versions(),
+        "inputs": inputs,
+        "state": _quantize(states),
+    }
+    return content_key(payload)
+
+
+class ChunkCache:
+    """
+    Directory of memoized chunks, evicted least-recently-used by total size.
+    Raises FileError if `root` is not private to the current user.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = ensure_private_dir(root or default_cache_dir())
+        self.max_bytes = int(max_bytes if max_bytes is not None else DEFAULT_CACHE_MAX_GB * (1 << 30))
+        self._lock = threading.Lock()
+        self._bytes = sum(
+            os.path.getsize(os.path.join(self.root, name))
+            for name in os.listdir(self.root)
+            if name.endswith(".chunk")
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.chunk")
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Dict[str, Any]]]]:
+        """(pcm, outgoing DSP state) for `key`, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)  # mtime orders eviction
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable chunk cache entry {path}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry["pcm"], entry["state"]
+
+    def put(self, key: str, pcm: bytes, state: Dict[str, Dict[str, Any]]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"pcm": pcm, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning(f"Failed to write chunk cache entry {key}: {exc}")
+            return
+        with self._lock:
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".chunk"):
+                continue
+            full = os.path.join(self.root, name)
+            try:
+                stat = os.stat(full)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, full))
+
+        self._bytes = sum(size for _, size, _ in entries)
+        # Evict down to 90% so every put past the limit does not rescan
+        target = int(self.max_bytes * 0.9)
+        for _, size, full in sorted(entries):
+            if self._bytes <= target:
+                break
+            try:
+                os.remove(full)
+                self._bytes -= size
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+_caches: Dict[Tuple[str, int], ChunkCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_chunk_cache(cache_cfg: Optional[Dict]) -> Optional[ChunkCache]:
+    """
+    Process-wide cache for a settings["streaming"]["chunk_cache"] block, or
+    None when it is absent or disabled, or its directory is not private.
+    """
+    if not cache_cfg or not cache_cfg.get("enabled"):
+        return None
+    root = cache_cfg.get("dir") or default_cache_dir()
+    max_bytes = int(float(cache_cfg.get("max_gb", DEFAULT_CACHE_MAX_GB)) * (1 << 30))
+    with _caches_lock:
+        cache = _caches.get((root, max_bytes))
+        if cache is None:
+            try:
+                cache = ChunkCache(root, max_bytes)
+            except FileError as e:
+                logger.warning(f"Chunk cache disabled: {e}")
+                return None
+            _caches[(root, max_bytes)] = cache
+        return cache
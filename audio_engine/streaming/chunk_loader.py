@@ -2,6 +2,7 @@
 ChunkLoader: load audio slices on-demand without loading full files.
 """
 
+import threading
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
@@ -24,12 +25,55 @@ class AudioMeta:
 
 class ChunkLoader:
     """
-    Load audio in chunks using ffmpeg-backed AudioSegment slicing.
+    Load audio in chunks using ffmpeg-backed AudioSegment slicing, or from a
+    SharedAssetStore mapping when one is given.
+
+    One loader may be shared by decode threads: its asset mapping is
+    acquired, read and released under a lock.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, asset_store=None):
         self.file_path = file_path
         self._meta_cache: Optional[AudioMeta] = None
+        self._asset_store = asset_store
+        self._asset = None
+        self._asset_format = None
+        self._asset_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Release the shared asset mapping, if any."""
+        with self._asset_lock:
+            self._release_asset()
+
+    def _release_asset(self) -> None:
+        if self._asset is not None:
+            self._asset_store.release(self._asset)
+            self._asset = None
+            self._asset_format = None
+
+    def _get_shared_chunk(
+        self,
+        start_sec: float,
+        duration_sec: float,
+        target_sample_rate: Optional[int],
+        target_channels: Optional[int],
+        target_sample_width: Optional[int],
+    ) -> Tuple[np.ndarray, AudioMeta]:
+        fmt = (target_sample_rate, target_channels, target_sample_width)
+        with self._asset_lock:
+            if self._asset is None or self._asset_format != fmt:
+                self._release_asset()
+                self._asset = self._asset_store.acquire(self.file_path, *fmt)
+                self._asset_format = fmt
+
+            samples = self._asset.read(max(0.0, start_sec), duration_sec)
+            meta = AudioMeta(
+                duration_sec=duration_sec,
+                sample_rate=self._asset.sample_rate,
+                channels=self._asset.channels,
+                sample_width=self._asset.sample_width,
+            )
+        return samples, meta
 
     def _probe_metadata(self) -> AudioMeta:
         if self._meta_cache is not None:
@@ -72,6 +116,15 @@ class ChunkLoader:
             meta = self._probe_metadata()
             return np.zeros((0,), dtype=np.float32), meta
 
+        if self._asset_store is not None:
+            return self._get_shared_chunk(
+                start_sec,
+                duration_sec,
+                target_sample_rate,
+                target_channels,
+                target_sample_width,
+            )
+
         audio = AudioSegment.from_file(
             self.file_path,
             start_second=max(0.0, start_sec),
@@ -2,26 +2,54 @@
 ChunkProcessor: process a time window using parallel track workers.
 """
 
+import copy
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from pydub import AudioSegment
 
 from audio_engine.dsp.loudness import audiosegment_to_float
+from audio_engine.dsp.sidechain import (
+    SidechainDucker,
+    build_sidechain_routes,
+    duck_segment,
+    is_sidechain_mode,
+)
 from audio_engine.dsp.streaming_compressor import StreamingCompressor
 from audio_engine.dsp.streaming_eq import StreamingHighPass, StreamingLowPass, StreamingPeakEQ
 from audio_engine.dsp.eq import _numpy_to_audiosegment, get_preset_config, get_preset_for_role
 from audio_engine.renderer.clip_processor import ClipProcessor
 from audio_engine.streaming.clip_scheduler import ClipScheduler, ClipSlice
+from audio_engine.streaming.asset_store import SharedAssetStore
+from audio_engine.streaming.chunk_cache import ChunkCache, chunk_key, dsp_state, restore_dsp_state
 from audio_engine.streaming.chunk_loader import ChunkLoader
 from audio_engine.utils.logger import get_logger
+from audio_engine.utils.metadata import file_identity
 
 logger = get_logger(__name__)
 
+# Role ranges this far either side of a chunk are part of its cache key
+_DUCKING_CONTEXT_SEC = 10.0
+
+
+@dataclass
+class DecodedChunk:
+    """Source audio for one chunk window, decoded ahead of track DSP."""
+    chunk_start: float
+    chunk_end: float
+    # track_id -> [(slice, audio or None if decoding failed)]
+    slices: Dict[str, List[Tuple[ClipSlice, Optional[AudioSegment]]]]
+
 
 class ChunkProcessor:
     """
     Process a single chunk window with parallel per-track workers.
+
+    Workers come from one pool that lives until close(), rather than a pool
+    per chunk.
     """
 
     def __init__(
@@ -31,8 +59,13 @@ class ChunkProcessor:
         sample_rate: Optional[int] = None,
         channels: Optional[int] = None,
         sample_width: Optional[int] = None,
+        asset_store: Optional[SharedAssetStore] = None,
+        chunk_cache: Optional[ChunkCache] = None,
     ):
         self.clip_processor = clip_processor or ClipProcessor()
+        self.asset_store = asset_store
+        # Memoization needs a fixed output format to rebuild cached chunks
+        self.chunk_cache = chunk_cache if sample_rate and channels and sample_width else None
         self.max_workers = max_workers
         self.sample_rate = sample_rate
         self.channels = channels
@@ -40,11 +73,47 @@ class ChunkProcessor:
         self._streaming_compressors: Dict[str, StreamingCompressor] = {}
         self._streaming_eq_chains: Dict[str, List] = {}
         self._chunk_loaders: Dict[str, ChunkLoader] = {}
+        # Decode threads look up loaders concurrently
+        self._chunk_loaders_lock = threading.Lock()
+        self._sidechain_duckers: Dict[int, SidechainDucker] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="chunk-worker",
+                )
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool. It is recreated if the processor is used again."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self._close_chunk_loaders()
+
+    def _close_chunk_loaders(self) -> None:
+        with self._chunk_loaders_lock:
+            loaders = list(self._chunk_loaders.values())
+            self._chunk_loaders.clear()
+        for loader in loaders:
+            loader.close()
+
+    def __enter__(self) -> "ChunkProcessor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
 
     def reset_streaming_state(self) -> None:
         self._streaming_compressors.clear()
         self._streaming_eq_chains.clear()
-        self._chunk_loaders.clear()
+        self._close_chunk_loaders()
+        self._sidechain_duckers.clear()
 
     def _get_streaming_compressor(
         self,
@@ -100,12 +169,214 @@ class ChunkProcessor:
         self._streaming_eq_chains[chain_key] = chain
         return chain
 
+    def _get_sidechain_ducker(
+        self,
+        rule_index: int,
+        ducking_cfg: Dict,
+        sample_rate: int,
+    ) -> SidechainDucker:
+        ducker = self._sidechain_duckers.get(rule_index)
+        if ducker is None:
+            ducker = SidechainDucker.from_config(ducking_cfg, sample_rate)
+            self._sidechain_duckers[rule_index] = ducker
+        return ducker
+
+    def _apply_sidechain_ducking(
+        self,
+        track_buffers: Dict[str, AudioSegment],
+        tracks: List[Dict],
+        ducking_cfg: Dict,
+        silence: AudioSegment,
+    ) -> Dict[str, AudioSegment]:
+        """
+        Duck target track buffers from the level of the trigger tracks in this chunk.
+
+        Every rule's detector runs on every chunk, even when its triggers or
+        targets are silent, so attack/hold/release state stays continuous.
+        """
+        routes = build_sidechain_routes(ducking_cfg, tracks)
+        if not routes:
+            return track_buffers
+
+        key_cache: Dict[str, np.ndarray] = {}
+        ducked = dict(track_buffers)
+        for route in routes:
+            key = key_cache.get(route.when)
+            if key is None:
+                key_bus = silence
+                for track_id in route.trigger_track_ids:
+                    if track_id in track_buffers:
+                        key_bus = key_bus.overlay(track_buffers[track_id])
+                key = audiosegment_to_float(key_bus)
+                key_cache[route.when] = key
+
+            ducker = self._get_sidechain_ducker(route.rule_index, ducking_cfg, silence.frame_rate)
+            gain = ducker.process_key(key)
+
+            for track_id in route.target_track_ids:
+                if track_id in ducked:
+                    try:
+                        ducked[track_id] = duck_segment(ducked[track_id], gain)
+                    except Exception as exc:
+                        logger.warning(f"Failed to apply sidechain ducking for track {track_id}: {exc}")
+
+        return ducked
+
+    def _chunk_dsp_objects(
+        self,
+        active: Dict[str, List[ClipSlice]],
+        tracks: Dict[str, Dict],
+        all_tracks: List[Dict],
+        default_ducking: Optional[Dict],
+        default_compression: Optional[Dict],
+    ) -> Dict[str, object]:
+        """
+        The stateful DSP a chunk will run, created now if it does not exist
+        yet. Names are by position in the chunk, not by timeline time, so
+        keys stay position-independent.
+        """
+        objects: Dict[str, object] = {}
+        for track_id in sorted(active):
+            track = tracks.get(track_id, {})
+            if _uses_streaming_compression(track, default_compression):
+                objects[f"compressor:{track_id}"] = self._get_streaming_compressor(
+                    track_id, default_compression, self.sample_rate
+                )
+            for index, clip_slice in enumerate(active[track_id]):
+                eq_preset, chain_key = _eq_chain_key(track_id, track, clip_slice)
+                if not eq_preset:
+                    continue
+                chain = self._get_streaming_eq_chain(chain_key, eq_preset, self.sample_rate) or []
+                for stage, eq_filter in enumerate(chain):
+                    objects[f"eq:{track_id}:{index}:{stage}"] = eq_filter
+        if is_sidechain_mode(default_ducking):
+            for route in build_sidechain_routes(default_ducking, all_tracks):
+                objects[f"sidechain:{route.rule_index}"] = self._get_sidechain_ducker(
+                    route.rule_index, default_ducking, self.sample_rate
+                )
+        return objects
+
+    def _chunk_inputs(
+        self,
+        active: Dict[str, List[ClipSlice]],
+        tracks: Dict[str, Dict],
+        clip_scheduler: ClipScheduler,
+        chunk_start: float,
+        chunk_end: float,
+        role_ranges: Optional[Dict[str, List]],
+        default_ducking: Optional[Dict],
+        default_compression: Optional[Dict],
+    ) -> Dict:
+        """Everything besides DSP state that a chunk's mix depends on, relative to its start."""
+        def rel(t: float) -> float:
+            return round(t - chunk_start, 6)
+
+        chunk_duration = chunk_end - chunk_start
+        contributions = []
+        for track_id in sorted(active):
+            slices = []
+            for clip_slice in active[track_id]:
+                clip = dict(clip_slice.clip)
+                for time_key in ("start", "loop_until"):
+                    if isinstance(clip.get(time_key), (int, float)):
+                        clip[time_key] = rel(clip[time_key])
+                slices.append([
+                    clip,
+                    clip_slice.file_path,
+                    file_identity(clip_slice.file_path),
+                    round(clip_slice.source_start_sec, 6),
+                    round(clip_slice.duration_sec, 6),
+                    rel(clip_slice.output_start_sec),
+                ])
+            track = {k: v for k, v in tracks.get(track_id, {}).items() if k != "clips"}
+            contributions.append([track_id, track, slices])
+
+        nearby_ranges = {}
+        for role, ranges in (role_ranges or {}).items():
+            near = [
+                [max(rel(s), -_DUCKING_CONTEXT_SEC), min(rel(e), chunk_duration + _DUCKING_CONTEXT_SEC)]
+                for s, e in ranges
+                if s < chunk_end + _DUCKING_CONTEXT_SEC and e > chunk_start - _DUCKING_CONTEXT_SEC
+            ]
+            if near:
+                nearby_ranges[role] = near
+
+        sidechain_tracks = None
+        if is_sidechain_mode(default_ducking):
+            sidechain_tracks = [
+                [t.get("id"), t.get("role"), t.get("semantic_role")] for t in clip_scheduler.tracks
+            ]
+
+        return {
+            "format": [self.sample_rate, self.channels, self.sample_width],
+            "chunk_ms": int(chunk_duration * 1000),
+            "to_project_end": rel(clip_scheduler.project_duration),
+            "tracks": contributions,
+            "role_ranges": nearby_ranges,
+            "ducking": default_ducking,
+            "compression": default_compression,
+            "sidechain_tracks": sidechain_tracks,
+        }
+
     def _get_chunk_loader(self, file_path: str) -> ChunkLoader:
-        loader = self._chunk_loaders.get(file_path)
-        if loader is None:
-            loader = ChunkLoader(file_path)
-            self._chunk_loaders[file_path] = loader
-        return loader
+        with self._chunk_loaders_lock:
+            loader = self._chunk_loaders.get(file_path)
+            if loader is None:
+                loader = ChunkLoader(file_path, asset_store=self.asset_store)
+                self._chunk_loaders[file_path] = loader
+            return loader
+
+    def _decode_slice(self, track_id: str, clip_slice: ClipSlice) -> Optional[AudioSegment]:
+        try:
+            loader = self._get_chunk_loader(clip_slice.file_path)
+            samples, meta = loader.get_chunk(
+                start_sec=clip_slice.source_start_sec,
+                duration_sec=clip_slice.duration_sec,
+                target_sample_rate=self.sample_rate,
+                target_channels=self.channels,
+                target_sample_width=self.sample_width,
+            )
+            return _numpy_to_audiosegment(
+                samples,
+                sample_rate=meta.sample_rate,
+                sample_width=meta.sample_width,
+                channels=meta.channels,
+            )
+        except Exception as exc:
+            logger.warning(f"Failed to decode clip slice in track {track_id}: {exc}")
+            return None
+
+    def decode_chunk(
+        self,
+        clip_scheduler: ClipScheduler,
+        chunk_start: float,
+        chunk_end: float,
+    ) -> DecodedChunk:
+        """
+        Schedule and decode every clip slice in a window on the worker pool.
+
+        Decoding is stateless, so it can run ahead of track DSP. Windows must
+        be requested in order (the scheduler sweeps forward).
+        """
+        active = clip_scheduler.get_active_clips(chunk_start, chunk_end)
+        return self._decode_active(active, chunk_start, chunk_end)
+
+    def _decode_active(
+        self,
+        active: Dict[str, List[ClipSlice]],
+        chunk_start: float,
+        chunk_end: float,
+    ) -> DecodedChunk:
+        executor = self._get_executor()
+        futures = {
+            track_id: [(clip_slice, executor.submit(self._decode_slice, track_id, clip_slice)) for clip_slice in slices]
+            for track_id, slices in active.items()
+        }
+        decoded = {
+            track_id: [(clip_slice, future.result()) for clip_slice, future in entries]
+            for track_id, entries in futures.items()
+        }
+        return DecodedChunk(chunk_start=chunk_start, chunk_end=chunk_end, slices=decoded)
 
     def process_chunk(
         self,
@@ -115,61 +386,119 @@ class ChunkProcessor:
         role_ranges: Optional[Dict[str, List]] = None,
         default_ducking: Optional[Dict] = None,
         default_compression: Optional[Dict] = None,
+        decoded: Optional[DecodedChunk] = None,
     ) -> AudioSegment:
         """
         Process all tracks within a time chunk and return mixed AudioSegment.
+
+        Pass `decoded` (from decode_chunk) to skip decoding here. Chunks must
+        be processed in order: compressors, EQ and sidechain state carry over.
+        """
+        mixed, _ = self._process_chunk(
+            clip_scheduler, chunk_start, chunk_end, role_ranges, default_ducking, default_compression, decoded
+        )
+        return mixed
+
+    def process_chunk_with_stems(
+        self,
+        clip_scheduler: ClipScheduler,
+        chunk_start: float,
+        chunk_end: float,
+        stem_groups: Dict[str, str],
+        role_ranges: Optional[Dict[str, List]] = None,
+        default_ducking: Optional[Dict] = None,
+        default_compression: Optional[Dict] = None,
+        decoded: Optional[DecodedChunk] = None,
+    ) -> Tuple[AudioSegment, Dict[str, AudioSegment]]:
+        """
+        Like process_chunk, but also return the chunk's stems: the track
+        buffers summed per stem_groups[track_id] before bus mixing. Every stem
+        in stem_groups is present, silent if none of its tracks play. The
+        chunk cache is bypassed, since it only holds the mix.
         """
+        return self._process_chunk(
+            clip_scheduler, chunk_start, chunk_end, role_ranges, default_ducking, default_compression, decoded,
+            stem_groups=stem_groups,
+        )
+
+    def _process_chunk(
+        self,
+        clip_scheduler: ClipScheduler,
+        chunk_start: float,
+        chunk_end: float,
+        role_ranges: Optional[Dict[str, List]],
+        default_ducking: Optional[Dict],
+        default_compression: Optional[Dict],
+        decoded: Optional[DecodedChunk],
+        stem_groups: Optional[Dict[str, str]] = None,
+    ) -> Tuple[AudioSegment, Optional[Dict[str, AudioSegment]]]:
         chunk_duration = max(0.0, chunk_end - chunk_start)
         chunk_ms = int(chunk_duration * 1000)
         if chunk_ms <= 0:
-            return AudioSegment.silent(duration=0)
+            empty = AudioSegment.silent(duration=0)
+            stems = {name: empty for name in set(stem_groups.values())} if stem_groups is not None else None
+            return empty, stems
 
-        active = clip_scheduler.get_active_clips(chunk_start, chunk_end)
         tracks = {track.get("id", "unknown"): track for track in clip_scheduler.tracks}
+        sidechain = is_sidechain_mode(default_ducking)
+        if sidechain:
+            # Ducking comes from the rendered trigger bus, not from clip ranges
+            role_ranges = None
+
+        cache_key = None
+        if self.chunk_cache is not None and stem_groups is None:
+            if decoded is not None:
+                active = {track_id: [s for s, _ in entries] for track_id, entries in decoded.slices.items()}
+            else:
+                active = clip_scheduler.get_active_clips(chunk_start, chunk_end)
+            dsp_objects = self._chunk_dsp_objects(active, tracks, clip_scheduler.tracks, default_ducking, default_compression)
+            cache_key = chunk_key(
+                self._chunk_inputs(
+                    active, tracks, clip_scheduler, chunk_start, chunk_end,
+                    role_ranges, default_ducking, default_compression,
+                ),
+                {name: dsp_state(obj) for name, obj in dsp_objects.items()},
+            )
+            cached = self.chunk_cache.get(cache_key)
+            if cached is not None:
+                pcm, outgoing = cached
+                for name, obj in dsp_objects.items():
+                    restore_dsp_state(obj, outgoing[name])
+                return AudioSegment(
+                    data=pcm,
+                    sample_width=self.sample_width,
+                    frame_rate=self.sample_rate,
+                    channels=self.channels,
+                ), None
+            if decoded is None:
+                decoded = self._decode_active(active, chunk_start, chunk_end)
+
+        if decoded is None:
+            decoded = self.decode_chunk(clip_scheduler, chunk_start, chunk_end)
 
-        def process_track(track_id: str, slices: List[ClipSlice]) -> AudioSegment:
+        def process_track(
+            track_id: str,
+            slices: List[Tuple[ClipSlice, Optional[AudioSegment]]],
+        ) -> AudioSegment:
             track = tracks.get(track_id, {})
             track_gain = track.get("gain", 0.0)
             track_role = track.get("role")
             track_semantic_role = track.get("semantic_role")
             track_eq_preset = track.get("eq_preset")
-            track_streaming_compression = (
-                track_role == "voice"
-                and default_compression
-                and default_compression.get("enabled")
-            )
+            track_streaming_compression = _uses_streaming_compression(track, default_compression)
 
             buffer = AudioSegment.silent(duration=chunk_ms, frame_rate=self.sample_rate or 44100)
             if self.channels and buffer.channels != self.channels:
                 buffer = buffer.set_channels(self.channels)
             if self.sample_width and buffer.sample_width != self.sample_width:
                 buffer = buffer.set_sample_width(self.sample_width)
-            for clip_slice in slices:
+            for clip_slice, audio in slices:
+                if audio is None:
+                    continue
                 try:
-                    loader = self._get_chunk_loader(clip_slice.file_path)
-                    samples, meta = loader.get_chunk(
-                        start_sec=clip_slice.source_start_sec,
-                        duration_sec=clip_slice.duration_sec,
-                        target_sample_rate=self.sample_rate,
-                        target_channels=self.channels,
-                        target_sample_width=self.sample_width,
-                    )
-                    audio = _numpy_to_audiosegment(
-                        samples,
-                        sample_rate=meta.sample_rate,
-                        sample_width=meta.sample_width,
-                        channels=meta.channels,
-                    )
-
-                    clip_semantic_role = clip_slice.clip.get("semantic_role", track_semantic_role)
-                    eq_preset = (
-                        clip_slice.clip.get("eq_preset")
-                        or track_eq_preset
-                        or get_preset_for_role(track_role, clip_semantic_role)
-                    )
+                    eq_preset, chain_key = _eq_chain_key(track_id, track, clip_slice)
                     chain = None
                     if eq_preset:
-                        chain_key = f"{track_id}:{clip_slice.clip.get('id') or clip_slice.file_path}:{clip_slice.clip.get('start', 0)}:{eq_preset}"
                         chain = self._get_streaming_eq_chain(
                             chain_key=chain_key,
                             preset_name=eq_preset,
@@ -190,6 +519,8 @@ class ChunkProcessor:
                     clip_copy["_audio_override"] = audio
                     clip_copy["_timeline_start"] = clip_slice.output_start_sec
                     clip_copy["_overlay_start"] = clip_slice.output_start_sec - chunk_start
+                    # Ducking curves are computed once per chunk window and shared by all slices
+                    clip_copy["_duck_window"] = (chunk_start, chunk_end)
                     if track_streaming_compression:
                         clip_copy["_skip_compression"] = True
                     if eq_preset and chain:
@@ -239,26 +570,70 @@ class ChunkProcessor:
             return buffer
 
         # Stage 1: parallel track processing
-        track_buffers: Dict[str, AudioSegment] = {}
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(process_track, track_id, slices): track_id
-                for track_id, slices in active.items()
-            }
-            for future in futures:
-                track_id = futures[future]
-                track_buffers[track_id] = future.result()
+        executor = self._get_executor()
+        futures = {
+            track_id: executor.submit(process_track, track_id, slices)
+            for track_id, slices in decoded.slices.items()
+        }
+        track_buffers: Dict[str, AudioSegment] = {
+            track_id: future.result() for track_id, future in futures.items()
+        }
 
-        # Stage 2: bus mixing (controlled)
         mixed = AudioSegment.silent(duration=chunk_ms, frame_rate=self.sample_rate or 44100)
         if self.channels and mixed.channels != self.channels:
             mixed = mixed.set_channels(self.channels)
         if self.sample_width and mixed.sample_width != self.sample_width:
             mixed = mixed.set_sample_width(self.sample_width)
+
+        # Stage 1b: sidechain ducking from the processed trigger tracks
+        if sidechain:
+            track_buffers = self._apply_sidechain_ducking(
+                track_buffers,
+                clip_scheduler.tracks,
+                default_ducking,
+                silence=mixed,
+            )
+
+        # Stage 2: bus mixing (controlled)
+        stems = {name: mixed for name in set(stem_groups.values())} if stem_groups is not None else None
         for track_id in sorted(track_buffers.keys()):
             try:
                 mixed = mixed.overlay(track_buffers[track_id])
             except Exception as exc:
                 logger.warning(f"Failed to mix track {track_id}: {exc}")
+            if stems is not None and track_id in stem_groups:
+                name = stem_groups[track_id]
+                try:
+                    stems[name] = stems[name].overlay(track_buffers[track_id])
+                except Exception as exc:
+                    logger.warning(f"Failed to mix track {track_id} into stem {name}: {exc}")
 
-        return mixed
+        if cache_key is not None:
+            self.chunk_cache.put(
+                cache_key,
+                mixed.raw_data,
+                {name: copy.deepcopy(dsp_state(obj)) for name, obj in dsp_objects.items()},
+            )
+        return mixed, stems
+
+
+def _uses_streaming_compression(track: Dict, default_compression: Optional[Dict]) -> bool:
+    return bool(
+        track.get("role") == "voice"
+        and default_compression
+        and default_compression.get("enabled")
+    )
+
+
+def _eq_chain_key(track_id: str, track: Dict, clip_slice: ClipSlice) -> Tuple[Optional[str], Optional[str]]:
+    """(EQ preset, streaming chain key) for a slice; the chain carries state across chunks."""
+    clip_semantic_role = clip_slice.clip.get("semantic_role", track.get("semantic_role"))
+    eq_preset = (
+        clip_slice.clip.get("eq_preset")
+        or track.get("eq_preset")
+        or get_preset_for_role(track.get("role"), clip_semantic_role)
+    )
+    if not eq_preset:
+        return None, None
+    chain_key = f"{track_id}:{clip_slice.clip.get('id') or clip_slice.file_path}:{clip_slice.clip.get('start', 0)}:{eq_preset}"
+    return eq_preset, chain_key
@@ -2,12 +2,12 @@
 ClipScheduler: compute which clips are active in a given time window.
 """
 
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-
-from pydub.utils import mediainfo
+from typing import Dict, List, Optional, Tuple
 
 from audio_engine.utils.logger import get_logger
+from audio_engine.utils.metadata import get_metadata_provider
 
 logger = get_logger(__name__)
 
@@ -22,9 +22,32 @@ class ClipSlice:
     output_start_sec: float
 
 
+@dataclass
+class _IndexedClip:
+    track_index: int
+    clip_index: int
+    track_id: str
+    clip: Dict
+    file_path: str
+    start: float
+    end: float
+    looped: bool
+
+    @property
+    def order(self) -> Tuple[int, int]:
+        return (self.track_index, self.clip_index)
+
+
 class ClipScheduler:
     """
     Determines which clips overlap each time chunk, including looped clips.
+
+    Clip extents (loop_until for looped clips, probed duration otherwise) are
+    indexed by start time once at construction. Chunks requested in
+    increasing time order are answered with a sweep-line cursor, so each
+    query only touches clips that start inside it or are still sounding.
+    Requesting an earlier chunk (e.g. the second pass of a two-pass render)
+    re-seeks the cursor.
     """
 
     def __init__(self, timeline: Dict):
@@ -32,21 +55,67 @@ class ClipScheduler:
         self._duration_cache: Dict[str, float] = {}
         self.project_duration = float(timeline.get("project", {}).get("duration", 0.0))
         self.tracks = timeline.get("tracks", [])
+        self._build_index()
 
     def _get_audio_duration(self, file_path: str) -> float:
         if file_path in self._duration_cache:
             return self._duration_cache[file_path]
 
-        try:
-            info = mediainfo(file_path)
-            duration = float(info.get("duration", 0.0))
-        except Exception as exc:
-            logger.warning(f"Failed to probe duration for {file_path}: {exc}")
+        duration = get_metadata_provider().duration(file_path)
+        if duration is None:
+            logger.warning(f"Failed to probe duration for {file_path}")
             duration = 0.0
 
         self._duration_cache[file_path] = duration
         return duration
 
+    def _build_index(self) -> None:
+        get_metadata_provider().prefetch(
+            clip.get("file")
+            for track in self.tracks
+            for clip in track.get("clips", [])
+            if not clip.get("loop", False)
+        )
+
+        entries: List[_IndexedClip] = []
+        for track_index, track in enumerate(self.tracks):
+            track_id = track.get("id", "unknown")
+            for clip_index, clip in enumerate(track.get("clips", [])):
+                file_path = clip.get("file")
+                if not file_path:
+                    continue
+
+                start = float(clip.get("start", 0.0))
+                looped = bool(clip.get("loop", False))
+                if looped:
+                    end = float(clip.get("loop_until", self.project_duration))
+                else:
+                    end = start + self._get_audio_duration(file_path)
+                if end <= start:
+                    continue
+
+                entries.append(_IndexedClip(
+                    track_index=track_index,
+                    clip_index=clip_index,
+                    track_id=track_id,
+                    clip=clip,
+                    file_path=file_path,
+                    start=start,
+                    end=end,
+                    looped=looped,
+                ))
+
+        entries.sort(key=lambda e: e.start)
+        self._entries = entries
+        self._starts = [e.start for e in entries]
+        self._seek(0.0, 0.0)
+
+    def _seek(self, chunk_start: float, chunk_end: float) -> None:
+        """Reset the sweep so it is positioned at chunk_start."""
+        self._cursor = bisect_left(self._starts, chunk_end)
+        self._active = [e for e in self._entries[:self._cursor] if e.end > chunk_start]
+        self._last_start = chunk_start
+
     def get_active_clips(
         self,
         chunk_start: float,
@@ -55,52 +124,49 @@ class ClipScheduler:
         """
         Return a mapping of track_id -> list of ClipSlice overlapping this chunk.
         """
-        active: Dict[str, List[ClipSlice]] = {}
+        if chunk_start < self._last_start:
+            self._seek(chunk_start, chunk_end)
+        self._last_start = chunk_start
 
-        for track in self.tracks:
-            track_id = track.get("id", "unknown")
-            for clip in track.get("clips", []):
-                file_path = clip.get("file")
-                start = float(clip.get("start", 0.0))
+        # Admit clips that start before the chunk ends, retire clips that ended
+        while self._cursor < len(self._entries) and self._starts[self._cursor] < chunk_end:
+            self._active.append(self._entries[self._cursor])
+            self._cursor += 1
+        self._active = [e for e in self._active if e.end > chunk_start]
 
-                if not file_path:
+        active: Dict[str, List[ClipSlice]] = {}
+        for entry in sorted(self._active, key=lambda e: e.order):
+            if entry.start >= chunk_end:
+                continue
+            if entry.looped:
+                self._add_looped_slices(
+                    active,
+                    entry.track_id,
+                    entry.clip,
+                    entry.file_path,
+                    entry.start,
+                    entry.end,
+                    chunk_start,
+                    chunk_end,
+                )
+            else:
+                overlap_start = max(entry.start, chunk_start)
+                overlap_end = min(entry.end, chunk_end)
+                slice_duration = max(0.0, overlap_end - overlap_start)
+                if slice_duration <= 0:
                     continue
 
-                if clip.get("loop", False):
-                    loop_until = float(clip.get("loop_until", self.project_duration))
-                    self._add_looped_slices(
-                        active,
-                        track_id,
-                        clip,
-                        file_path,
-                        start,
-                        loop_until,
-                        chunk_start,
-                        chunk_end,
-                    )
-                else:
-                    duration = self._get_audio_duration(file_path)
-                    end = start + duration
-                    if end <= chunk_start or start >= chunk_end:
-                        continue
-
-                    overlap_start = max(start, chunk_start)
-                    overlap_end = min(end, chunk_end)
-                    slice_duration = max(0.0, overlap_end - overlap_start)
-                    if slice_duration <= 0:
-                        continue
-
-                    source_start = overlap_start - start
-                    active.setdefault(track_id, []).append(
-                        ClipSlice(
-                            track_id=track_id,
-                            clip=clip,
-                            file_path=file_path,
-                            source_start_sec=source_start,
-                            duration_sec=slice_duration,
-                            output_start_sec=overlap_start,
-                        )
+                source_start = overlap_start - entry.start
+                active.setdefault(entry.track_id, []).append(
+                    ClipSlice(
+                        track_id=entry.track_id,
+                        clip=entry.clip,
+                        file_path=entry.file_path,
+                        source_start_sec=source_start,
+                        duration_sec=slice_duration,
+                        output_start_sec=overlap_start,
                     )
+                )
 
         return active
 
@@ -0,0 +1,349 @@
+"""
+Incremental streaming renders: re-render only the chunks an edit touched.
+
+The pre-master mix (track DSP, bus mix, master gain, scene EQ) is kept next
+to the output together with a manifest of per-chunk fingerprints. Each
+fingerprint covers everything that feeds the chunk: the clip slices that
+sound in it (clip settings, source file identity, source offsets), their
+tracks' settings and the ducking role ranges around it. A global fingerprint
+of the render settings, engine version and resolved EQ preset versions
+covers every chunk at once.
+
+On the next render, chunks whose fingerprint changed are dirty. Track DSP
+is stateful, so each dirty chunk also dirties the following `state_tail_sec`
+(compressor release, EQ ring-out, ducking ramps), and each dirty range is
+rendered with a warm-up of the same length that is then discarded, as in
+time-sharded renders. Clean chunks are copied from the previous pre-master
+mix. Loudness, peak normalisation and the master fade-out then run over the
+whole mix as usual, since they depend on all of it.
+"""
+
+import json
+import math
+import os
+import wave
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from audio_engine import __version__
+from audio_engine.streaming.sharded import ShardJob, Window, chunk_windows, render_shard, render_sharded_mix
+from audio_engine.utils.hashing import content_key, preset_versions
+from audio_engine.utils.logger import get_logger
+from audio_engine.utils.metadata import file_identity
+
+logger = get_logger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Streaming settings that change how a render runs, not what it produces
+_RUNTIME_STREAMING_KEYS = {
+    "max_workers",
+    "pipeline",
+    "shards",
+    "shard_warmup_sec",
+    "asset_store",
+    "chunk_cache",
+    "incremental",
+    "chunk_size_sec",
+    "auto_memory_mb",
+    "calibration_sec",
+}
+
+
+@dataclass
+class IncrementalResult:
+    rendered_chunks: int
+    reused_chunks: int
+
+
+def manifest_path_for(output_path: str) -> str:
+    return f"{output_path}.render.json"
+
+
+def premix_path_for(output_path: str) -> str:
+    return f"{output_path}.premix.wav"
+
+
+def global_fingerprint(
+    settings: Dict,
+    duration: float,
+    chunk_size_sec: float,
+    sample_rate: int,
+    channels: int,
+    sample_width: int,
+) -> str:
+    """Hash of everything that affects every chunk; a change re-renders all of them."""
+    settings = dict(settings)
+    settings["streaming"] = {
+        k: v for k, v in settings.get("streaming", {}).items() if k not in _RUNTIME_STREAMING_KEYS
+    }
+    return content_key({
+        "engine_version": __version__,
+        "presets": preset_versions(),
+        "settings": settings,
+        "duration": duration,
+        "chunk_size_sec": chunk_size_sec,
+        "format": [sample_rate, channels, sample_width],
+    })
+
+
+def chunk_fingerprints(
+    scheduler,
+    windows: Sequence[Window],
+    role_ranges: Optional[Dict[str, List]],
+    context_sec: float,
+) -> List[str]:
+    """One fingerprint per chunk of everything the chunk's pre-master mix depends on."""
+    tracks = {
+        track.get("id", "unknown"): {k: v for k, v in track.items() if k != "clips"}
+        for track in scheduler.tracks
+    }
+    identities: Dict[str, str] = {}
+    fingerprints = []
+    for chunk_start, chunk_end in windows:
+        active = scheduler.get_active_clips(chunk_start, chunk_end)
+        contributions = []
+        for track_id in sorted(active):
+            slices = []
+            for clip_slice in active[track_id]:
+                if clip_slice.file_path not in identities:
+                    identities[clip_slice.file_path] = file_identity(clip_slice.file_path)
+                slices.append([
+                    clip_slice.clip,
+                    identities[clip_slice.file_path],
+                    round(clip_slice.source_start_sec, 6),
+                    round(clip_slice.duration_sec, 6),
+                    round(clip_slice.output_start_sec, 6),
+                ])
+            contributions.append([track_id, tracks.get(track_id), slices])
+
+        nearby_ranges = {}
+        for role, ranges in (role_ranges or {}).items():
+            near = [
+                [round(s, 6), round(e, 6)] for s, e in ranges
+                if s < chunk_end + context_sec and e > chunk_start - context_sec
+            ]
+            if near:
+                nearby_ranges[role] = near
+
+        fingerprints.append(content_key([contributions, nearby_ranges]))
+    return fingerprints
+
+
+def plan_dirty_ranges(
+    previous: Sequence[str],
+    current: Sequence[str],
+    tail_chunks: int,
+    warmup_chunks: int,
+) -> List[Tuple[int, int, int]]:
+    """
+    (warmup_from, start, end) chunk-index ranges to re-render. Ranges whose
+    warm-up would reach back into the previous range are merged with it.
+    """
+    total = len(current)
+    dirty = [False] * total
+    for i, fingerprint in enumerate(current):
+        if i >= len(previous) or previous[i] != fingerprint:
+            for j in range(i, min(total, i + 1 + tail_chunks)):
+                dirty[j] = True
+
+    ranges: List[List[int]] = []
+    i = 0
+    while i < total:
+        if not dirty[i]:
+            i += 1
+            continue
+        start = i
+        while i < total and dirty[i]:
+            i += 1
+        if ranges and start - warmup_chunks <= ranges[-1][2]:
+            ranges[-1][2] = i
+        else:
+            ranges.append([max(0, start - warmup_chunks), start, i])
+    return [tuple(r) for r in ranges]
+
+
+def load_manifest(path: str) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(path: str, manifest: Dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def _window_frames(windows: Sequence[Window], sample_rate: int) -> List[int]:
+    # Same frame count as the silent chunk buffer ChunkProcessor mixes into
+    return [int(int(max(0.0, end - start) * 1000) * (sample_rate / 1000.0)) for start, end in windows]
+
+
+def _wav_frames(path: str) -> Optional[int]:
+    try:
+        with wave.open(path, "rb") as wav:
+            return wav.getnframes()
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+def splice_premix(
+    previous_path: str,
+    range_files: Sequence[Tuple[int, int, str]],
+    frames_per_chunk: Sequence[int],
+    output_file: str,
+) -> None:
+    """Write chunks from `range_files` ((start, end, path) by chunk index) over the previous mix."""
+    frame_offsets = [0]
+    for frames in frames_per_chunk:
+        frame_offsets.append(frame_offsets[-1] + frames)
+
+    with wave.open(previous_path, "rb") as previous, wave.open(output_file, "wb") as out:
+        out.setparams(previous.getparams())
+        position = 0
+        for start, end, path in list(range_files) + [(len(frames_per_chunk), len(frames_per_chunk), None)]:
+            if frame_offsets[start] > frame_offsets[position]:
+                previous.setpos(frame_offsets[position])
+                out.writeframes(previous.readframes(frame_offsets[start] - frame_offsets[position]))
+            if path is not None:
+                with wave.open(path, "rb") as rendered:
+                    out.writeframes(rendered.readframes(rendered.getnframes()))
+            position = end
+
+
+def render_incremental_mix(
+    timeline: Dict,
+    scheduler,
+    output_path: str,
+    duration: float,
+    chunk_size_sec: float,
+    state_tail_sec: float,
+    role_ranges: Optional[Dict[str, List]],
+    default_ducking: Optional[Dict],
+    default_compression: Optional[Dict],
+    scene_eq: Optional[Dict],
+    master_gain: float,
+    sample_rate: int,
+    channels: int,
+    sample_width: int,
+    max_workers: int,
+    num_shards: int = 1,
+    asset_store: Optional[Dict] = None,
+    chunk_cache: Optional[Dict] = None,
+) -> IncrementalResult:
+    """
+    Bring the pre-master mix at premix_path_for(output_path) up to date with
+    `timeline`, re-rendering only dirty chunks when the previous manifest
+    allows it.
+    """
+    windows = list(chunk_windows(duration, chunk_size_sec))
+    premix = premix_path_for(output_path)
+    manifest_path = manifest_path_for(output_path)
+    frames_per_chunk = _window_frames(windows, sample_rate)
+
+    global_fp = global_fingerprint(
+        timeline.get("settings", {}), duration, chunk_size_sec, sample_rate, channels, sample_width
+    )
+    fingerprints = chunk_fingerprints(scheduler, windows, role_ranges, state_tail_sec)
+
+    previous = load_manifest(manifest_path)
+    reusable = (
+        previous is not None
+        and previous.get("global") == global_fp
+        and _wav_frames(premix) == sum(frames_per_chunk)
+    )
+
+    def shard_job(index: int, warmup_from: int, start: int, end: int, output_file: str) -> ShardJob:
+        return ShardJob(
+            index=index,
+            timeline=timeline,
+            windows=windows[warmup_from:end],
+            emit_from=start - warmup_from,
+            output_file=output_file,
+            role_ranges=role_ranges,
+            default_ducking=default_ducking,
+            default_compression=default_compression,
+            scene_eq=scene_eq,
+            master_gain=master_gain,
+            sample_rate=sample_rate,
+            channels=channels,
+            sample_width=sample_width,
+            max_workers=max_workers,
+            asset_store=asset_store,
+            chunk_cache=chunk_cache,
+        )
+
+    # Invalidate first, so an interrupted render never leaves a manifest
+    # describing a half-written mix
+    try:
+        os.remove(manifest_path)
+    except OSError:
+        pass
+
+    if not reusable:
+        logger.info(f"Incremental render: no reusable previous render, rendering all {len(windows)} chunks")
+        tmp_premix = f"{premix}.tmp.wav"
+        if num_shards > 1:
+            render_sharded_mix(
+                timeline=timeline,
+                output_file=tmp_premix,
+                duration=duration,
+                chunk_size_sec=chunk_size_sec,
+                num_shards=num_shards,
+                warmup_sec=state_tail_sec,
+                role_ranges=role_ranges,
+                default_ducking=default_ducking,
+                default_compression=default_compression,
+                scene_eq=scene_eq,
+                master_gain=master_gain,
+                sample_rate=sample_rate,
+                channels=channels,
+                sample_width=sample_width,
+                max_workers=max_workers,
+                asset_store=asset_store,
+                chunk_cache=chunk_cache,
+            )
+        else:
+            render_shard(shard_job(0, 0, 0, len(windows), tmp_premix))
+        os.replace(tmp_premix, premix)
+        result = IncrementalResult(rendered_chunks=len(windows), reused_chunks=0)
+    else:
+        state_chunks = math.ceil(max(0.0, state_tail_sec) / chunk_size_sec) if chunk_size_sec > 0 else 0
+        ranges = plan_dirty_ranges(previous["chunks"], fingerprints, state_chunks, state_chunks)
+        rendered = sum(end - start for _, start, end in ranges)
+        logger.info(
+            f"Incremental render: {rendered}/{len(windows)} chunks dirty in {len(ranges)} ranges"
+        )
+
+        range_files: List[Tuple[int, int, str]] = []
+        try:
+            for index, (warmup_from, start, end) in enumerate(ranges):
+                range_file = f"{premix}.range{index}.tmp.wav"
+                range_files.append((start, end, range_file))
+                render_shard(shard_job(index, warmup_from, start, end, range_file))
+            if ranges:
+                tmp_premix = f"{premix}.tmp.wav"
+                splice_premix(premix, range_files, frames_per_chunk, tmp_premix)
+                os.replace(tmp_premix, premix)
+        finally:
+            for _, _, range_file in range_files:
+                try:
+                    os.remove(range_file)
+                except OSError:
+                    pass
+        result = IncrementalResult(rendered_chunks=rendered, reused_chunks=len(windows) - rendered)
+
+    write_manifest(manifest_path, {
+        "version": MANIFEST_VERSION,
+        "global": global_fp,
+        "chunk_size_sec": chunk_size_sec,
+        "chunks": fingerprints,
+    })
+    return result
@@ -0,0 +1,100 @@
+"""
+Staged pipeline: run each stage on its own thread, joined by bounded queues.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Sequence
+
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_DONE = object()
+_POLL_SEC = 0.1
+
+
+class _StageFailure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def run_pipeline(
+    source: Iterable[Any],
+    stages: Sequence[Callable[[Any], Any]],
+    depth: int = 1,
+) -> Iterator[Any]:
+    """
+    Feed `source` through `stages` in order and yield the final results.
+
+    Every stage runs on its own thread, so stage k can work on item n+1
+    while stage k+1 works on item n. Queues hold at most `depth` items,
+    which bounds how far a stage can run ahead. Items stay in order; an
+    exception in any stage is re-raised in the consumer.
+    """
+    stop = threading.Event()
+    queues: List[queue.Queue] = [queue.Queue(maxsize=max(1, depth)) for _ in range(len(stages) + 1)]
+
+    def put(q: queue.Queue, item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SEC)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q: queue.Queue) -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SEC)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def feed() -> None:
+        try:
+            for item in source:
+                if not put(queues[0], item):
+                    return
+        except BaseException as exc:
+            put(queues[0], _StageFailure(exc))
+            return
+        put(queues[0], _DONE)
+
+    def run_stage(index: int, fn: Callable[[Any], Any]) -> None:
+        inbox, outbox = queues[index], queues[index + 1]
+        while True:
+            item = get(inbox)
+            if item is _DONE or isinstance(item, _StageFailure):
+                put(outbox, item)
+                return
+            try:
+                result = fn(item)
+            except BaseException as exc:
+                put(outbox, _StageFailure(exc))
+                return
+            if not put(outbox, result):
+                return
+
+    threads = [threading.Thread(target=feed, name="pipeline-source", daemon=True)]
+    threads.extend(
+        threading.Thread(target=run_stage, args=(i, fn), name=f"pipeline-stage-{i}", daemon=True)
+        for i, fn in enumerate(stages)
+    )
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = get(queues[-1])
+            if item is _DONE:
+                return
+            if isinstance(item, _StageFailure):
+                raise item.exc
+            yield item
+    finally:
+        # Normal exit, stage failure or the consumer stopping early
+        stop.set()
+        for thread in threads:
+            thread.join()
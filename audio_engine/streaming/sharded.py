@@ -0,0 +1,233 @@
+"""
+Time-sharded streaming: render contiguous time ranges in separate processes.
+
+Track DSP is stateful (EQ, compressors, sidechain detectors, scene shelves),
+so each shard starts rendering a few chunks before its first output chunk
+and discards that pre-roll. By the time the shard reaches its own range the
+filter state has converged to what a continuous render would have.
+"""
+
+import math
+import os
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydub import AudioSegment
+
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Window = Tuple[float, float]
+
+
+def chunk_windows(duration: float, chunk_size_sec: float) -> Iterator[Window]:
+    """The (start, end) chunk grid used by every streaming render."""
+    chunk_start = 0.0
+    while chunk_start < duration:
+        chunk_end = min(duration, chunk_start + chunk_size_sec)
+        yield chunk_start, chunk_end
+        chunk_start = chunk_end
+
+
+@dataclass
+class ShardJob:
+    """Everything a worker process needs to render one shard."""
+    index: int
+    timeline: Dict
+    windows: List[Window]
+    # windows[:emit_from] are warm-up only
+    emit_from: int
+    output_file: str
+    role_ranges: Optional[Dict[str, List]]
+    default_ducking: Optional[Dict]
+    default_compression: Optional[Dict]
+    scene_eq: Optional[Dict]
+    master_gain: float
+    sample_rate: int
+    channels: int
+    sample_width: int
+    max_workers: int
+    # settings["streaming"]["asset_store"], so workers map the same decoded files
+    asset_store: Optional[Dict] = None
+    # settings["streaming"]["chunk_cache"]
+    chunk_cache: Optional[Dict] = None
+
+
+def plan_shards(
+    windows: Sequence[Window],
+    num_shards: int,
+    chunk_size_sec: float,
+    warmup_sec: float,
+) -> List[Tuple[int, int, int]]:
+    """
+    Split the chunk grid into contiguous shards.
+
+    Returns (warmup_from, start, end) indices into `windows` per shard, with
+    the warm-up rounded up to whole chunks so boundaries stay on the grid.
+    """
+    total = len(windows)
+    if total == 0:
+        return []
+    num_shards = max(1, min(num_shards, total))
+    per_shard = math.ceil(total / num_shards)
+    warmup_chunks = math.ceil(max(0.0, warmup_sec) / chunk_size_sec) if chunk_size_sec > 0 else 0
+
+    shards = []
+    for start in range(0, total, per_shard):
+        end = min(total, start + per_shard)
+        shards.append((max(0, start - warmup_chunks), start, end))
+    return shards
+
+
+def render_shard(job: ShardJob) -> str:
+    """Worker entry point: render one shard's mix to its own WAV file."""
+    from audio_engine.dsp.streaming_eq import SceneTonalShaper
+    from audio_engine.renderer.clip_processor import ClipProcessor
+    from audio_engine.streaming.asset_store import get_asset_store
+    from audio_engine.streaming.chunk_cache import get_chunk_cache
+    from audio_engine.streaming.chunk_processor import ChunkProcessor
+    from audio_engine.streaming.clip_scheduler import ClipScheduler
+    from audio_engine.streaming.stream_writer import StreamWriter
+
+    scheduler = ClipScheduler(job.timeline)
+    tonal_shaper = SceneTonalShaper(job.scene_eq, job.sample_rate) if job.scene_eq else None
+    writer = StreamWriter(
+        output_path=job.output_file,
+        sample_rate=job.sample_rate,
+        channels=job.channels,
+        sample_width=job.sample_width,
+    )
+    writer.open()
+    try:
+        with ChunkProcessor(
+            clip_processor=ClipProcessor(),
+            max_workers=job.max_workers,
+            sample_rate=job.sample_rate,
+            channels=job.channels,
+            sample_width=job.sample_width,
+            asset_store=get_asset_store(job.asset_store),
+            chunk_cache=get_chunk_cache(job.chunk_cache),
+        ) as chunk_processor:
+            for i, (chunk_start, chunk_end) in enumerate(job.windows):
+                chunk_audio = chunk_processor.process_chunk(
+                    clip_scheduler=scheduler,
+                    chunk_start=chunk_start,
+                    chunk_end=chunk_end,
+                    role_ranges=job.role_ranges,
+                    default_ducking=job.default_ducking,
+                    default_compression=job.default_compression,
+                )
+                if job.master_gain != 0:
+                    chunk_audio = chunk_audio.apply_gain(job.master_gain)
+                if tonal_shaper is not None:
+                    chunk_audio = tonal_shaper.process_segment(chunk_audio)
+                if i >= job.emit_from:
+                    writer.write_segment(chunk_audio)
+    finally:
+        writer.close()
+    return job.output_file
+
+
+def render_sharded_mix(
+    timeline: Dict,
+    output_file: str,
+    duration: float,
+    chunk_size_sec: float,
+    num_shards: int,
+    warmup_sec: float,
+    role_ranges: Optional[Dict[str, List]],
+    default_ducking: Optional[Dict],
+    default_compression: Optional[Dict],
+    scene_eq: Optional[Dict],
+    master_gain: float,
+    sample_rate: int,
+    channels: int,
+    sample_width: int,
+    max_workers: int,
+    asset_store: Optional[Dict] = None,
+    chunk_cache: Optional[Dict] = None,
+) -> None:
+    """
+    Render the pre-master mix (track DSP, bus mix, master gain, scene EQ)
+    across `num_shards` processes and stitch the shards into `output_file`.
+    """
+    windows = list(chunk_windows(duration, chunk_size_sec))
+    shards = plan_shards(windows, num_shards, chunk_size_sec, warmup_sec)
+    threads_per_shard = max(1, max_workers // max(1, len(shards)))
+
+    jobs = [
+        ShardJob(
+            index=index,
+            timeline=timeline,
+            windows=windows[warmup_from:end],
+            emit_from=start - warmup_from,
+            output_file=f"{output_file}.shard{index}.tmp.wav",
+            role_ranges=role_ranges,
+            default_ducking=default_ducking,
+            default_compression=default_compression,
+            scene_eq=scene_eq,
+            master_gain=master_gain,
+            sample_rate=sample_rate,
+            channels=channels,
+            sample_width=sample_width,
+            max_workers=threads_per_shard,
+            asset_store=asset_store,
+            chunk_cache=chunk_cache,
+        )
+        for index, (warmup_from, start, end) in enumerate(shards)
+    ]
+    logger.info(
+        f"Rendering {len(windows)} chunks in {len(jobs)} shards "
+        f"({warmup_sec:.1f}s warm-up, {threads_per_shard} threads per shard)"
+    )
+
+    try:
+        with ProcessPoolExecutor(max_workers=len(jobs) or 1) as executor:
+            shard_files = list(executor.map(render_shard, jobs))
+        stitch_wav_files(shard_files, output_file)
+    finally:
+        for job in jobs:
+            try:
+                os.remove(job.output_file)
+            except OSError:
+                pass
+
+
+def stitch_wav_files(paths: Sequence[str], output_file: str, block_frames: int = 1 << 18) -> None:
+    """Concatenate WAV files with identical formats, block by block."""
+    out = None
+    try:
+        for path in paths:
+            with wave.open(path, "rb") as src:
+                if out is None:
+                    out = wave.open(output_file, "wb")
+                    out.setparams(src.getparams())
+                while True:
+                    frames = src.readframes(block_frames)
+                    if not frames:
+                        break
+                    out.writeframes(frames)
+    finally:
+        if out is not None:
+            out.close()
+
+
+def iter_wav_windows(path: str, windows: Sequence[Window]) -> Iterator[Tuple[float, AudioSegment]]:
+    """Read a WAV file back as (chunk_start, AudioSegment) on the chunk grid."""
+    with wave.open(path, "rb") as src:
+        rate = src.getframerate()
+        channels = src.getnchannels()
+        width = src.getsampwidth()
+        for chunk_start, chunk_end in windows:
+            # Same frame count as the silent chunk buffer ChunkProcessor mixes into
+            chunk_ms = int(max(0.0, chunk_end - chunk_start) * 1000)
+            frames = src.readframes(int(chunk_ms * (rate / 1000.0)))
+            yield chunk_start, AudioSegment(
+                data=frames,
+                sample_width=width,
+                frame_rate=rate,
+                channels=channels,
+            )
@@ -1,16 +1,99 @@
 """
 StreamWriter: write audio chunks progressively to a WAV file.
+
+EncoderStreamWriter and FlacStreamWriter take the same chunks and produce
+compressed files as the render progresses: the first through one long-lived
+ffmpeg process fed over stdin, the second in-process through soundfile
+(libsndfile). open_stream_writer picks the writer for an output format.
+
+Writers convert chunks to their own sample rate with a StreamResampler, so
+the conversion runs across chunk boundaries as if the whole file were
+converted at once.
 """
 
+import math
+import subprocess
+import tempfile
 import wave
-from typing import Optional
+from typing import Iterable, List, Optional
 
+import numpy as np
 from pydub import AudioSegment
+from pydub.utils import audioop
 
+from audio_engine.exceptions import FileError
 from audio_engine.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# ffmpeg muxer for output formats whose name is not the muxer's
+FFMPEG_MUXERS = {"m4a": "ipod", "aac": "adts"}
+
+# Raw PCM input format for each sample width (24-bit is fed as 32-bit)
+_RAW_FORMATS = {1: "u8", 2: "s16le", 3: "s32le", 4: "s32le"}
+
+
+def output_format(path: str) -> str:
+    """Format implied by a path's extension; WAV unless it names another format."""
+    ext = path.rsplit(".", 1)[-1].lower() if "." in path.replace("\\", "/").rsplit("/", 1)[-1] else ""
+    return "wav" if ext in ("", "wav", "wave") else ext
+
+
+class StreamResampler:
+    """
+    Sample-rate conversion of consecutive chunks (audioop.ratecv, as pydub's
+    set_frame_rate). The converter state is carried from chunk to chunk, and
+    flush() returns the frames it still holds, so the chunks convert to
+    exactly the frames of the whole input with no discontinuity at chunk
+    boundaries.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._state = None
+        self._source: Optional[AudioSegment] = None
+        self._frames_in = 0
+        self._frames_out = 0
+
+    def process(self, audio: AudioSegment) -> AudioSegment:
+        if audio.frame_rate == self.sample_rate:
+            return audio
+        data, self._state = audioop.ratecv(
+            audio.raw_data, audio.sample_width, audio.channels, audio.frame_rate, self.sample_rate, self._state
+        )
+        self._source = audio
+        self._frames_in += int(audio.frame_count())
+        self._frames_out += len(data) // audio.frame_width
+        return audio._spawn(data, overrides={"frame_rate": self.sample_rate})
+
+    def flush(self) -> Optional[AudioSegment]:
+        """The frames still due for the audio converted so far, or None."""
+        source = self._source
+        if source is None:
+            return None
+        missing = round(self._frames_in * self.sample_rate / source.frame_rate) - self._frames_out
+        self._source = None
+        if missing <= 0:
+            return None
+        # Hold the last frame to drain the frames the converter holds back, without a step to silence
+        padding = math.ceil(missing * source.frame_rate / self.sample_rate) + 2
+        data, self._state = audioop.ratecv(
+            source.raw_data[-source.frame_width:] * padding, source.sample_width, source.channels,
+            source.frame_rate, self.sample_rate, self._state,
+        )
+        data = data[:missing * source.frame_width]
+        data += data[-source.frame_width:] * (missing - len(data) // source.frame_width)
+        self._frames_out += missing
+        return source._spawn(data, overrides={"frame_rate": self.sample_rate})
+
+
+def resample(audio: AudioSegment, sample_rate: int) -> AudioSegment:
+    """`audio` at `sample_rate`, with the same frame count a StreamResampler produces."""
+    resampler = StreamResampler(sample_rate)
+    converted = resampler.process(audio)
+    tail = resampler.flush()
+    return converted + tail if tail is not None else converted
+
 
 class StreamWriter:
     """
@@ -23,6 +106,7 @@ class StreamWriter:
         self.channels = channels
         self.sample_width = sample_width
         self._wav: Optional[wave.Wave_write] = None
+        self._resampler = StreamResampler(sample_rate)
 
     def open(self) -> None:
         self._wav = wave.open(self.output_path, "wb")
@@ -30,20 +114,230 @@ class StreamWriter:
         self._wav.setsampwidth(self.sample_width)
         self._wav.setframerate(self.sample_rate)
 
+    def _conform(self, audio: AudioSegment) -> AudioSegment:
+        audio = self._resampler.process(audio)
+        if audio.channels != self.channels:
+            audio = audio.set_channels(self.channels)
+        # pydub holds 24-bit audio as 32-bit
+        sample_width = 4 if self.sample_width == 3 else self.sample_width
+        if audio.sample_width != sample_width:
+            audio = audio.set_sample_width(sample_width)
+        return audio
+
     def write_segment(self, audio: AudioSegment) -> None:
         if self._wav is None:
             raise RuntimeError("StreamWriter is not open")
 
-        if audio.frame_rate != self.sample_rate:
-            audio = audio.set_frame_rate(self.sample_rate)
-        if audio.channels != self.channels:
-            audio = audio.set_channels(self.channels)
-        if audio.sample_width != self.sample_width:
-            audio = audio.set_sample_width(self.sample_width)
+        audio = self._conform(audio)
+        if self.sample_width == 3:
+            # Keep the top three bytes of each 32-bit sample
+            samples = np.frombuffer(audio.raw_data, dtype=np.uint8).reshape(-1, 4)
+            self._wav.writeframes(samples[:, 1:].tobytes())
+            return
 
         self._wav.writeframes(audio.raw_data)
 
+    def _write_resampler_tail(self) -> None:
+        tail = self._resampler.flush()
+        if tail is not None:
+            self.write_segment(tail)
+
     def close(self) -> None:
         if self._wav is not None:
-            self._wav.close()
-            self._wav = None
+            try:
+                self._write_resampler_tail()
+            finally:
+                self._wav.close()
+                self._wav = None
+
+
+class EncoderStreamWriter(StreamWriter):
+    """
+    Streams PCM chunks into one ffmpeg process that encodes `output_path`
+    while the render runs. No intermediate WAV is written.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        sample_rate: int,
+        channels: int,
+        sample_width: int = 2,
+        format: Optional[str] = None,
+        bitrate: Optional[str] = None,
+        converter: Optional[str] = None,
+    ):
+        super().__init__(output_path, sample_rate, channels, sample_width)
+        self.format = format or output_format(output_path)
+        self.bitrate = bitrate
+        self.converter = converter or AudioSegment.converter
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr = None
+
+    def command(self) -> List[str]:
+        command = [
+            self.converter, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", _RAW_FORMATS[self.sample_width],
+            "-ar", str(self.sample_rate),
+            "-ac", str(self.channels),
+            "-i", "pipe:0",
+        ]
+        if self.bitrate:
+            command += ["-b:a", str(self.bitrate)]
+        return command + ["-f", FFMPEG_MUXERS.get(self.format, self.format), self.output_path]
+
+    def open(self) -> None:
+        # stderr goes to a file so a chatty encoder can never block on a full pipe
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(self.command(), stdin=subprocess.PIPE, stderr=self._stderr)
+        except OSError as e:
+            self._stderr.close()
+            self._stderr = None
+            raise FileError(f"Failed to start encoder '{self.converter}' for {self.output_path}: {e}")
+
+    def _encoder_error(self) -> str:
+        if self._stderr is None:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read().decode("utf-8", errors="replace").strip()
+
+    def write_segment(self, audio: AudioSegment) -> None:
+        if self._process is None:
+            raise RuntimeError("EncoderStreamWriter is not open")
+        try:
+            self._process.stdin.write(self._conform(audio).raw_data)
+        except (BrokenPipeError, OSError) as e:
+            self._process.wait()
+            message = self._encoder_error()
+            self._cleanup()
+            raise FileError(f"Encoder for {self.output_path} stopped: {message or e}")
+
+    def _cleanup(self) -> None:
+        self._process = None
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        self._write_resampler_tail()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        returncode = self._process.wait()
+        message = self._encoder_error()
+        self._cleanup()
+        if returncode != 0:
+            raise FileError(f"Encoder for {self.output_path} failed with exit code {returncode}: {message}")
+        logger.debug(f"Encoded {self.output_path} ({self.format})")
+
+
+class FlacStreamWriter(StreamWriter):
+    """In-process FLAC writer (needs the optional soundfile package)."""
+
+    _SUBTYPES = {1: "PCM_S8", 2: "PCM_16", 3: "PCM_24", 4: "PCM_24"}
+
+    def __init__(self, output_path: str, sample_rate: int, channels: int, sample_width: int = 2):
+        super().__init__(output_path, sample_rate, channels, sample_width)
+        self._file = None
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import soundfile  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def open(self) -> None:
+        import soundfile
+        self._file = soundfile.SoundFile(
+            self.output_path,
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            format="FLAC",
+            subtype=self._SUBTYPES[self.sample_width],
+        )
+
+    def write_segment(self, audio: AudioSegment) -> None:
+        if self._file is None:
+            raise RuntimeError("FlacStreamWriter is not open")
+        audio = self._conform(audio)
+        dtype = {1: "int16", 2: "int16", 3: "int32", 4: "int32"}[self.sample_width]
+        if self.sample_width == 1:
+            # 8-bit PCM is unsigned; soundfile takes signed 16-bit
+            audio = audio.set_sample_width(2)
+        self._file.buffer_write(audio.raw_data, dtype=dtype)
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._write_resampler_tail()
+            finally:
+                self._file.close()
+                self._file = None
+
+
+def open_stream_writer(
+    output_path: str,
+    sample_rate: int,
+    channels: int,
+    sample_width: int = 2,
+    format: Optional[str] = None,
+    bitrate: Optional[str] = None,
+) -> StreamWriter:
+    """
+    An unopened writer for `format` (default: from the path's extension):
+    StreamWriter for WAV, FlacStreamWriter for FLAC when soundfile is
+    installed, otherwise an ffmpeg EncoderStreamWriter.
+    """
+    format = (format or output_format(output_path)).lower()
+    if format == "wav":
+        return StreamWriter(output_path, sample_rate, channels, sample_width)
+    if format == "flac" and FlacStreamWriter.available():
+        return FlacStreamWriter(output_path, sample_rate, channels, sample_width)
+    return EncoderStreamWriter(output_path, sample_rate, channels, sample_width, format=format, bitrate=bitrate)
+
+
+def close_writers(writers: Iterable[StreamWriter]) -> None:
+    """
+    Close every writer, even if some fail, so no encoder is left waiting on
+    its stdin. The first error is raised once all are closed.
+    """
+    first_error: Optional[BaseException] = None
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            if first_error is None:
+                first_error = e
+            else:
+                logger.error(f"Failed to close {writer.output_path}: {e}")
+    if first_error is not None:
+        raise first_error
+
+
+def export_segment(
+    audio: AudioSegment,
+    output_path: str,
+    sample_width: Optional[int] = None,
+    format: Optional[str] = None,
+    bitrate: Optional[str] = None,
+    block_sec: float = 10.0,
+) -> None:
+    """Write a whole segment through the writer for its format, `block_sec` at a time."""
+    writer = open_stream_writer(
+        output_path, audio.frame_rate, audio.channels, sample_width or audio.sample_width, format, bitrate
+    )
+    writer.open()
+    try:
+        frame_count = int(audio.frame_count())
+        block = max(1, int(block_sec * audio.frame_rate))
+        for start in range(0, frame_count, block):
+            writer.write_segment(audio.get_sample_slice(start, min(start + block, frame_count)))
+    finally:
+        writer.close()
@@ -0,0 +1,152 @@
+"""
+Analysis cache: loudness measurements keyed by the audio they were taken on.
+
+Role loudness measures every clip (and every track buffer) with pyloudnorm,
+which filters and gates the whole signal. A batch renders the same library
+sounds, processed the same way, over and over; hashing the PCM is an order
+of magnitude cheaper than measuring it again. Results live in memory and,
+optionally, as small JSON files in a private directory shared by every
+batch worker and later batches.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from pydub import AudioSegment
+
+from audio_engine.exceptions import FileError
+from audio_engine.utils.cache_dir import ensure_private_dir
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_ANALYSIS_ENTRIES = 4096
+
+
+def analysis_key(kind: str, audio: AudioSegment) -> str:
+    """Hash of the measurement kind, the PCM and its format."""
+    digest = hashlib.sha1(
+        f"{kind}|{audio.frame_rate}|{audio.channels}|{audio.sample_width}|".encode("utf-8")
+    )
+    digest.update(audio.raw_data)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """LRU of measurement results in memory, backed by an optional directory."""
+
+    def __init__(self, max_entries: int = 0, disk_dir: Optional[str] = None):
+        self.max_entries = max(0, int(max_entries))
+        self.disk_dir = ensure_private_dir(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.disk_dir)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def measure(self, kind: str, audio: AudioSegment, measure: Callable[[AudioSegment], float]) -> float:
+        """`measure(audio)`, or the result stored for the same kind and PCM."""
+        if not self.enabled:
+            return measure(audio)
+
+        key = analysis_key(kind, audio)
+        value = self._get(key)
+        if value is not None:
+            return value
+
+        value = measure(audio)
+        self._remember(key, value)
+        if self.disk_dir:
+            self._write_disk(key, value)
+        return value
+
+    def _get(self, key: str) -> Optional[float]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key) if self.disk_dir else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def _remember(self, key: str, value: float) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[float]:
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                return float(json.load(f)["value"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_disk(self, key: str, value: float) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"value": value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write analysis result {key} to disk cache: {e}")
+
+    def configure(self, max_entries: int, disk_dir: Optional[str] = None) -> None:
+        """Raises FileError if `disk_dir` is not private to the current user."""
+        disk_dir = ensure_private_dir(disk_dir) if disk_dir else None
+        with self._lock:
+            self.max_entries = max(0, int(max_entries))
+            self.disk_dir = disk_dir
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_default_cache: Optional[AnalysisCache] = None
+_default_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide cache. Disabled until configured."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = AnalysisCache()
+        return _default_cache
+
+
+def configure_analysis_cache(max_entries: int, disk_dir: Optional[str] = None) -> AnalysisCache:
+    """Size the process-wide cache; a directory that is not private is dropped with a warning."""
+    cache = get_analysis_cache()
+    try:
+        cache.configure(max_entries, disk_dir)
+    except FileError as e:
+        logger.warning(f"Analysis disk cache disabled: {e}")
+        cache.configure(max_entries)
+    return cache
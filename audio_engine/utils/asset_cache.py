@@ -0,0 +1,139 @@
+"""
+Decoded-audio cache shared by every render in a process.
+
+AudioSegment operations return new segments, so a decoded file can be handed
+to any number of clips without copying. Entries are keyed by path, mtime and
+size and evicted least-recently-used once the byte budget is exceeded.
+
+Batch workers back the cache with a SharedAssetStore: a miss then maps the
+file another worker (or an earlier batch) already decoded instead of
+decoding it again.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from audio_engine.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from audio_engine.streaming.asset_store import SharedAssetStore
+
+logger = get_logger(__name__)
+
+# Sample widths that survive the store's float32 copy bit-exactly
+_STORE_DTYPES = {1: np.int8, 2: np.int16}
+
+_CacheKey = Tuple[str, int, int]
+
+
+class AssetCache:
+    """LRU cache of decoded AudioSegments bounded by raw PCM size."""
+
+    def __init__(self, max_bytes: int = 0, store: Optional["SharedAssetStore"] = None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.store = store
+        self._entries: "OrderedDict[_CacheKey, AudioSegment]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def load(self, path: str) -> AudioSegment:
+        """Decode `path`, or return the cached decode. Raises like AudioSegment.from_file."""
+        if not self.enabled:
+            return AudioSegment.from_file(path)
+
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return audio
+            self.misses += 1
+
+        audio = self._decode(path)
+        size = len(audio.raw_data)
+        if size > self.max_bytes:
+            return audio
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = audio
+                self._bytes += size
+                self._evict()
+        return audio
+
+    def _decode(self, path: str) -> AudioSegment:
+        if self.store is None:
+            return AudioSegment.from_file(path)
+
+        asset = self.store.acquire(path)
+        try:
+            dtype = _STORE_DTYPES.get(asset.sample_width)
+            if dtype is None:
+                return AudioSegment.from_file(path)
+            scale = float(2 ** (8 * asset.sample_width - 1))
+            pcm = np.clip(np.rint(asset.samples * scale), -scale, scale - 1).astype(dtype)
+            return AudioSegment(
+                data=pcm.tobytes(),
+                sample_width=asset.sample_width,
+                frame_rate=asset.sample_rate,
+                channels=asset.channels,
+            )
+        finally:
+            self.store.release(asset)
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.raw_data)
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_default_cache: Optional[AssetCache] = None
+_default_lock = threading.Lock()
+
+
+def get_asset_cache() -> AssetCache:
+    """Process-wide cache. Disabled (zero budget) until configured."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = AssetCache()
+        return _default_cache
+
+
+def configure_asset_cache(max_bytes: int, store: Optional["SharedAssetStore"] = None) -> AssetCache:
+    cache = get_asset_cache()
+    cache.resize(max_bytes)
+    cache.store = store
+    logger.debug(f"Asset cache budget set to {max_bytes / (1 << 20):.0f} MB")
+    return cache
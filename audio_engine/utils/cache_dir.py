@@ -0,0 +1,45 @@
+"""
+Private directories for the on-disk render caches.
+
+The chunk and render plan caches store pickles, and loading a pickle runs
+whatever it was written to run. Their directories must therefore be writable
+by the current user only: by default they live under the user's cache
+directory, are created 0o700, and an existing directory is refused unless
+it is a real directory owned by the current user that nobody else can
+write to.
+"""
+import os
+import stat
+
+from audio_engine.exceptions import FileError
+
+
+def user_cache_dir(name: str) -> str:
+    """Per-user default location for the cache called `name`."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    if not base and os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "audio_engine", name)
+
+
+def ensure_private_dir(path: str) -> str:
+    """
+    Create `path` (mode 0o700) if needed and check that only the current
+    user can write to it. Raises FileError otherwise.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError as e:
+        raise FileError(f"Cannot create cache directory {path}: {e}")
+
+    if not stat.S_ISDIR(info.st_mode):
+        raise FileError(f"Cache directory {path} is not a directory")
+    if hasattr(os, "getuid"):
+        if info.st_uid != os.getuid():
+            raise FileError(f"Cache directory {path} is owned by another user")
+        if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise FileError(f"Cache directory {path} is writable by other users")
+    return path
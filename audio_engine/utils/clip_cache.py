@@ -0,0 +1,157 @@
+"""
+Processed-clip cache: a clip's audio after its position-independent DSP.
+
+Gain, EQ preset, SFX processing, role loudness, energy ramp and dialogue
+density pullback depend only on the source file and a handful of resolved
+parameters, so a sound triggered many times (or a timeline rendered again)
+is processed once. Entries live in an in-memory LRU bounded by PCM size and,
+optionally, as WAV files in a directory shared by processes and renders.
+"""
+import os
+import threading
+import wave
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from pydub import AudioSegment
+
+from audio_engine.utils.hashing import content_key
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CLIP_CACHE_MB = 512
+
+
+def clip_cache_key(params: Dict) -> str:
+    """Canonical hash of everything that shapes a processed clip."""
+    return content_key(params)
+
+
+class ProcessedClipCache:
+    """LRU of processed clips in memory, backed by an optional directory."""
+
+    def __init__(self, max_bytes: int = 0, disk_dir: Optional[str] = None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries: "OrderedDict[str, AudioSegment]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or bool(self.disk_dir)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.wav")
+
+    def get(self, key: str) -> Optional[AudioSegment]:
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return audio
+
+        audio = self._read_disk(key) if self.disk_dir else None
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: AudioSegment) -> None:
+        self._remember(key, audio)
+        if self.disk_dir and not os.path.exists(self._disk_path(key)):
+            self._write_disk(key, audio)
+
+    def _remember(self, key: str, audio: AudioSegment) -> None:
+        size = len(audio.raw_data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = audio
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.raw_data)
+
+    def _read_disk(self, key: str) -> Optional[AudioSegment]:
+        try:
+            with wave.open(self._disk_path(key), "rb") as wav:
+                return AudioSegment(
+                    data=wav.readframes(wav.getnframes()),
+                    sample_width=wav.getsampwidth(),
+                    frame_rate=wav.getframerate(),
+                    channels=wav.getnchannels(),
+                )
+        except (OSError, EOFError, wave.Error):
+            return None
+
+    def _write_disk(self, key: str, audio: AudioSegment) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with wave.open(tmp_path, "wb") as wav:
+                wav.setnchannels(audio.channels)
+                wav.setsampwidth(audio.sample_width)
+                wav.setframerate(audio.frame_rate)
+                wav.writeframes(audio.raw_data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write processed clip {key} to disk cache: {e}")
+
+    def configure(self, max_bytes: int, disk_dir: Optional[str] = None) -> None:
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            self.disk_dir = disk_dir
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.raw_data)
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_default_cache: Optional[ProcessedClipCache] = None
+_default_lock = threading.Lock()
+
+
+def get_clip_cache() -> ProcessedClipCache:
+    """Process-wide cache. Disabled until configured."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ProcessedClipCache()
+        return _default_cache
+
+
+def configure_clip_cache(cache_cfg: Optional[Dict]) -> ProcessedClipCache:
+    """Apply a settings["clip_cache"] block ({"enabled", "max_mb", "dir"}) to the process-wide cache."""
+    cache = get_clip_cache()
+    if cache_cfg and cache_cfg.get("enabled"):
+        max_mb = float(cache_cfg.get("max_mb", DEFAULT_CLIP_CACHE_MB))
+        cache.configure(int(max_mb * (1 << 20)), cache_cfg.get("dir"))
+        logger.debug(f"Processed-clip cache: {max_mb:.0f} MB in memory, disk dir {cache_cfg.get('dir')}")
+    return cache
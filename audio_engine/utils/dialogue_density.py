@@ -1,8 +1,15 @@
+from audio_engine.utils.ranges import RangeIndex
+
+
 def compute_dialogue_density(dialogue_ranges, window_start, window_end):
     window_duration = window_end - window_start
     if window_duration <= 0:
         return 0.0
 
+    # Indexed ranges: O(log n) prefix-sum lookup
+    if isinstance(dialogue_ranges, RangeIndex):
+        return dialogue_ranges.density(window_start, window_end)
+
     dialogue_time = 0.0
 
     for d_start, d_end in dialogue_ranges:
@@ -0,0 +1,37 @@
+"""
+Content keys for the render caches and manifests.
+
+Every cache keys its entries on a SHA-1 of canonical JSON: keys sorted,
+mappings and sets made plain, anything else that JSON cannot hold written
+as its repr. Cached audio also depends on the DSP that produced it, so keys
+include preset_versions() and the engine version.
+"""
+import hashlib
+import json
+from collections.abc import Mapping, Set
+from typing import Dict
+
+from audio_engine.dsp.eq_presets import PRESET_ALIASES, resolve_preset_version
+
+
+def _json_default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Set):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def canonical_json(value) -> str:
+    """`value` as JSON that is the same for equal values, whatever their key order."""
+    return json.dumps(value, sort_keys=True, default=_json_default)
+
+
+def content_key(payload) -> str:
+    """SHA-1 hex digest of `payload`'s canonical JSON."""
+    return hashlib.sha1(canonical_json(payload).encode("utf-8")).hexdigest()
+
+
+def preset_versions() -> Dict[str, str]:
+    """The versioned name every EQ preset alias currently resolves to."""
+    return {alias: resolve_preset_version(alias) for alias in sorted(PRESET_ALIASES)}
@@ -0,0 +1,167 @@
+"""
+Header-only audio metadata probing with a shared, thread-safe cache.
+
+Pre-flight steps (overlap fixing, validation, role ranges, scheduling) only
+need clip durations. Decoding whole files with AudioSegment.from_file to get
+len(audio) costs a full decode per clip; reading headers costs a few bytes.
+"""
+import os
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from pydub.utils import mediainfo
+
+from audio_engine.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PROBE_WORKERS = 8
+
+# (path, mtime_ns, size): re-probe when a file is replaced in place
+_CacheKey = Tuple[str, int, int]
+
+
+def _probe_wav_duration(path: str) -> float:
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+
+def _probe_ffprobe_duration(path: str) -> float:
+    info = mediainfo(path)
+    return float(info.get("duration", 0.0))
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """
+    Read a file's duration in seconds from its header.
+
+    PCM WAV headers are parsed directly; everything else (and WAV variants
+    the wave module rejects) goes through ffprobe. Returns None if the file
+    cannot be probed.
+    """
+    if path.lower().endswith(".wav"):
+        try:
+            return _probe_wav_duration(path)
+        except (wave.Error, EOFError):
+            pass
+        except OSError as exc:
+            logger.warning(f"Failed to read WAV header for {path}: {exc}")
+            return None
+
+    try:
+        duration = _probe_ffprobe_duration(path)
+    except Exception as exc:
+        logger.warning(f"Failed to probe duration for {path}: {exc}")
+        return None
+    return duration if duration > 0 else None
+
+
+def file_identity(path: str) -> str:
+    """"mtime_ns:size" of a file, or "missing"; changes when the file is replaced."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class MetadataProvider:
+    """
+    Cached duration lookups with concurrent prefetching.
+
+    ffprobe runs in a subprocess, so probing many files from a thread pool
+    overlaps the process start-up and I/O of each probe.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_PROBE_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._cache: Dict[_CacheKey, Optional[float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str) -> Optional[_CacheKey]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def duration(self, path: str) -> Optional[float]:
+        """Duration in seconds, or None if the file is missing or unreadable."""
+        key = self._key(path)
+        if key is None:
+            return None
+
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        duration = probe_duration(path)
+        with self._lock:
+            self._cache[key] = duration
+        return duration
+
+    def prefetch(self, paths: Iterable[str]) -> None:
+        """Probe every uncached path concurrently."""
+        pending = []
+        seen = set()
+        for path in paths:
+            if not path or path in seen:
+                continue
+            seen.add(path)
+            key = self._key(path)
+            if key is None:
+                continue
+            with self._lock:
+                if key in self._cache:
+                    continue
+            pending.append(path)
+
+        if not pending:
+            return
+
+        if len(pending) == 1 or self.max_workers == 1:
+            for path in pending:
+                self.duration(path)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+            list(executor.map(self.duration, pending))
+        logger.debug(f"Probed {len(pending)} audio files")
+
+    def seed(self, durations: Dict[str, Optional[float]]) -> None:
+        """Cache durations probed earlier (e.g. by a cached render plan) for files that still exist."""
+        for path, duration in durations.items():
+            key = self._key(path)
+            if key is None:
+                continue
+            with self._lock:
+                self._cache.setdefault(key, duration)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def timeline_audio_files(timeline: Dict) -> Iterable[str]:
+    """All clip file paths referenced by a timeline's tracks."""
+    for track in timeline.get("tracks", []) or []:
+        for clip in track.get("clips", []) or []:
+            file_path = clip.get("file")
+            if file_path:
+                yield file_path
+
+
+_default_provider: Optional[MetadataProvider] = None
+_default_lock = threading.Lock()
+
+
+def get_metadata_provider() -> MetadataProvider:
+    """Process-wide provider shared by the pre-flight steps."""
+    global _default_provider
+    with _default_lock:
+        if _default_provider is None:
+            _default_provider = MetadataProvider()
+        return _default_provider
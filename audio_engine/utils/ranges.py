@@ -1,4 +1,5 @@
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
 
 
 Range = Tuple[float, float]  # (start_sec, end_sec)
@@ -66,3 +67,88 @@ def normalize_ranges(ranges: List[Range]) -> List[Range]:
         if s is not None and e is not None and s < e
     ]
     return sorted(clean, key=lambda r: r[0])
+
+
+class RangeIndex:
+    """
+    Read-only index over a set of time ranges.
+
+    Ranges are normalized and merged once at construction. Cumulative
+    coverage prefix sums plus bisect lookups answer coverage and overlap
+    queries in O(log n) (plus the number of ranges returned).
+    """
+
+    def __init__(self, ranges: List[Range], min_gap_ms: int = 0):
+        merged = merge_ranges(normalize_ranges(ranges), min_gap_ms)
+        self.starts: List[float] = [s for s, _ in merged]
+        self.ends: List[float] = [e for _, e in merged]
+
+        # _prefix[i] = total covered seconds of ranges[0:i]
+        self._prefix: List[float] = [0.0]
+        for start, end in merged:
+            self._prefix.append(self._prefix[-1] + (end - start))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def ranges(self) -> List[Range]:
+        return list(zip(self.starts, self.ends))
+
+    @property
+    def total(self) -> float:
+        return self._prefix[-1]
+
+    def covered_until(self, t: float) -> float:
+        """Total covered seconds in (-inf, t]."""
+        i = bisect_right(self.starts, t) - 1
+        if i < 0:
+            return 0.0
+        return self._prefix[i] + min(t, self.ends[i]) - self.starts[i]
+
+    def coverage(self, window_start: float, window_end: float) -> float:
+        """Covered seconds within [window_start, window_end]."""
+        if window_end <= window_start:
+            return 0.0
+        return self.covered_until(window_end) - self.covered_until(window_start)
+
+    def density(self, window_start: float, window_end: float) -> float:
+        """Fraction of [window_start, window_end] that is covered."""
+        duration = window_end - window_start
+        if duration <= 0:
+            return 0.0
+        return self.coverage(window_start, window_end) / duration
+
+    def overlapping_slice(self, window_start: float, window_end: float) -> Tuple[int, int]:
+        """Index bounds [lo, hi) of the ranges that overlap (window_start, window_end)."""
+        lo = bisect_right(self.ends, window_start)
+        hi = bisect_left(self.starts, window_end)
+        return lo, max(lo, hi)
+
+    def overlapping(self, window_start: float, window_end: float) -> List[Range]:
+        """Ranges that overlap (window_start, window_end), unclipped."""
+        lo, hi = self.overlapping_slice(window_start, window_end)
+        return list(zip(self.starts[lo:hi], self.ends[lo:hi]))
+
+    def sliding_density(
+        self,
+        window_sec: float,
+        step_sec: float,
+        start: float = 0.0,
+        end: Optional[float] = None,
+    ) -> List[Tuple[float, float]]:
+        """
+        Density over trailing windows [t - window_sec, t] for t stepping from
+        start + step_sec to end. Returns (t, density) pairs.
+        """
+        if end is None:
+            end = self.ends[-1] if self.ends else start
+        if window_sec <= 0 or step_sec <= 0:
+            raise ValueError("window_sec and step_sec must be positive")
+
+        result = []
+        steps = int((end - start) / step_sec + 1e-9)
+        for k in range(1, steps + 1):
+            t = start + k * step_sec
+            result.append((t, self.density(max(start, t - window_sec), t)))
+        return result
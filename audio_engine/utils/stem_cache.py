@@ -0,0 +1,185 @@
+"""
+Stem cache: rendered track buffers kept between renders (track freeze).
+
+A track's buffer depends only on its own settings and clips, the files those
+clips read, the project duration, the ranges of the roles whose ducking rules
+target it and the default ducking and compression configs, plus the engine
+version and the resolved EQ preset versions. The stem cache hashes all of
+that and keeps the last rendered buffer of every track, so a re-render
+reuses the buffers of tracks that did not change: moving a dialogue line
+re-renders the tracks ducked under dialogue, not every track.
+
+A track marked `"freeze": true` reuses its stored buffer even when it has
+changed since, like freezing a track in a DAW. Stems are stored as raw PCM at
+the track's own sample format, so a reused stem is bit-identical to the
+render that produced it.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from pydub import AudioSegment
+
+from audio_engine import __version__
+from audio_engine.dsp.ducking import DuckingPlanner
+from audio_engine.utils.hashing import content_key, preset_versions
+from audio_engine.utils.logger import get_logger
+from audio_engine.utils.metadata import file_identity
+
+logger = get_logger(__name__)
+
+STEM_CACHE_VERSION = 1
+
+
+def stem_dir_for(output_path: str) -> str:
+    return f"{output_path}.stems"
+
+
+def ducking_ranges(
+    track: Dict,
+    role_ranges: Optional[Dict[str, List[Tuple[float, float]]]],
+    default_ducking: Optional[Dict],
+) -> Dict[str, List[Tuple[float, float]]]:
+    """The role ranges of the ducking rules that target any clip on `track`."""
+    if not role_ranges:
+        return {}
+    planner = DuckingPlanner(role_ranges)
+    roles = set()
+    for clip in track.get("clips", []):
+        ducking_cfg = clip.get("_rules", {}).get("ducking", default_ducking)
+        if not ducking_cfg:
+            continue
+        semantic_role = clip.get("semantic_role", track.get("semantic_role"))
+        roles.update(rule.when for rule in planner.plan_for(ducking_cfg).rules_for(track.get("role"), semantic_role))
+    return {role: role_ranges[role] for role in sorted(roles)}
+
+
+def track_stem_key(
+    track: Dict,
+    project_duration: float,
+    role_ranges: Optional[Dict[str, List[Tuple[float, float]]]] = None,
+    default_ducking: Optional[Dict] = None,
+    default_compression: Optional[Dict] = None,
+) -> str:
+    """Hash of everything TrackMixer.process_track reads for `track`."""
+    settings = {k: v for k, v in track.items() if k != "freeze"}
+    files = sorted({clip["file"] for clip in track.get("clips", []) if clip.get("file")})
+    payload = {
+        "version": STEM_CACHE_VERSION,
+        "engine_version": __version__,
+        "presets": preset_versions(),
+        "track": settings,
+        "files": {path: file_identity(path) for path in files},
+        "duration": project_duration,
+        "role_ranges": ducking_ranges(track, role_ranges, default_ducking),
+        "ducking": default_ducking,
+        "compression": default_compression,
+    }
+    return content_key(payload)
+
+
+class StemCache:
+    """Directory holding the last rendered buffer of each track."""
+
+    def __init__(self, root: str, auto: bool = True):
+        self.root = root
+        # False: only tracks marked "freeze" are reused
+        self.auto = auto
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, track_id: str) -> Tuple[str, str]:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", track_id)[:64]
+        digest = hashlib.sha1(track_id.encode("utf-8")).hexdigest()[:8]
+        base = os.path.join(self.root, f"{safe}-{digest}")
+        return f"{base}.pcm", f"{base}.json"
+
+    def load(self, track: Dict, key: str, project_duration: float) -> Optional[AudioSegment]:
+        """The stored buffer for `track`, if it may be reused for `key`."""
+        track_id = track.get("id", "unknown")
+        frozen = bool(track.get("freeze"))
+        if not (frozen or self.auto):
+            return None
+
+        pcm_path, meta_path = self._paths(track_id)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != STEM_CACHE_VERSION:
+                raise ValueError("stem cache version changed")
+            if meta["key"] != key:
+                if not frozen:
+                    raise ValueError("track changed")
+                if meta["duration"] != project_duration:
+                    logger.warning(
+                        f"Track '{track_id}' is frozen but the project duration changed, re-rendering it"
+                    )
+                    raise ValueError("duration changed")
+                logger.info(f"Track '{track_id}' is frozen, reusing its stem despite changes")
+            with open(pcm_path, "rb") as f:
+                data = f.read()
+            audio = AudioSegment(
+                data=data,
+                sample_width=meta["sample_width"],
+                frame_rate=meta["frame_rate"],
+                channels=meta["channels"],
+            )
+        except (OSError, KeyError, ValueError) as e:
+            with self._lock:
+                self.misses += 1
+            if frozen and not isinstance(e, ValueError):
+                logger.warning(f"Track '{track_id}' is frozen but has no stored stem, rendering it")
+            return None
+
+        with self._lock:
+            self.hits += 1
+        logger.debug(f"Reused stem for track '{track_id}'")
+        return audio
+
+    def store(self, track: Dict, key: str, project_duration: float, audio: AudioSegment) -> None:
+        track_id = track.get("id", "unknown")
+        pcm_path, meta_path = self._paths(track_id)
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        meta = {
+            "version": STEM_CACHE_VERSION,
+            "key": key,
+            "duration": project_duration,
+            "frame_rate": audio.frame_rate,
+            "channels": audio.channels,
+            "sample_width": audio.sample_width,
+        }
+        try:
+            # Drop the old metadata first, so the new PCM is never read under the old key
+            try:
+                os.remove(meta_path)
+            except FileNotFoundError:
+                pass
+            with open(pcm_path + tmp_suffix, "wb") as f:
+                f.write(audio.raw_data)
+            os.replace(pcm_path + tmp_suffix, pcm_path)
+            with open(meta_path + tmp_suffix, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(meta_path + tmp_suffix, meta_path)
+        except OSError as e:
+            logger.warning(f"Failed to store stem for track '{track_id}': {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def stem_cache_for(freeze_cfg: Optional[Dict], tracks: List[Dict], output_path: str) -> Optional[StemCache]:
+    """
+    StemCache for a settings["track_freeze"] block ({"enabled", "dir"}), or
+    None when it is disabled and no track is marked "freeze".
+    """
+    enabled = bool(freeze_cfg and freeze_cfg.get("enabled"))
+    if not enabled and not any(track.get("freeze") for track in tracks):
+        return None
+    root = (freeze_cfg or {}).get("dir") or stem_dir_for(output_path)
+    return StemCache(root, auto=enabled)
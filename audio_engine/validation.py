@@ -1,7 +1,8 @@
 import os
 import json
-from typing import Dict, List
-from pydub import AudioSegment
+from typing import Dict, List, Optional
+
+from audio_engine.utils.metadata import MetadataProvider, get_metadata_provider, timeline_audio_files
 
 
 # Valid semantic roles for SFX
@@ -13,10 +14,15 @@ class ValidationError(Exception):
     pass
 
 
-def validate_timeline(timeline: Dict) -> List[str]:
+def validate_timeline(timeline: Dict, metadata: Optional[MetadataProvider] = None) -> List[str]:
     errors=[]
     warnings=[]
 
+    # Durations come from file headers, probed concurrently up front
+    metadata = metadata or get_metadata_provider()
+    if isinstance(timeline.get("tracks"), list):
+        metadata.prefetch(timeline_audio_files(timeline))
+
     # Project
 
     project =timeline.get("project")
@@ -83,11 +89,8 @@ def validate_timeline(timeline: Dict) -> List[str]:
                 errors.append(f"Missing audio file:{file_path}")
                 continue
 
-            try:
-                audio = AudioSegment.from_file(file_path)
-                clip_duration = len(audio)/1000
-
-            except Exception:
+            clip_duration = metadata.duration(file_path)
+            if clip_duration is None:
                 errors.append(f"Unreadable audio file: {file_path}")
                 continue
 
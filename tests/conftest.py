@@ -0,0 +1,73 @@
+"""
+Shared test fixtures: WAV and timeline files for render tests.
+"""
+import json
+import wave
+
+import numpy as np
+import pytest
+
+# audio_engine.streaming imports the renderer package, which must load first
+import audio_engine.renderer  # noqa: F401
+
+
+def _write_wav(path: str, samples: np.ndarray, sample_rate: int, channels: int = 1) -> str:
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return path
+
+
+def _tone(path: str, seconds: float, freq: float = 440.0, sample_rate: int = 22050) -> str:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return _write_wav(path, np.sin(2 * np.pi * freq * t) * 0.2 * 32767, sample_rate)
+
+
+def _noise(
+    path: str,
+    seconds: float,
+    seed: int = 0,
+    sample_rate: int = 22050,
+    channels: int = 1,
+    amplitude: float = 0.1,
+) -> str:
+    rng = np.random.default_rng(seed)
+    samples = rng.standard_normal(int(seconds * sample_rate) * channels) * amplitude * 32767
+    return _write_wav(path, samples, sample_rate, channels)
+
+
+def _json(path: str, data: dict) -> str:
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return path
+
+
+def _samples(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as wav:
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+
+@pytest.fixture
+def write_tone():
+    """write_tone(path, seconds, freq=440.0, sample_rate=22050): a mono 16-bit sine WAV."""
+    return _tone
+
+
+@pytest.fixture
+def write_noise():
+    """write_noise(path, seconds, seed=0, sample_rate=22050, channels=1, amplitude=0.1): seeded noise WAV."""
+    return _noise
+
+
+@pytest.fixture
+def write_json():
+    """write_json(path, data): dump a timeline (or any JSON) and return its path."""
+    return _json
+
+
+@pytest.fixture
+def read_samples():
+    """read_samples(path): the int16 samples of a 16-bit WAV."""
+    return _samples
@@ -0,0 +1,152 @@
+"""
+Tests for batch rendering and its memory-aware scheduling.
+"""
+import json
+import os
+import tempfile
+
+from pydub import AudioSegment
+
+from audio_engine import batch
+from audio_engine.batch import BatchJob, estimate_job_memory, pick_next_job, render_batch
+from audio_engine.dsp.loudness import measure_integrated_lufs
+from audio_engine.streaming.asset_store import SharedAssetStore
+from audio_engine.utils import metadata
+from audio_engine.utils.analysis_cache import AnalysisCache, configure_analysis_cache, get_analysis_cache
+from audio_engine.utils.asset_cache import AssetCache, configure_asset_cache, get_asset_cache
+from audio_engine.utils.metadata import get_metadata_provider
+
+
+SAMPLE_RATE = 44100
+
+
+def test_pick_next_job_respects_budget():
+    """Small jobs fill in around a large one; a job over budget only runs alone."""
+    big = BatchJob(0, "a.json", "a.wav", estimated_bytes=800)
+    small = BatchJob(1, "b.json", "b.wav", estimated_bytes=100)
+    huge = BatchJob(2, "c.json", "c.wav", estimated_bytes=5000)
+
+    assert pick_next_job([big, small], running_bytes=500, running_count=1, memory_budget=1000) is small
+    assert pick_next_job([big], running_bytes=500, running_count=1, memory_budget=1000) is None
+    assert pick_next_job([huge], running_bytes=0, running_count=0, memory_budget=1000) is huge
+
+
+def test_estimate_job_memory_streaming_is_smaller():
+    """Streaming jobs are estimated from chunk size rather than project length."""
+    timeline = {"project": {"duration": 3600}, "tracks": [{}, {}, {}], "settings": {}}
+    full = estimate_job_memory(timeline)
+    timeline["settings"]["streaming"] = {"enabled": True}
+    assert estimate_job_memory(timeline) < full / 100
+
+
+def test_asset_cache_reuses_decodes(write_tone):
+    """Repeat loads of the same file are served from the cache."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        write_tone(path, 0.5, sample_rate=SAMPLE_RATE)
+        cache = AssetCache(max_bytes=1 << 20)
+        first = cache.load(path)
+        assert cache.load(path) is first
+        assert cache.stats()["hits"] == 1
+
+        cache.resize(10)
+        assert cache.stats()["entries"] == 0
+
+
+def test_asset_cache_decodes_through_shared_store(write_tone):
+    """A store-backed cache hands out the same PCM as a direct decode, published for other workers."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        write_tone(path, 0.5, sample_rate=SAMPLE_RATE)
+        store = SharedAssetStore(os.path.join(tmp, "store"))
+        audio = AssetCache(max_bytes=1 << 20, store=store).load(path)
+
+        direct = AudioSegment.from_file(path)
+        assert audio.raw_data == direct.raw_data
+        assert (audio.frame_rate, audio.channels, audio.sample_width) == (
+            direct.frame_rate, direct.channels, direct.sample_width)
+        assert [n for n in os.listdir(store.root) if n.endswith(".npy")]
+
+
+def test_analysis_cache_measures_each_signal_once(write_tone, monkeypatch):
+    """Loudness of identical PCM is measured once and shared through the cache directory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        write_tone(path, 1.0, sample_rate=SAMPLE_RATE)
+        audio = AudioSegment.from_file(path)
+        calls = []
+
+        def measure(segment):
+            calls.append(segment)
+            return -20.0
+
+        disk_dir = os.path.join(tmp, "analysis")
+        assert AnalysisCache(16, disk_dir).measure("lufs", audio, measure) == -20.0
+        # A fresh process (another worker) finds it on disk
+        assert AnalysisCache(16, disk_dir).measure("lufs", audio, measure) == -20.0
+        assert AnalysisCache(16, disk_dir).measure("lufs", audio + 6, measure) == -20.0
+        assert len(calls) == 2
+
+        monkeypatch.setattr(get_analysis_cache(), "max_entries", 16)
+        first = measure_integrated_lufs(audio)
+        monkeypatch.setattr("audio_engine.dsp.loudness._integrated_loudness", measure)
+        assert measure_integrated_lufs(audio) == first
+        get_analysis_cache().clear()
+
+
+def test_worker_init_seeds_durations_and_caches(write_tone, monkeypatch):
+    """Workers get the parent's durations through initargs, not through fork inheritance."""
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("XDG_CACHE_HOME", tmp)
+        path = os.path.join(tmp, "a.wav")
+        write_tone(path, 0.5, sample_rate=SAMPLE_RATE)
+        durations = batch.warm_durations([BatchJob(0, "t.json", "o.wav", audio_files=[path])])
+        get_metadata_provider().clear()
+
+        def no_probe(path):
+            raise AssertionError(f"probed {path} again")
+
+        monkeypatch.setattr(metadata, "probe_duration", no_probe)
+        try:
+            batch._init_worker(1 << 20, {"enabled": True}, os.path.join(tmp, "analysis"), durations)
+            assert get_metadata_provider().duration(path) == durations[path]
+            assert get_asset_cache().store is not None
+            assert get_analysis_cache().disk_dir == os.path.join(tmp, "analysis")
+        finally:
+            configure_asset_cache(0)
+            configure_analysis_cache(0)
+            get_metadata_provider().clear()
+            monkeypatch.setattr(batch, "_worker_renderer", None)
+
+
+def test_render_batch_reports_jobs(write_tone, write_json, monkeypatch):
+    """Every job is rendered or reported as failed in the summary."""
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("XDG_CACHE_HOME", os.path.join(tmp, "cache"))
+        clip = os.path.join(tmp, "clip.wav")
+        write_tone(clip, 1.0, sample_rate=SAMPLE_RATE)
+
+        jobs = []
+        for i in range(2):
+            timeline_path = write_json(os.path.join(tmp, f"t{i}.json"), {
+                "project": {"duration": 2},
+                "settings": {"streaming": {"enabled": i == 1, "chunk_size_sec": 0.5}},
+                "tracks": [{"id": "m", "role": "music", "clips": [{"file": clip, "start": 0.0}]}],
+            })
+            jobs.append({"timeline": timeline_path, "output": os.path.join(tmp, f"out{i}.wav")})
+        jobs.append({"timeline": os.path.join(tmp, "missing.json"), "output": os.path.join(tmp, "x.wav")})
+
+        manifest_path = write_json(os.path.join(tmp, "manifest.json"), {"jobs": jobs, "max_workers": 2})
+
+        report_path = os.path.join(tmp, "report.json")
+        report = render_batch(manifest_path, report_path=report_path)
+
+        assert [r.ok for r in sorted(report.results, key=lambda r: r.index)] == [True, True, False]
+        assert os.path.exists(os.path.join(tmp, "out0.wav"))
+        assert os.path.exists(os.path.join(tmp, "out1.wav"))
+        with open(report_path) as f:
+            summary = json.load(f)
+        assert summary["succeeded"] == 2 and summary["failed"] == 1
+        # Workers decoded through the shared store and shared their loudness analysis
+        assert os.listdir(os.path.join(tmp, "cache", "audio_engine", "assets"))
+        assert os.listdir(os.path.join(tmp, "cache", "audio_engine", "analysis"))
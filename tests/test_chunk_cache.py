@@ -0,0 +1,126 @@
+"""
+Tests for content-hash memoization of streaming chunks.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from audio_engine.dsp.eq_presets import PRESET_ALIASES
+from audio_engine.exceptions import FileError
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.renderer.clip_processor import ClipProcessor
+from audio_engine.streaming import chunk_cache
+from audio_engine.streaming.chunk_cache import ChunkCache, chunk_key, default_cache_dir, get_chunk_cache
+
+
+SAMPLE_RATE = 22050
+
+
+def _timeline(write_noise, tmp: str, intro: str, cache: bool) -> dict:
+    for name, seconds, seed in [("intro_a", 1.0, 5), ("intro_b", 1.0, 6), ("line", 1.0, 2)]:
+        path = os.path.join(tmp, f"{name}.wav")
+        if not os.path.exists(path):
+            write_noise(path, seconds, seed)
+    streaming = {"enabled": True, "chunk_size_sec": 0.5, "sample_rate": SAMPLE_RATE}
+    if cache:
+        streaming["chunk_cache"] = {"enabled": True, "dir": os.path.join(tmp, "cache")}
+    line = os.path.join(tmp, "line.wav")
+    return {
+        "project": {"duration": 6},
+        "settings": {"dialogue_compression": {"enabled": True}, "streaming": streaming},
+        "tracks": [
+            {"id": "intro", "role": "music", "clips": [{"file": os.path.join(tmp, f"{intro}.wav"), "start": 0.0}]},
+            {"id": "voice", "role": "voice", "clips": [{"file": line, "start": s} for s in (2.0, 4.0)]},
+        ],
+    }
+
+
+def _render(write_json, tmp: str, timeline: dict, name: str) -> bytes:
+    timeline_path = write_json(os.path.join(tmp, f"{name}.json"), timeline)
+    output_path = os.path.join(tmp, f"{name}.wav")
+    TimelineRenderer().render_streaming(timeline_path, output_path)
+    with open(output_path, "rb") as f:
+        return f.read()
+
+
+def test_cached_renders_match_uncached(write_noise, write_json):
+    """Cold and warm cached renders are identical to an uncached render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = _render(write_json, tmp, _timeline(write_noise, tmp, "intro_a", cache=False), "reference")
+        assert _render(write_json, tmp, _timeline(write_noise, tmp, "intro_a", cache=True), "cold") == reference
+
+        cache = get_chunk_cache({"enabled": True, "dir": os.path.join(tmp, "cache")})
+        misses = cache.stats()["misses"]
+        assert _render(write_json, tmp, _timeline(write_noise, tmp, "intro_a", cache=True), "warm") == reference
+        assert cache.stats()["misses"] == misses
+
+
+def test_variant_reuses_shared_chunks(write_noise, write_json):
+    """A variant with a different intro only renders the chunks the intro touches."""
+    with tempfile.TemporaryDirectory() as tmp:
+        _render(write_json, tmp, _timeline(write_noise, tmp, "intro_a", cache=True), "episode")
+        cache = get_chunk_cache({"enabled": True, "dir": os.path.join(tmp, "cache")})
+        before = cache.stats()
+
+        variant = _render(write_json, tmp, _timeline(write_noise, tmp, "intro_b", cache=True), "variant")
+        after = cache.stats()
+        assert after["misses"] - before["misses"] == 2
+        assert after["hits"] - before["hits"] == 10
+        reference = _render(write_json, tmp, _timeline(write_noise, tmp, "intro_b", cache=False), "variant_reference")
+        assert variant == reference
+
+
+def test_injected_clip_processor_bypasses_cache(write_noise, write_json):
+    """Chunks mixed by a custom clip processor are neither read from nor written to the cache."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline_path = write_json(os.path.join(tmp, "custom.json"), _timeline(write_noise, tmp, "intro_a", cache=True))
+        TimelineRenderer(clip_processor=ClipProcessor()).render_streaming(timeline_path, os.path.join(tmp, "custom.wav"))
+        assert not [name for name in os.listdir(os.path.join(tmp, "cache")) if name.endswith(".chunk")]
+
+
+def test_chunk_key_quantizes_state_and_cache_evicts():
+    """Negligible state differences share a key; the cache stays under its budget."""
+    inputs = {"tracks": []}
+    assert chunk_key(inputs, {"eq": {"_zi": np.array([0.5, 1e-9])}}) == chunk_key(
+        inputs, {"eq": {"_zi": np.array([0.5, 0.0])}}
+    )
+    assert chunk_key(inputs, {"eq": {"_zi": np.array([0.5])}}) != chunk_key(
+        inputs, {"eq": {"_zi": np.array([0.6])}}
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ChunkCache(tmp, max_bytes=10_000)
+        for i in range(10):
+            cache.put(f"k{i}", bytes(2000), {})
+        assert cache.stats()["bytes"] <= 10_000
+        assert cache.get("k9") is not None
+        assert cache.get("k0") is None
+
+
+def test_chunk_key_tracks_engine_and_preset_versions(monkeypatch):
+    """An engine upgrade or a re-pointed preset alias misses the cache."""
+    before = chunk_key({"tracks": []}, {})
+    monkeypatch.setattr(chunk_cache, "__version__", "0.0.0-test")
+    assert chunk_key({"tracks": []}, {}) != before
+    monkeypatch.undo()
+    monkeypatch.setitem(PRESET_ALIASES, "dialogue_clean", "dialogue_clean@v2")
+    assert chunk_key({"tracks": []}, {}) != before
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_cache_dir_is_private(monkeypatch):
+    """The default directory is per-user and 0o700; a directory others can write to is refused."""
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("XDG_CACHE_HOME", tmp)
+        cache = ChunkCache()
+        assert cache.root == default_cache_dir() and cache.root.startswith(tmp)
+        assert os.stat(cache.root).st_mode & 0o777 == 0o700
+
+        shared = os.path.join(tmp, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with pytest.raises(FileError):
+            ChunkCache(shared)
+        assert get_chunk_cache({"enabled": True, "dir": shared}) is None
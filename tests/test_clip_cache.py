@@ -0,0 +1,91 @@
+"""
+Tests for the processed-clip cache.
+"""
+import os
+import tempfile
+
+from audio_engine.dsp.eq_presets import PRESET_ALIASES
+from audio_engine.renderer import TimelineRenderer, clip_processor
+from audio_engine.renderer.clip_processor import ClipProcessor
+from audio_engine.utils.clip_cache import ProcessedClipCache
+
+
+def _render(write_tone, write_json, tmp: str, name: str, clip_cache=None) -> bytes:
+    step = os.path.join(tmp, "footstep.wav")
+    music = os.path.join(tmp, "music.wav")
+    if not os.path.exists(step):
+        write_tone(step, 0.5, 880.0)
+        write_tone(music, 4.0, 110.0)
+    timeline = {
+        "project": {"duration": 4},
+        "settings": {},
+        "tracks": [
+            {"id": "music", "role": "music", "clips": [{"file": music, "start": 0.0}]},
+            {
+                "id": "steps",
+                "role": "sfx",
+                "semantic_role": "movement",
+                "clips": [{"file": step, "start": 0.25 * i} for i in range(12)],
+            },
+        ],
+    }
+    timeline_path = write_json(os.path.join(tmp, f"{name}.json"), timeline)
+    output_path = os.path.join(tmp, f"{name}.wav")
+    renderer = TimelineRenderer(clip_processor=ClipProcessor(clip_cache=clip_cache)) if clip_cache else TimelineRenderer()
+    renderer.render(timeline_path, output_path)
+    with open(output_path, "rb") as f:
+        return f.read()
+
+
+def test_repeated_clips_processed_once(write_tone, write_json):
+    """Twelve triggers of one sound are processed once and the mix is unchanged."""
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = _render(write_tone, write_json, tmp, "reference")
+        cache = ProcessedClipCache(max_bytes=64 << 20)
+        assert _render(write_tone, write_json, tmp, "cached", clip_cache=cache) == reference
+        stats = cache.stats()
+        assert stats["misses"] == 2  # footstep + music
+        assert stats["hits"] == 11
+
+
+def test_disk_tier_serves_a_fresh_process(write_tone, write_json):
+    """A second cache on the same directory renders from disk without reprocessing."""
+    with tempfile.TemporaryDirectory() as tmp:
+        disk = os.path.join(tmp, "clips")
+        cache = ProcessedClipCache(max_bytes=64 << 20, disk_dir=disk)
+        first = _render(write_tone, write_json, tmp, "first", clip_cache=cache)
+        assert len(os.listdir(disk)) == 2
+
+        fresh = ProcessedClipCache(max_bytes=64 << 20, disk_dir=disk)
+        assert _render(write_tone, write_json, tmp, "second", clip_cache=fresh) == first
+        assert fresh.stats()["misses"] == 0
+
+
+def test_key_tracks_parameters_and_file(write_tone):
+    """Changing a processing parameter or the source file changes the key."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        write_tone(path, 0.1, 440.0)
+        clip = {"file": path, "start": 0.0}
+        key = ClipProcessor._processed_clip_key(clip, {}, 0.0, "sfx", "impact", None)
+
+        assert key == ClipProcessor._processed_clip_key(dict(clip, start=9.0), {}, 0.0, "sfx", "impact", None)
+        assert key != ClipProcessor._processed_clip_key(dict(clip, gain=-3), {}, 0.0, "sfx", "impact", None)
+        assert key != ClipProcessor._processed_clip_key(clip, {"scene_energy": 0.9}, 0.0, "sfx", "impact", None)
+
+        write_tone(path, 0.2, 440.0)
+        assert key != ClipProcessor._processed_clip_key(clip, {}, 0.0, "sfx", "impact", None)
+
+
+def test_key_tracks_engine_and_preset_versions(monkeypatch, write_tone):
+    """An engine upgrade or a re-pointed preset alias changes the key."""
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = {"file": write_tone(os.path.join(tmp, "a.wav"), 0.1, 440.0), "start": 0.0, "eq_preset": "music_bed"}
+        key = ClipProcessor._processed_clip_key(clip, {}, 0.0, "music", None, None)
+
+        monkeypatch.setattr(clip_processor, "__version__", "0.0.0-test")
+        assert key != ClipProcessor._processed_clip_key(clip, {}, 0.0, "music", None, None)
+        monkeypatch.undo()
+
+        monkeypatch.setitem(PRESET_ALIASES, "music_bed", "music_bed@v2")
+        assert key != ClipProcessor._processed_clip_key(clip, {}, 0.0, "music", None, None)
@@ -0,0 +1,191 @@
+"""
+Tests for the local render daemon and render progress/cancellation hooks.
+"""
+import asyncio
+import json
+import os
+import socket
+import stat
+import tempfile
+
+import pytest
+
+from audio_engine.daemon import CANCELLED, DONE, FAILED, MAX_REQUEST_BYTES, RenderDaemon
+from audio_engine.exceptions import FileError, RenderCancelled
+from audio_engine.renderer import TimelineRenderer
+
+
+SAMPLE_RATE = 44100
+
+
+def _timeline(write_tone, tmp: str, streaming: bool) -> dict:
+    clip = os.path.join(tmp, "clip.wav")
+    write_tone(clip, 1.0, 440.0, SAMPLE_RATE)
+    return {
+        "project": {"duration": 2},
+        "settings": {"streaming": {"enabled": streaming, "chunk_size_sec": 0.5}},
+        "tracks": [{"id": "m", "role": "music", "clips": [{"file": clip, "start": 0.0}]}],
+    }
+
+
+async def _http(port: int, method: str, path: str, payload=None, headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    if headers is None:
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+    headers = dict({"Host": "localhost", "Content-Length": str(len(body))}, **headers)
+    head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(f"{method} {path} HTTP/1.1\r\n{head}\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), content
+
+
+def test_streaming_progress_can_cancel(write_tone, write_json):
+    """Raising RenderCancelled from the progress callback stops a streaming render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline = write_json(os.path.join(tmp, "t.json"), _timeline(write_tone, tmp, streaming=True))
+        events = []
+
+        def progress(event):
+            events.append(event)
+            if len(events) == 2:
+                raise RenderCancelled("stop")
+
+        with pytest.raises(RenderCancelled):
+            TimelineRenderer().render_streaming(timeline, os.path.join(tmp, "out.wav"), progress=progress)
+        assert [e["stage"] for e in events] == ["chunk", "chunk"]
+        assert events[0]["position"] == pytest.approx(0.5)
+
+
+def test_daemon_http_job_lifecycle(write_tone, write_json):
+    """Submit over HTTP, follow progress events, and read the final status."""
+    async def scenario(tmp):
+        daemon = RenderDaemon(max_workers=1)
+        server = await daemon.serve_tcp("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            timeline = write_json(os.path.join(tmp, "t.json"), _timeline(write_tone, tmp, streaming=True))
+            status, content = await _http(port, "POST", "/jobs", {"timeline": timeline, "output": os.path.join(tmp, "o.wav")})
+            assert status == 202
+            job_id = json.loads(content)["id"]
+
+            status, content = await _http(port, "GET", f"/jobs/{job_id}/events")
+            events = [json.loads(line) for line in content.splitlines()]
+            assert [e["event"] for e in events].count("progress") == 4
+            assert events[-1] == {"event": "status", "status": DONE, "error": None}
+
+            status, content = await _http(port, "GET", f"/jobs/{job_id}")
+            assert json.loads(content)["status"] == DONE
+
+            status, content = await _http(port, "POST", "/jobs", {"timeline": os.path.join(tmp, "missing.json"), "output": "x.wav"})
+            missing_id = json.loads(content)["id"]
+            assert (await daemon.wait(missing_id)).status == FAILED
+
+            assert (await _http(port, "GET", "/jobs/nope"))[0] == 404
+        finally:
+            await daemon.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(tmp))
+
+
+def test_daemon_cancels_queued_job(write_tone, write_json):
+    """A job cancelled before it gets a worker never renders."""
+    async def scenario(tmp):
+        daemon = RenderDaemon(max_workers=1)
+        try:
+            timeline = write_json(os.path.join(tmp, "t.json"), _timeline(write_tone, tmp, streaming=False))
+            first = daemon.submit(timeline, os.path.join(tmp, "a.wav"))
+            second = daemon.submit(timeline, os.path.join(tmp, "b.wav"))
+            daemon.cancel(second.id)
+
+            assert (await daemon.wait(first.id)).status == DONE
+            assert (await daemon.wait(second.id)).status == CANCELLED
+            assert not os.path.exists(os.path.join(tmp, "b.wav"))
+            assert any(e.get("stage") == "track" for e in first.events)
+        finally:
+            await daemon.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(tmp))
+
+
+def test_daemon_bounds_event_history_and_finished_jobs(write_tone, write_json):
+    """Events are capped per job and finished jobs are pruned by count and TTL."""
+    async def scenario(tmp):
+        daemon = RenderDaemon(max_workers=1, max_events=3, max_finished_jobs=1)
+        try:
+            timeline = write_json(os.path.join(tmp, "t.json"), _timeline(write_tone, tmp, streaming=True))
+            first = daemon.submit(timeline, os.path.join(tmp, "a.wav"))
+            await daemon.wait(first.id)
+            assert len(first.events) == 3 and first.published > 3
+            assert first.progress["position"] == pytest.approx(2.0)
+            assert [e async for e in daemon.events(first.id)] == list(first.events)
+
+            second = daemon.submit(timeline, os.path.join(tmp, "b.wav"))
+            await daemon.wait(second.id)
+            assert list(daemon.jobs) == [second.id]
+
+            assert daemon.prune(now=second.finished_at + daemon.finished_job_ttl_sec) == [second.id]
+            assert daemon.jobs == {}
+        finally:
+            await daemon.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(tmp))
+
+
+def test_daemon_rejects_browser_and_oversized_requests():
+    """Cross-origin requests, non-JSON bodies and oversized bodies never reach the router."""
+    async def scenario():
+        daemon = RenderDaemon(max_workers=1)
+        server = await daemon.serve_tcp("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            payload = {"timeline": "t.json", "output": "o.wav"}
+            origin = {"Content-Type": "application/json", "Origin": "http://example.com"}
+            assert (await _http(port, "POST", "/jobs", payload, origin))[0] == 403
+            assert (await _http(port, "GET", "/jobs", headers={"Origin": "null"}))[0] == 403
+            assert (await _http(port, "POST", "/jobs", payload, {"Content-Type": "text/plain"}))[0] == 415
+            assert (await _http(port, "POST", "/jobs", payload, {}))[0] == 415
+            too_big = {"Content-Type": "application/json", "Content-Length": str(MAX_REQUEST_BYTES + 1)}
+            assert (await _http(port, "POST", "/jobs", None, too_big))[0] == 413
+            assert daemon.jobs == {}
+            assert (await _http(port, "GET", "/health"))[0] == 200
+        finally:
+            await daemon.close()
+
+    asyncio.run(scenario())
+
+
+def test_daemon_unix_socket_is_private_and_never_clobbers():
+    """The socket is 0600; only a stale socket is replaced, never a file or a live daemon."""
+    async def scenario(tmp):
+        path = os.path.join(tmp, "d.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        daemon = RenderDaemon(max_workers=1)
+        try:
+            await daemon.serve_unix(path)
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            with pytest.raises(FileError):
+                await RenderDaemon(max_workers=1).serve_unix(path)
+            assert os.path.exists(path)
+        finally:
+            await daemon.close()
+
+        regular = os.path.join(tmp, "notes.txt")
+        with open(regular, "w") as f:
+            f.write("keep me")
+        with pytest.raises(FileError):
+            await RenderDaemon(max_workers=1).serve_unix(regular)
+        with open(regular) as f:
+            assert f.read() == "keep me"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(tmp))
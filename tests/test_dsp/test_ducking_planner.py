@@ -0,0 +1,80 @@
+"""
+Unit tests for the shared ducking planner.
+"""
+import numpy as np
+from pydub import AudioSegment
+
+from audio_engine.dsp.ducking import DuckingPlanner, apply_envelope_ducking, apply_gain_curve_to_segment
+
+
+SAMPLE_RATE = 44100
+CFG = {
+    "enabled": True,
+    "mode": "audacity",
+    "duck_amount": -6,
+    "fade_down_ms": 200,
+    "fade_up_ms": 300,
+    "min_pause_ms": 100,
+    "onset_delay_ms": 50,
+    "rules": [
+        {"when": "voice", "duck": ["music", "sfx:ambience"]},
+        {"when": "sfx:impact", "duck": ["background"]},
+    ],
+}
+ROLE_RANGES = {"voice": [(1.0, 2.0), (2.05, 2.5), (4.0, 4.5)]}
+
+
+def _tone(seconds: float) -> AudioSegment:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = (0.3 * np.sin(2 * np.pi * 440 * t) * 32767).astype(np.int16)
+    return AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+
+def test_rules_compiled_once_per_config():
+    """Identical configs share a plan; rules without trigger ranges are dropped."""
+    planner = DuckingPlanner(ROLE_RANGES)
+    plan = planner.plan_for(CFG)
+    assert planner.plan_for(dict(CFG)) is plan
+    assert [rule.when for rule in plan.rules] == ["voice"]
+    # 2.0 and 2.05 merge under min_pause_ms
+    assert plan.rules[0].ranges.starts == [1.0, 4.0]
+
+
+def test_rule_matching_uses_duck_targets():
+    """A clip is ducked when its role (or sfx semantic role) is a duck target."""
+    plan = DuckingPlanner(ROLE_RANGES).plan_for(CFG)
+    assert len(plan.rules_for("music", None)) == 1
+    assert len(plan.rules_for("sfx", "ambience")) == 1
+    assert plan.rules_for("sfx", "impact") == []
+    assert plan.rules_for("voice", None) == []
+
+
+def test_gain_curve_matches_envelope_ducking():
+    """The shared curve reproduces apply_envelope_ducking for a whole clip."""
+    audio = _tone(6.0)
+    expected = apply_envelope_ducking(audio, 0.0, ROLE_RANGES["voice"], CFG)
+
+    plan = DuckingPlanner(ROLE_RANGES).plan_for(CFG)
+    gain = plan.gain_curve(plan.rules[0], 0.0, 6.0, SAMPLE_RATE)
+    actual = apply_gain_curve_to_segment(audio, gain)
+
+    for start_ms in range(0, 6000, 250):
+        a = expected[start_ms:start_ms + 250].rms
+        b = actual[start_ms:start_ms + 250].rms
+        assert abs(a - b) <= max(60, 0.05 * a), start_ms
+
+
+def test_curve_shared_across_slices_in_window():
+    """Slices of one window reuse the same curve and line up with it."""
+    plan = DuckingPlanner(ROLE_RANGES).plan_for(CFG)
+    rule = plan.rules[0]
+    curve = plan.gain_curve(rule, 1.0, 2.0, SAMPLE_RATE)
+    assert plan.gain_curve(rule, 1.0, 2.0, SAMPLE_RATE) is curve
+
+    whole = plan.gain_curve(rule, 0.0, 6.0, SAMPLE_RATE)
+    assert np.allclose(curve, whole[SAMPLE_RATE:2 * SAMPLE_RATE], atol=1e-4)
+
+    audio = _tone(0.5)
+    offset = int(0.25 * SAMPLE_RATE)
+    ducked = apply_gain_curve_to_segment(audio, curve, offset)
+    assert abs(ducked.dBFS - audio.dBFS - CFG["duck_amount"]) < 0.2
@@ -0,0 +1,75 @@
+"""
+Unit tests for the stateful scene tonal shaping cascade.
+"""
+import numpy as np
+from pydub import AudioSegment
+
+from audio_engine.dsp.eq import apply_scene_tonal_shaping
+from audio_engine.dsp.streaming_eq import SceneTonalShaper, compile_scene_tonal_sos
+
+
+SAMPLE_RATE = 44100
+
+
+def _noise_segment(seconds: float, channels: int = 2) -> AudioSegment:
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal((int(seconds * SAMPLE_RATE), channels)) * 0.1 * 32767).astype(np.int16)
+    return AudioSegment(
+        data=samples.tobytes(),
+        sample_width=2,
+        frame_rate=SAMPLE_RATE,
+        channels=channels,
+    )
+
+
+def test_compile_scene_tonal_sos_sections():
+    """Tilt and explicit shelves compile into one section each."""
+    sos = compile_scene_tonal_sos({"tilt": "warm", "high_shelf": -2, "low_shelf": 1}, SAMPLE_RATE)
+    assert sos is not None
+    assert sos.shape[1] == 6
+    assert sos.shape[0] >= 2
+
+    assert compile_scene_tonal_sos({}, SAMPLE_RATE) is None
+    assert compile_scene_tonal_sos({"high_shelf": 0.05}, SAMPLE_RATE) is None
+
+
+def test_chunked_matches_single_pass():
+    """Processing in chunks must equal one continuous pass (no boundary transients)."""
+    audio = _noise_segment(2.0)
+    scene_eq = {"tilt": "bright", "low_shelf": -2}
+
+    whole = SceneTonalShaper(scene_eq, SAMPLE_RATE).process_segment(audio)
+
+    shaper = SceneTonalShaper(scene_eq, SAMPLE_RATE)
+    pieces = AudioSegment.empty()
+    for start_ms in range(0, len(audio), 250):
+        pieces += shaper.process_segment(audio[start_ms:start_ms + 250])
+
+    assert pieces.raw_data == whole.raw_data
+
+
+def test_block_size_does_not_change_output():
+    """Block size is a memory knob only."""
+    audio = _noise_segment(1.0)
+    scene_eq = {"high_shelf": 3}
+
+    a = SceneTonalShaper(scene_eq, SAMPLE_RATE).process_segment(audio, block_sec=0.01)
+    b = SceneTonalShaper(scene_eq, SAMPLE_RATE).process_segment(audio, block_sec=10.0)
+    assert a.raw_data == b.raw_data
+
+
+def test_high_shelf_cut_reduces_high_frequencies():
+    """A high-shelf cut attenuates a tone well above the corner frequency."""
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    tone = (np.sin(2 * np.pi * 10000 * t) * 0.5 * 32767).astype(np.int16)
+    audio = AudioSegment(data=tone.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=1)
+
+    shaped = apply_scene_tonal_shaping(audio, {"high_shelf": -6})
+    assert shaped.rms < audio.rms * 0.7
+
+
+def test_empty_scene_eq_is_passthrough():
+    """No shaping requested returns the input untouched."""
+    audio = _noise_segment(0.5)
+    assert apply_scene_tonal_shaping(audio, {}) is audio
+    assert apply_scene_tonal_shaping(audio, {"tilt": "neutral"}).raw_data == audio.raw_data
@@ -0,0 +1,131 @@
+"""
+Tests for the stream writers: compressed output through a persistent encoder pipe, and chunked resampling.
+"""
+import os
+import sys
+import tempfile
+import wave
+
+import pytest
+from pydub import AudioSegment
+
+from audio_engine.exceptions import FileError
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.streaming.stream_writer import (
+    EncoderStreamWriter,
+    StreamWriter,
+    close_writers,
+    open_stream_writer,
+    resample,
+)
+
+
+SAMPLE_RATE = 22050
+
+# Stands in for ffmpeg: copies the PCM on stdin to the output path (the last argument)
+FAKE_ENCODER = """\
+import shutil, sys
+with open(sys.argv[-1], "wb") as out:
+    shutil.copyfileobj(sys.stdin.buffer, out)
+"""
+
+FAILING_ENCODER = """\
+import sys
+sys.stdin.buffer.read()
+sys.stderr.write("Unknown encoder 'nope'")
+sys.exit(1)
+"""
+
+
+def _write_script(tmp: str, name: str, source: str) -> str:
+    path = os.path.join(tmp, name)
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\n{source}")
+    os.chmod(path, 0o755)
+    return path
+
+
+def _timeline(write_tone, tmp: str) -> dict:
+    tone = write_tone(os.path.join(tmp, "tone.wav"), 2.0, 330.0)
+    return {
+        "project": {"duration": 2},
+        "settings": {
+            "streaming": {"enabled": True, "chunk_size_sec": 0.5, "sample_rate": SAMPLE_RATE, "channels": 1},
+        },
+        "tracks": [{"id": "music", "role": "music", "clips": [{"file": tone, "start": 0.0}]}],
+    }
+
+
+@pytest.mark.skipif(os.name == "nt", reason="needs an executable script as the encoder")
+def test_compressed_output_is_piped_to_one_encoder(monkeypatch, write_tone, write_json):
+    """A non-WAV output is streamed to the encoder as it renders, with the same samples as the WAV."""
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setattr(AudioSegment, "converter", _write_script(tmp, "encoder", FAKE_ENCODER))
+        timeline_path = write_json(os.path.join(tmp, "episode.json"), _timeline(write_tone, tmp))
+        renderer = TimelineRenderer()
+        for render in (renderer.render, renderer.render_streaming):
+            wav_path = os.path.join(tmp, "episode.wav")
+            encoded_path = os.path.join(tmp, "episode.pcm")
+            render(timeline_path, wav_path, force=True)
+            render(timeline_path, encoded_path, force=True)
+
+            with wave.open(wav_path, "rb") as wav:
+                expected = wav.readframes(wav.getnframes())
+            with open(encoded_path, "rb") as f:
+                assert f.read() == expected
+            assert not [name for name in os.listdir(tmp) if name.endswith(".tmp.wav")]
+
+        writer = open_stream_writer(os.path.join(tmp, "ep.mp3"), 48000, 2, 3, bitrate="128k")
+        assert isinstance(writer, EncoderStreamWriter)
+        command = writer.command()
+        assert command[command.index("-f") + 1] == "s32le"
+        assert command[-3:] == ["-f", "mp3", os.path.join(tmp, "ep.mp3")]
+        assert command[command.index("-b:a") + 1] == "128k"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="needs an executable script as the encoder")
+def test_encoder_failure_raises_file_error():
+    """An encoder that exits non-zero fails the write with its stderr in the error."""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = EncoderStreamWriter(
+            os.path.join(tmp, "ep.opus"), SAMPLE_RATE, 1, converter=_write_script(tmp, "encoder", FAILING_ENCODER)
+        )
+        writer.open()
+        with pytest.raises(FileError, match="Unknown encoder 'nope'"):
+            writer.write_segment(AudioSegment.silent(duration=500, frame_rate=SAMPLE_RATE))
+            writer.close()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="needs an executable script as the encoder")
+def test_failed_close_still_closes_other_writers():
+    """One encoder failing on close does not leave the other outputs' encoders running."""
+    with tempfile.TemporaryDirectory() as tmp:
+        failing = EncoderStreamWriter(
+            os.path.join(tmp, "a.opus"), SAMPLE_RATE, 1, converter=_write_script(tmp, "failing", FAILING_ENCODER)
+        )
+        working = EncoderStreamWriter(
+            os.path.join(tmp, "b.pcm"), SAMPLE_RATE, 1, converter=_write_script(tmp, "encoder", FAKE_ENCODER)
+        )
+        for writer in (failing, working):
+            writer.open()
+            writer.write_segment(AudioSegment.silent(duration=100, frame_rate=SAMPLE_RATE))
+
+        with pytest.raises(FileError, match="Unknown encoder 'nope'"):
+            close_writers([failing, working])
+        assert working._process is None
+        assert os.path.getsize(os.path.join(tmp, "b.pcm")) == int(0.1 * SAMPLE_RATE) * 2
+
+
+def test_chunked_resampling_matches_whole_file(write_tone):
+    """Writing chunks at another rate gives the frames of converting the whole input at once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        audio = AudioSegment.from_wav(write_tone(os.path.join(tmp, "tone.wav"), 3.0, 330.0))
+        writer = StreamWriter(os.path.join(tmp, "out.wav"), 48000, 1)
+        writer.open()
+        for start in range(0, int(audio.frame_count()), 11025):
+            writer.write_segment(audio.get_sample_slice(start, start + 11025))
+        writer.close()
+
+        with wave.open(os.path.join(tmp, "out.wav"), "rb") as wav:
+            assert wav.getnframes() == 3 * 48000
+            assert wav.readframes(wav.getnframes()) == resample(audio, 48000).raw_data
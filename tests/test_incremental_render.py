@@ -0,0 +1,109 @@
+"""
+Tests for incremental streaming re-renders.
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from audio_engine.dsp.eq_presets import PRESET_ALIASES
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.streaming import incremental
+from audio_engine.streaming.incremental import (
+    global_fingerprint,
+    load_manifest,
+    manifest_path_for,
+    plan_dirty_ranges,
+)
+
+
+SAMPLE_RATE = 22050
+
+
+def _timeline(write_noise, tmp: str, line_start: float, incremental) -> dict:
+    bed = os.path.join(tmp, "bed.wav")
+    line = os.path.join(tmp, "line.wav")
+    if not os.path.exists(bed):
+        write_noise(bed, 8.0, seed=1)
+        write_noise(line, 1.0, seed=2)
+    return {
+        "project": {"duration": 8},
+        "settings": {
+            "dialogue_compression": {"enabled": True},
+            "loudness": {"enabled": True, "target_lufs": -20},
+            "streaming": {
+                "enabled": True,
+                "chunk_size_sec": 0.5,
+                "sample_rate": SAMPLE_RATE,
+                "incremental": incremental,
+            },
+        },
+        "tracks": [
+            {"id": "music", "role": "music", "clips": [{"file": bed, "start": 0.0}]},
+            {"id": "voice", "role": "voice", "clips": [
+                {"file": line, "start": 1.0},
+                {"file": line, "start": line_start},
+            ]},
+        ],
+    }
+
+
+def _render(write_json, read_samples, tmp: str, timeline: dict, name: str) -> np.ndarray:
+    timeline_path = write_json(os.path.join(tmp, f"{name}.json"), timeline)
+    output_path = os.path.join(tmp, f"{name}.wav")
+    TimelineRenderer().render_streaming(timeline_path, output_path)
+    return read_samples(output_path).astype(np.int32)
+
+
+def test_plan_dirty_ranges_adds_tail_and_warmup():
+    """Changed chunks dirty a state tail after them and get a warm-up before them."""
+    previous = list("abcdefghij")
+    current = list("abcXefghiY")
+    assert plan_dirty_ranges(previous, current, tail_chunks=2, warmup_chunks=2) == [(1, 3, 6), (7, 9, 10)]
+    # A gap shorter than the warm-up is merged into one range
+    assert plan_dirty_ranges(previous, current, tail_chunks=2, warmup_chunks=4) == [(0, 3, 10)]
+    assert plan_dirty_ranges(previous, previous, 2, 2) == []
+    assert plan_dirty_ranges(previous[:5], current, 0, 0) == [(3, 3, 4), (5, 5, 10)]
+
+
+def test_global_fingerprint_tracks_engine_and_preset_versions(monkeypatch):
+    """An engine upgrade or a re-pointed preset alias re-renders every chunk."""
+    before = global_fingerprint({"streaming": {"max_workers": 2}}, 10.0, 2.0, 44100, 2, 2)
+    assert global_fingerprint({"streaming": {"max_workers": 4}}, 10.0, 2.0, 44100, 2, 2) == before
+
+    monkeypatch.setattr(incremental, "__version__", "0.0.0-test")
+    assert global_fingerprint({"streaming": {"max_workers": 2}}, 10.0, 2.0, 44100, 2, 2) != before
+    monkeypatch.undo()
+
+    monkeypatch.setitem(PRESET_ALIASES, "music_bed", "music_bed@v2")
+    assert global_fingerprint({"streaming": {"max_workers": 2}}, 10.0, 2.0, 44100, 2, 2) != before
+
+
+def test_incremental_rerender_matches_full_render(write_noise, write_json, read_samples):
+    """Moving one line re-renders only its neighbourhood; output matches a full render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        incremental = {"enabled": True, "state_tail_sec": 8.0}
+        _render(write_json, read_samples, tmp, _timeline(write_noise, tmp, 5.0, incremental), "episode")
+        manifest = load_manifest(manifest_path_for(os.path.join(tmp, "episode.wav")))
+        assert len(manifest["chunks"]) == 16
+
+        edited = _render(write_json, read_samples, tmp, _timeline(write_noise, tmp, 5.5, incremental), "episode")
+        updated = load_manifest(manifest_path_for(os.path.join(tmp, "episode.wav")))
+        changed = [i for i, (a, b) in enumerate(zip(manifest["chunks"], updated["chunks"])) if a != b]
+        assert changed and changed[0] == 10
+
+        full = _render(write_json, read_samples, tmp, _timeline(write_noise, tmp, 5.5, False), "full")
+        assert np.array_equal(edited, full)
+        assert not any(n.endswith(".tmp.wav") for n in os.listdir(tmp))
+
+
+def test_unchanged_timeline_reuses_every_chunk(write_noise, write_json, read_samples):
+    """A second render of the same timeline leaves the pre-master mix untouched."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline = _timeline(write_noise, tmp, 5.0, True)
+        first = _render(write_json, read_samples, tmp, timeline, "episode")
+        premix = os.path.join(tmp, "episode.wav.premix.wav")
+        mtime = os.stat(premix).st_mtime_ns
+        second = _render(write_json, read_samples, tmp, timeline, "episode")
+        assert os.stat(premix).st_mtime_ns == mtime
+        assert np.array_equal(first, second)
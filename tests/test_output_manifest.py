@@ -0,0 +1,83 @@
+"""
+Tests for output manifests and skipping up-to-date renders.
+"""
+import os
+import tempfile
+import time
+
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.renderer.output_manifest import output_manifest_path
+
+
+def _timeline(tmp: str, streaming: bool = False, gain: float = 0.0) -> dict:
+    line = os.path.join(tmp, "line.wav")
+    return {
+        "project": {"duration": 2},
+        "settings": {"streaming": {"enabled": streaming}},
+        "tracks": [{"id": "dialogue", "role": "dialogue", "clips": [{"file": line, "start": 0.5, "gain": gain}]}],
+    }
+
+
+def _rendered(render, timeline_path: str, output_path: str, **kwargs) -> bool:
+    """Run a render and report whether it wrote the output."""
+    before = os.stat(output_path).st_mtime_ns if os.path.exists(output_path) else None
+    time.sleep(0.01)
+    render(timeline_path, output_path, **kwargs)
+    return os.stat(output_path).st_mtime_ns != before
+
+
+def test_unchanged_render_is_skipped(write_tone, write_json):
+    """A second render is skipped, also after a touch; force renders anyway."""
+    for streaming in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_tone(os.path.join(tmp, "line.wav"), 1.0, 440.0)
+            timeline_path = write_json(os.path.join(tmp, "episode.json"), _timeline(tmp, streaming))
+            output_path = os.path.join(tmp, "out.wav")
+            renderer = TimelineRenderer()
+            render = renderer.render_streaming if streaming else renderer.render
+
+            assert _rendered(render, timeline_path, output_path)
+            assert os.path.exists(output_manifest_path(output_path))
+            assert not _rendered(render, timeline_path, output_path)
+
+            os.utime(os.path.join(tmp, "line.wav"))
+            os.utime(timeline_path)
+            assert not _rendered(render, timeline_path, output_path)
+
+            assert _rendered(render, timeline_path, output_path, force=True)
+
+
+def test_changes_invalidate_the_output(write_tone, write_json):
+    """Editing the timeline, an asset or the output itself triggers a render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_tone(os.path.join(tmp, "line.wav"), 1.0, 440.0)
+        timeline_path = write_json(os.path.join(tmp, "episode.json"), _timeline(tmp))
+        output_path = os.path.join(tmp, "out.wav")
+        renderer = TimelineRenderer()
+        assert _rendered(renderer.render, timeline_path, output_path)
+
+        write_json(timeline_path, _timeline(tmp, gain=-3.0))
+        assert _rendered(renderer.render, timeline_path, output_path)
+
+        write_tone(os.path.join(tmp, "line.wav"), 1.0, 660.0)
+        assert _rendered(renderer.render, timeline_path, output_path)
+
+        with open(output_path, "ab") as f:
+            f.write(b"\0\0")
+        assert _rendered(renderer.render, timeline_path, output_path)
+
+        os.remove(output_path)
+        renderer.render(timeline_path, output_path)
+        assert os.path.exists(output_path)
+
+
+def test_render_path_is_part_of_the_manifest(write_tone, write_json):
+    """Switching between full-memory and streaming renders the output again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_tone(os.path.join(tmp, "line.wav"), 1.0, 440.0)
+        timeline_path = write_json(os.path.join(tmp, "episode.json"), _timeline(tmp))
+        output_path = os.path.join(tmp, "out.wav")
+        renderer = TimelineRenderer()
+        assert _rendered(renderer.render, timeline_path, output_path)
+        assert _rendered(renderer.render_streaming, timeline_path, output_path)
+        assert not _rendered(renderer.render_streaming, timeline_path, output_path)
@@ -0,0 +1,124 @@
+"""
+Tests for extra outputs (formats and loudness variants) from one render.
+"""
+import os
+import tempfile
+import wave
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from audio_engine.dsp.loudness import measure_integrated_lufs
+from audio_engine.exceptions import TimelineError
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.renderer.outputs import output_specs
+
+
+SAMPLE_RATE = 22050
+
+OUTPUTS = [
+    {"name": "broadcast", "sample_rate": 48000, "bit_depth": 24, "target_lufs": -23},
+    {"name": "podcast", "target_lufs": -16, "peak_dbfs": -1.0},
+    {"name": "quiet", "bit_depth": 16, "peak_dbfs": -30.0},
+]
+
+
+def _timeline(write_tone, tmp: str, streaming: bool, outputs=OUTPUTS) -> dict:
+    write_tone(os.path.join(tmp, "bed.wav"), 3.0, 220.0)
+    return {
+        "project": {"duration": 3},
+        "settings": {
+            "loudness": {"enabled": True, "target_lufs": -26},
+            "outputs": outputs,
+            "streaming": {"enabled": streaming, "chunk_size_sec": 0.5, "sample_rate": SAMPLE_RATE, "channels": 1},
+        },
+        "tracks": [{"id": "music", "role": "music", "clips": [{"file": os.path.join(tmp, "bed.wav"), "start": 0.0}]}],
+    }
+
+
+def _format(path: str):
+    with wave.open(path, "rb") as wav:
+        return wav.getframerate(), wav.getsampwidth(), wav.getnchannels()
+
+
+def _samples_24(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as wav:
+        raw = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.uint8).reshape(-1, 3)
+    return raw[:, 0].astype(np.int32) | raw[:, 1].astype(np.int32) << 8 | raw[:, 2].astype(np.int8).astype(np.int32) << 16
+
+
+def _boundary_and_interior_steps(samples: np.ndarray, chunk_frames: int, skip_frames: int):
+    """Largest sample-to-sample step near chunk boundaries, and away from them (after `skip_frames`)."""
+    steps = np.abs(np.diff(samples))
+    near = np.zeros(len(steps), dtype=bool)
+    for boundary in range(chunk_frames, len(steps), chunk_frames):
+        near[boundary - 4:boundary + 4] = True
+    interior = ~near
+    interior[:skip_frames] = False
+    return steps[near].max(), steps[interior].max()
+
+
+def test_outputs_from_one_render(write_tone, write_json):
+    """Each output gets its own format, loudness target and peak ceiling, on both render paths."""
+    measured = {}
+    for streaming in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            renderer = TimelineRenderer()
+            render = renderer.render_streaming if streaming else renderer.render
+            output_path = os.path.join(tmp, "episode.wav")
+            render(write_json(os.path.join(tmp, "episode.json"), _timeline(write_tone, tmp, streaming)), output_path)
+
+            paths = {name: os.path.join(tmp, f"episode.{name}.wav") for name in ("broadcast", "podcast", "quiet")}
+            assert _format(paths["broadcast"]) == (48000, 3, 1)
+            assert _format(paths["podcast"])[1:] == _format(output_path)[1:]
+
+            # Resampled chunk by chunk, the broadcast output keeps every frame and has no steps at chunk boundaries
+            broadcast = _samples_24(paths["broadcast"])
+            assert len(broadcast) == 3 * 48000
+            boundary_step, interior_step = _boundary_and_interior_steps(broadcast, 24000, 2400)
+            assert boundary_step <= interior_step * 1.1
+
+            audio = {name: AudioSegment.from_wav(path) for name, path in paths.items()}
+            audio["main"] = AudioSegment.from_wav(output_path)
+            lufs = {name: measure_integrated_lufs(segment) for name, segment in audio.items()}
+            assert lufs["broadcast"] == pytest.approx(-23.0, abs=0.5)
+            assert lufs["main"] < lufs["podcast"]
+            assert audio["podcast"].max_dBFS <= -1.0 + 0.05
+            assert audio["quiet"].max_dBFS <= -30.0 + 0.05
+            measured[streaming] = lufs
+
+    # "quiet" is set by its ceiling, so it follows each path's own peak
+    for name in ("main", "broadcast", "podcast"):
+        assert measured[True][name] == pytest.approx(measured[False][name], abs=0.5)
+
+
+def test_output_specs():
+    """Output paths default next to the main output; bad bit depths and collisions are rejected."""
+    specs = output_specs(OUTPUTS, "out/ep01.wav")
+    assert [spec.path for spec in specs] == ["out/ep01.broadcast.wav", "out/ep01.podcast.wav", "out/ep01.quiet.wav"]
+    assert specs[0].sample_width == 3
+    assert output_specs([{"name": "mp3", "format": "MP3"}], "ep01.wav")[0].path == "ep01.mp3.mp3"
+
+    with pytest.raises(TimelineError):
+        output_specs([{"name": "bad", "bit_depth": 12}], "ep01.wav")
+    with pytest.raises(TimelineError):
+        output_specs([{"name": "same", "path": "ep01.wav"}], "ep01.wav")
+
+
+def test_single_pass_main_output_ignores_extra_outputs(write_tone, write_json, read_samples):
+    """With two_pass_lufs off, declaring outputs leaves the main output on the rolling estimate."""
+    with tempfile.TemporaryDirectory() as tmp:
+        main = {}
+        for name, outputs in (("plain", []), ("fanned", OUTPUTS)):
+            timeline = _timeline(write_tone, tmp, True, outputs)
+            timeline["settings"]["streaming"]["two_pass_lufs"] = False
+            TimelineRenderer().render_streaming(
+                write_json(os.path.join(tmp, f"{name}.json"), timeline), os.path.join(tmp, f"{name}.wav")
+            )
+            main[name] = read_samples(os.path.join(tmp, f"{name}.wav"))
+
+        assert len(main["plain"]) == len(main["fanned"])
+        # Same per-chunk gains; only the pre-master's rounding differs
+        assert np.abs(main["plain"].astype(np.int32) - main["fanned"].astype(np.int32)).max() <= 2
+        assert os.path.exists(os.path.join(tmp, "fanned.podcast.wav"))
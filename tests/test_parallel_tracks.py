@@ -0,0 +1,72 @@
+"""
+Tests for process-pool track rendering in TimelineRenderer.render.
+"""
+import os
+import tempfile
+
+import pytest
+from pydub import AudioSegment
+
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.renderer.parallel_tracks import (
+    render_track_to_shared_memory,
+    take_shared_track_buffer,
+)
+
+
+SAMPLE_RATE = 44100
+
+
+def _timeline(write_tone, tmp: str, ducking_mode: str, parallel: bool) -> dict:
+    tracks = []
+    for i, role in enumerate(["voice", "music", "sfx", "ambience"]):
+        path = os.path.join(tmp, f"{i}.wav")
+        if not os.path.exists(path):
+            write_tone(path, 2.0, 220.0 * (i + 1), SAMPLE_RATE)
+        tracks.append({"id": f"t{i}", "role": role, "clips": [{"file": path, "start": 0.5 * i}]})
+
+    return {
+        "project": {"duration": 4},
+        "settings": {
+            "ducking": {
+                "enabled": True,
+                "mode": ducking_mode,
+                "rules": [{"when": "voice", "duck": ["music"]}],
+            },
+            "parallel_tracks": {"enabled": parallel, "max_workers": 2},
+        },
+        "tracks": tracks,
+    }
+
+
+@pytest.mark.parametrize("ducking_mode", ["audacity", "sidechain"])
+def test_parallel_render_matches_serial(ducking_mode, write_tone, write_json):
+    """Rendering tracks in worker processes produces the same file as a serial render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = []
+        for parallel in (False, True):
+            timeline_path = write_json(
+                os.path.join(tmp, f"timeline_{parallel}.json"), _timeline(write_tone, tmp, ducking_mode, parallel)
+            )
+            output_path = os.path.join(tmp, f"out_{parallel}.wav")
+            TimelineRenderer().render(timeline_path, output_path)
+            with open(output_path, "rb") as f:
+                outputs.append(f.read())
+
+        assert outputs[0] == outputs[1]
+
+
+def test_shared_track_buffer_round_trip(write_tone):
+    """A worker's track PCM is handed back intact and the block is freed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        write_tone(path, 1.0, 440.0, SAMPLE_RATE)
+        track = {"id": "t", "role": "music", "clips": [{"file": path, "start": 0.0}]}
+
+        handle = render_track_to_shared_memory(track, 2.0, None, None, None)
+        buffer = take_shared_track_buffer(handle)
+
+        assert isinstance(buffer, AudioSegment)
+        assert len(buffer.raw_data) == handle.nbytes
+        assert abs(len(buffer) - 2000) <= 1
+        assert not os.path.exists(os.path.join("/dev/shm", handle.name.lstrip("/")))
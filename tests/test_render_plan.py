@@ -0,0 +1,119 @@
+"""
+Tests for the compiled render-plan cache.
+"""
+import json
+import os
+import pickle
+import tempfile
+
+import pytest
+
+from audio_engine.exceptions import FileError
+from audio_engine.renderer import TimelineRenderer, render_plan
+from audio_engine.renderer.render_plan import RenderPlan, RenderPlanCache, get_render_plan_cache, render_plan_key
+
+
+def _timeline(write_tone, tmp: str, streaming: bool = False) -> dict:
+    bed = write_tone(os.path.join(tmp, "bed.wav"), 1.5, 110.0)
+    line = write_tone(os.path.join(tmp, "line.wav"), 1.0, 440.0)
+    return {
+        "project": {"duration": 4},
+        "settings": {
+            "ducking": {"enabled": True, "duck_amount": -8},
+            "plan_cache": {"enabled": True, "dir": os.path.join(tmp, "plans")},
+            "streaming": {"enabled": streaming, "chunk_size_sec": 1.0},
+        },
+        "tracks": [
+            {"id": "music", "role": "music", "clips": []},
+            {"id": "dialogue", "role": "dialogue", "clips": [{"file": line, "start": 1.0}]},
+        ],
+        "scenes": [
+            {"id": "s1", "start": 0.0, "duration": 4.0, "energy": 0.6,
+             "tracks": {"music": [{"file": bed, "loop": True}]}},
+        ],
+    }
+
+
+def _render(timeline_path: str, output_path: str, streaming: bool) -> bytes:
+    renderer = TimelineRenderer()
+    if streaming:
+        renderer.render_streaming(timeline_path, output_path)
+    else:
+        renderer.render(timeline_path, output_path)
+    with open(output_path, "rb") as f:
+        return f.read()
+
+
+def test_cached_plan_renders_identically(write_tone, write_json):
+    """A second render of an unchanged timeline loads its plan and produces the same output."""
+    for streaming in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            timeline_path = write_json(os.path.join(tmp, "episode.json"), _timeline(write_tone, tmp, streaming))
+            cache = get_render_plan_cache({"enabled": True, "dir": os.path.join(tmp, "plans")})
+
+            first = _render(timeline_path, os.path.join(tmp, "first.wav"), streaming)
+            assert cache.stats() == {"hits": 0, "misses": 1}
+            second = _render(timeline_path, os.path.join(tmp, "second.wav"), streaming)
+            assert cache.stats() == {"hits": 1, "misses": 1}
+            assert first == second
+
+
+def test_plan_key_follows_timeline_and_assets(write_tone, write_json):
+    """Editing the timeline or replacing one of its files compiles a new plan."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline_path = write_json(os.path.join(tmp, "episode.json"), _timeline(write_tone, tmp))
+        renderer = TimelineRenderer()
+        renderer.prepare(timeline_path)
+        renderer.prepare(timeline_path)
+        plan_dir = os.path.join(tmp, "plans")
+        assert len(os.listdir(plan_dir)) == 1
+
+        write_tone(os.path.join(tmp, "line.wav"), 1.2, 440.0)
+        plan = renderer.prepare(timeline_path)
+        assert len(os.listdir(plan_dir)) == 2
+        assert plan.durations[os.path.join(tmp, "line.wav")] == 1.2
+
+        with open(timeline_path) as f:
+            timeline = json.load(f)
+        timeline["tracks"][1]["clips"][0]["start"] = 2.0
+        with open(timeline_path, "w") as f:
+            json.dump(timeline, f)
+        renderer.prepare(timeline_path)
+        assert len(os.listdir(plan_dir)) == 3
+
+
+def test_cache_keeps_most_recent_plans():
+    """Plans beyond max_plans are evicted oldest first."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RenderPlanCache(tmp, max_plans=2)
+        for i in range(3):
+            cache.put(f"plan{i}", RenderPlan(timeline={"i": i}))
+            os.utime(os.path.join(tmp, f"plan{i}.plan"), ns=(i * 10**9, i * 10**9))
+            cache._evict()
+        assert sorted(os.listdir(tmp)) == ["plan1.plan", "plan2.plan"]
+        assert cache.get("plan2").timeline == {"i": 2}
+
+
+def test_stale_plans_and_shared_dirs_are_refused(monkeypatch):
+    """Plans missing fields are misses, keys follow the engine version, and shared dirs are refused."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RenderPlanCache(os.path.join(tmp, "plans"))
+        stale = RenderPlan(timeline={})
+        del stale.scheduler
+        with open(os.path.join(cache.root, "old.plan"), "wb") as f:
+            pickle.dump(stale, f)
+        with open(os.path.join(cache.root, "other.plan"), "wb") as f:
+            pickle.dump({"timeline": {}}, f)
+        assert cache.get("old") is None and cache.get("other") is None
+
+        key = render_plan_key({"tracks": []}, False)
+        monkeypatch.setattr(render_plan, "__version__", "0.0.0-test")
+        assert render_plan_key({"tracks": []}, False) != key
+
+        if hasattr(os, "getuid"):
+            shared = os.path.join(tmp, "shared")
+            os.mkdir(shared)
+            os.chmod(shared, 0o777)
+            with pytest.raises(FileError):
+                RenderPlanCache(shared)
+            assert get_render_plan_cache({"enabled": True, "dir": shared}) is None
@@ -0,0 +1,69 @@
+"""
+Tests for scene preprocessing and shared scene rules.
+"""
+import pickle
+
+import pytest
+
+from audio_engine.scene_preprocessor import SceneRules, preprocess_scenes
+
+
+def _timeline():
+    return {
+        "settings": {"ducking": {"enabled": True, "duck_amount": -6}},
+        "tracks": [{"id": "music", "role": "music", "clips": []}],
+        "scenes": [
+            {
+                "start": 0,
+                "duration": 10,
+                "energy": 0.8,
+                "rules": {"ducking": {"duck_amount": -18}},
+                "tracks": {
+                    "music": [
+                        {"file": "a.wav", "offset": 0},
+                        {"file": "b.wav", "offset": 5, "rules": {"ducking": {"fade_up_ms": 100}}},
+                    ]
+                },
+            },
+            {
+                "start": 10,
+                "duration": 10,
+                "energy": 0.2,
+                "tracks": {"music": [{"file": "c.wav", "offset": 0}]},
+            },
+        ],
+    }
+
+
+def test_clips_share_scene_rules():
+    """Clips of one scene reference a single rules object."""
+    clips = preprocess_scenes(_timeline())["tracks"][0]["clips"]
+    a, b, c = clips
+
+    assert isinstance(a["_rules"], SceneRules)
+    assert a["_rules"]["ducking"]["duck_amount"] == -18
+    assert a["_rules"]["scene_energy"] == 0.8
+    assert c["_rules"]["prev_scene_energy"] == 0.8
+    assert c["_rules"]["ducking"]["duck_amount"] == -6
+    assert a["_rules"] is not c["_rules"]
+
+    with pytest.raises(TypeError):
+        a["_rules"]["scene_energy"] = 0.0
+
+
+def test_clip_overrides_are_deltas():
+    """Clip-level rules layer over the scene rules without copying them."""
+    clips = preprocess_scenes(_timeline())["tracks"][0]["clips"]
+    a, b = clips[0], clips[1]
+
+    assert b["_rules"]["ducking"] == {"enabled": True, "duck_amount": -18, "fade_up_ms": 100}
+    assert b["_rules"]["scene_energy"] == 0.8
+    assert b["_rules"].maps[1] is a["_rules"]
+    assert "fade_up_ms" not in a["_rules"]["ducking"]
+
+
+def test_scene_rules_pickle():
+    """Compiled rules survive pickling (process-pool workers)."""
+    rules = SceneRules({"scene_energy": 0.5, "ducking": {"duck_amount": -6}})
+    clone = pickle.loads(pickle.dumps(rules))
+    assert dict(clone) == dict(rules)
@@ -0,0 +1,69 @@
+"""
+Tests for time-sharded streaming renders.
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.streaming.sharded import chunk_windows, plan_shards
+
+
+SAMPLE_RATE = 44100
+
+
+def _timeline(write_noise, tmp: str, streaming: dict) -> dict:
+    tracks = []
+    for i, role in enumerate(["voice", "music"]):
+        path = os.path.join(tmp, f"{i}.wav")
+        if not os.path.exists(path):
+            write_noise(path, 2.0, seed=i, sample_rate=SAMPLE_RATE)
+        tracks.append({"id": f"t{i}", "role": role, "clips": [{"file": path, "start": 0.0}]})
+
+    return {
+        "project": {"duration": 2},
+        "settings": {
+            "eq": {"tilt": "warm"},
+            "dialogue_compression": {"enabled": True},
+            "streaming": dict({"enabled": True, "chunk_size_sec": 0.25}, **streaming),
+        },
+        "tracks": tracks,
+    }
+
+
+def _render(write_json, read_samples, tmp: str, timeline: dict, name: str) -> np.ndarray:
+    timeline_path = write_json(os.path.join(tmp, f"{name}.json"), timeline)
+    output_path = os.path.join(tmp, f"{name}.wav")
+    TimelineRenderer().render_streaming(timeline_path, output_path)
+
+    assert not any(n.endswith(".tmp.wav") for n in os.listdir(tmp))
+    return read_samples(output_path).astype(np.int32)
+
+
+def test_plan_shards_covers_grid():
+    """Shards are contiguous, cover every chunk once and warm up on the grid."""
+    windows = list(chunk_windows(10.0, 1.0))
+    shards = plan_shards(windows, num_shards=3, chunk_size_sec=1.0, warmup_sec=1.5)
+
+    assert [(start, end) for _, start, end in shards] == [(0, 4), (4, 8), (8, 10)]
+    assert [warmup_from for warmup_from, _, _ in shards] == [0, 2, 6]
+
+
+def test_full_warmup_matches_continuous_render(write_noise, write_json, read_samples):
+    """With warm-up back to the start, every shard reproduces the continuous state."""
+    with tempfile.TemporaryDirectory() as tmp:
+        continuous = _render(write_json, read_samples, tmp, _timeline(write_noise, tmp, {}), "continuous")
+        sharded_timeline = _timeline(write_noise, tmp, {"shards": 3, "shard_warmup_sec": 10.0})
+        sharded = _render(write_json, read_samples, tmp, sharded_timeline, "sharded")
+        assert np.array_equal(continuous, sharded)
+
+
+def test_short_warmup_converges(write_noise, write_json, read_samples):
+    """A short pre-roll lets filter and compressor state converge before each shard."""
+    with tempfile.TemporaryDirectory() as tmp:
+        continuous = _render(write_json, read_samples, tmp, _timeline(write_noise, tmp, {}), "continuous")
+        sharded_timeline = _timeline(write_noise, tmp, {"shards": 4, "shard_warmup_sec": 0.5})
+        sharded = _render(write_json, read_samples, tmp, sharded_timeline, "sharded")
+        assert continuous.shape == sharded.shape
+        assert np.max(np.abs(continuous - sharded)) <= 0.01 * 32767
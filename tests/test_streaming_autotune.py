@@ -0,0 +1,92 @@
+"""
+Tests for streaming chunk size and worker auto-tuning.
+"""
+import os
+import tempfile
+import time
+import wave
+
+from audio_engine.config import RenderConfig
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.streaming.autotune import (
+    calibrate_chunk_sizes,
+    fitting_chunk_sizes,
+    pick_fastest,
+    pick_worker_count,
+    tune_streaming,
+)
+from audio_engine.streaming.chunk_processor import ChunkProcessor
+from audio_engine.streaming.clip_scheduler import ClipScheduler
+
+
+def _timeline(write_tone, tmp: str, streaming: dict) -> dict:
+    tracks = []
+    for i in range(3):
+        path = os.path.join(tmp, f"{i}.wav")
+        write_tone(path, 2.0, 220.0)
+        # Tracks 0 and 1 overlap; track 2 plays alone afterwards
+        tracks.append({"id": f"t{i}", "clips": [{"file": path, "start": [0.0, 1.0, 3.5][i]}]})
+    return {
+        "project": {"duration": 6},
+        "settings": {"streaming": dict({"enabled": True, "sample_rate": 22050}, **streaming)},
+        "tracks": tracks,
+    }
+
+
+def test_auto_settings_parse():
+    """`auto` values set the auto flags and keep numeric fallbacks."""
+    config = RenderConfig.from_timeline_settings(
+        {"streaming": {"chunk_size_sec": "auto", "max_workers": "auto", "auto_memory_mb": 64}}
+    )
+    assert config.streaming_auto_chunk_size and config.streaming_auto_workers
+    assert config.chunk_size_sec == 1.0 and config.streaming_max_workers == 4
+    assert config.streaming_auto_memory_mb == 64
+
+    fixed = RenderConfig.from_timeline_settings({"streaming": {"chunk_size_sec": 2}})
+    assert not fixed.streaming_auto_chunk_size and fixed.chunk_size_sec == 2.0
+
+
+def test_selection_rules():
+    """Memory budget caps the candidates, ties prefer smaller chunks, workers follow tracks."""
+    assert fitting_chunk_sizes((0.5, 1.0, 2.0, 4.0), 10, 44100, 2, 50 << 20) == [0.5, 1.0, 2.0]
+    assert fitting_chunk_sizes((0.5, 1.0), 500, 44100, 2, 1) == [0.5]
+    assert pick_fastest({0.5: 0.30, 1.0: 0.20, 2.0: 0.195}) == 1.0
+    assert pick_worker_count(2, cpu_count=8) == 2
+    assert pick_worker_count(12, cpu_count=8) == 8
+    assert pick_worker_count(0, cpu_count=8) == 1
+
+
+def test_tune_streaming_calibrates_and_renders(write_tone, write_json):
+    """Auto-tuning calibrates on the timeline and the render still completes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline = _timeline(write_tone, tmp, {"chunk_size_sec": "auto", "max_workers": "auto", "calibration_sec": 2})
+        config = RenderConfig.from_timeline_settings(timeline["settings"])
+        tuning = tune_streaming(timeline, ClipScheduler(timeline), config)
+        assert tuning.peak_tracks == 2
+        assert tuning.max_workers == pick_worker_count(2)
+        assert set(tuning.timings) == {0.5, 1.0, 2.0, 4.0}
+        assert tuning.chunk_size_sec in tuning.timings
+
+        timeline_path = write_json(os.path.join(tmp, "timeline.json"), timeline)
+        output_path = os.path.join(tmp, "out.wav")
+        TimelineRenderer().render_streaming(timeline_path, output_path)
+        with wave.open(output_path, "rb") as wav:
+            assert abs(wav.getnframes() - 6 * 22050) <= 1
+
+
+def test_calibration_warms_up_before_timing(monkeypatch, write_tone):
+    """A slow first chunk is paid by the warm-up pass, not charged to the first candidate."""
+    calls = []
+
+    def process_chunk(self, **kwargs):
+        calls.append(kwargs["chunk_end"] - kwargs["chunk_start"])
+        time.sleep(0.3 if len(calls) == 1 else 0.001)
+
+    monkeypatch.setattr(ChunkProcessor, "process_chunk", process_chunk)
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline = _timeline(write_tone, tmp, {})
+        timings = calibrate_chunk_sizes(timeline, (0.5, 1.0, 2.0), 2.0, 1, 22050, 2, 2, rounds=2)
+    assert set(timings) == {0.5, 1.0, 2.0}
+    # Warm-up (4 chunks) + two rounds of 4 + 2 + 1 chunks
+    assert len(calls) == 4 + 2 * 7
+    assert max(timings.values()) < 0.1
@@ -0,0 +1,93 @@
+"""
+Tests for the staged streaming pipeline and the persistent chunk worker pool.
+"""
+import os
+import tempfile
+import threading
+
+import pytest
+
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.streaming.chunk_processor import ChunkProcessor
+from audio_engine.streaming.pipeline import run_pipeline
+
+
+SAMPLE_RATE = 44100
+
+
+def test_pipeline_preserves_order():
+    """Items come out in source order after every stage."""
+    result = list(run_pipeline(range(50), [lambda x: x * 2, lambda x: x + 1]))
+    assert result == [x * 2 + 1 for x in range(50)]
+
+
+def test_pipeline_stages_overlap():
+    """A later stage works on item n while an earlier stage works on item n+1."""
+    first_started = threading.Event()
+    second_item_seen = threading.Event()
+
+    def stage_a(x):
+        if x == 1:
+            second_item_seen.set()
+        return x
+
+    def stage_b(x):
+        if x == 0:
+            first_started.set()
+            # Only returns if stage_a reaches item 1 while this stage holds item 0
+            assert second_item_seen.wait(timeout=5)
+        return x
+
+    assert list(run_pipeline(range(3), [stage_a, stage_b])) == [0, 1, 2]
+
+
+def test_pipeline_propagates_errors():
+    """A stage failure is re-raised in the consumer and the threads stop."""
+    def boom(x):
+        if x == 3:
+            raise ValueError("bad chunk")
+        return x
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        list(run_pipeline(range(100), [boom]))
+
+
+def test_chunk_processor_reuses_pool():
+    """The worker pool is created once and recreated only after close()."""
+    processor = ChunkProcessor(max_workers=2)
+    first = processor._get_executor()
+    assert processor._get_executor() is first
+    processor.close()
+    assert processor._executor is None
+    with processor:
+        assert processor._get_executor() is not first
+
+
+def test_streaming_pipeline_matches_sequential(write_tone, write_json):
+    """Pipelined streaming output is identical to stage-by-stage rendering."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tracks = []
+        for i, role in enumerate(["voice", "music", "sfx"]):
+            path = os.path.join(tmp, f"{i}.wav")
+            write_tone(path, 2.0, 220.0 * (i + 1), SAMPLE_RATE)
+            tracks.append({"id": f"t{i}", "role": role, "clips": [{"file": path, "start": 0.5 * i}]})
+
+        outputs = []
+        for pipeline in (False, True):
+            timeline = {
+                "project": {"duration": 3},
+                "settings": {
+                    "eq": {"tilt": "warm"},
+                    "dialogue_compression": {"enabled": True},
+                    "ducking": {"enabled": True, "rules": [{"when": "voice", "duck": ["music"]}]},
+                    "streaming": {"enabled": True, "chunk_size_sec": 0.25, "pipeline": pipeline},
+                },
+                "tracks": tracks,
+            }
+            timeline_path = write_json(os.path.join(tmp, f"timeline_{pipeline}.json"), timeline)
+            output_path = os.path.join(tmp, f"out_{pipeline}.wav")
+            TimelineRenderer().render_streaming(timeline_path, output_path)
+            with open(output_path, "rb") as f:
+                outputs.append(f.read())
+
+        assert outputs[0] == outputs[1]
@@ -0,0 +1,123 @@
+"""
+Tests for clips sourced from nested timelines.
+"""
+import os
+import tempfile
+
+import pytest
+
+from audio_engine.dsp.eq_presets import PRESET_ALIASES
+from audio_engine.exceptions import FileError, TimelineError
+from audio_engine.renderer import TimelineRenderer, sub_timelines
+from audio_engine.renderer.sub_timelines import default_sub_timeline_dir, resolve_sub_timelines, sub_timeline_key
+
+
+def _sting(write_tone, tmp: str) -> dict:
+    bed = write_tone(os.path.join(tmp, "bed.wav"), 2.0, 110.0)
+    hit = write_tone(os.path.join(tmp, "hit.wav"), 0.5, 880.0)
+    return {
+        "project": {"duration": 2},
+        "settings": {},
+        "tracks": [
+            {"id": "bed", "role": "music", "clips": [{"file": bed, "start": 0.0}]},
+            {"id": "hit", "role": "sfx", "semantic_role": "impact", "clips": [{"file": hit, "start": 0.5}]},
+        ],
+    }
+
+
+def _episode(write_tone, tmp: str, source: str) -> dict:
+    line = os.path.join(tmp, "line.wav")
+    if not os.path.exists(line):
+        write_tone(line, 1.0, 440.0)
+    return {
+        "project": {"duration": 4},
+        "settings": {"sub_timelines": {"dir": os.path.join(tmp, "sub")}},
+        "tracks": [
+            {
+                "id": "sting",
+                "role": "music",
+                "clips": [{"file": source, "start": 0.5, "gain": -3, "fade_in": 0.2}],
+            },
+            {"id": "dialogue", "role": "dialogue", "clips": [{"file": line, "start": 2.5}]},
+        ],
+    }
+
+
+def _render(timeline_path: str) -> bytes:
+    output_path = timeline_path.replace(".json", ".wav")
+    TimelineRenderer().render(timeline_path, output_path)
+    with open(output_path, "rb") as f:
+        return f.read()
+
+
+def test_sub_timeline_clip_matches_prerendered_asset(write_tone, write_json):
+    """A clip sourced from a timeline mixes exactly like a clip of that timeline's render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        sting = write_json(os.path.join(tmp, "sting.json"), _sting(write_tone, tmp))
+        nested = _render(write_json(os.path.join(tmp, "nested.json"), _episode(write_tone, tmp, sting)))
+
+        prerendered = os.path.join(tmp, "sting.wav")
+        TimelineRenderer().render(sting, prerendered)
+        assert nested == _render(write_json(os.path.join(tmp, "flat.json"), _episode(write_tone, tmp, prerendered)))
+
+
+def test_sub_timeline_rendered_once_until_it_changes(write_tone, write_json):
+    """Episodes sharing a sting reuse its render; editing one of its files renders it again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        sting = write_json(os.path.join(tmp, "sting.json"), _sting(write_tone, tmp))
+        sub_dir = os.path.join(tmp, "sub")
+        _render(write_json(os.path.join(tmp, "ep1.json"), _episode(write_tone, tmp, sting)))
+        first = os.listdir(sub_dir)
+        mtime = os.stat(os.path.join(sub_dir, first[0])).st_mtime_ns
+
+        _render(write_json(os.path.join(tmp, "ep2.json"), _episode(write_tone, tmp, sting)))
+        assert os.listdir(sub_dir) == first
+        assert os.stat(os.path.join(sub_dir, first[0])).st_mtime_ns == mtime
+
+        write_tone(os.path.join(tmp, "hit.wav"), 0.5, 660.0)
+        _render(write_json(os.path.join(tmp, "ep3.json"), _episode(write_tone, tmp, sting)))
+        assert len(os.listdir(sub_dir)) == 2
+
+
+def test_sub_timeline_cycle_is_an_error(write_json):
+    """A timeline that includes itself fails instead of recursing."""
+    with tempfile.TemporaryDirectory() as tmp:
+        loop = os.path.join(tmp, "loop.json")
+        write_json(loop, {
+            "project": {"duration": 2},
+            "settings": {"sub_timelines": {"dir": os.path.join(tmp, "sub")}},
+            "tracks": [{"id": "self", "role": "music", "clips": [{"file": loop, "start": 0.0}]}],
+        })
+        with pytest.raises(TimelineError):
+            TimelineRenderer().render(loop, os.path.join(tmp, "loop.wav"))
+
+
+def test_sub_timeline_key_tracks_engine_and_preset_versions(monkeypatch):
+    """An engine upgrade or a re-pointed preset alias re-renders the sub-timeline."""
+    timeline = {"project": {"duration": 1}, "tracks": []}
+    key = sub_timeline_key(timeline)
+
+    monkeypatch.setattr(sub_timelines, "__version__", "0.0.0-test")
+    assert key != sub_timeline_key(timeline)
+    monkeypatch.undo()
+
+    monkeypatch.setitem(PRESET_ALIASES, "sfx_punch", "sfx_punch@v2")
+    assert key != sub_timeline_key(timeline)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_sub_timeline_cache_is_private(monkeypatch, write_tone, write_json):
+    """Renders go to a per-user 0o700 directory; a directory others can write to is refused."""
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("XDG_CACHE_HOME", os.path.join(tmp, "cache"))
+        sting = write_json(os.path.join(tmp, "sting.json"), _sting(write_tone, tmp))
+        timeline = {"tracks": [{"id": "sting", "clips": [{"file": sting, "start": 0.0}]}]}
+        resolve_sub_timelines(timeline)
+        assert os.path.dirname(timeline["tracks"][0]["clips"][0]["file"]) == default_sub_timeline_dir()
+        assert os.stat(default_sub_timeline_dir()).st_mode & 0o777 == 0o700
+
+        shared = os.path.join(tmp, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with pytest.raises(FileError):
+            resolve_sub_timelines({"tracks": [{"id": "sting", "clips": [{"file": sting, "start": 0.0}]}]}, shared)
@@ -0,0 +1,145 @@
+"""
+Tests for track freeze (stems reused between renders).
+"""
+import os
+import tempfile
+
+from pydub import AudioSegment
+
+from audio_engine.dsp.eq_presets import PRESET_ALIASES
+from audio_engine.renderer import TimelineRenderer
+from audio_engine.renderer.clip_processor import ClipProcessor
+from audio_engine.renderer.track_mixer import TrackMixer
+from audio_engine.utils import stem_cache
+from audio_engine.utils.stem_cache import stem_dir_for, track_stem_key
+
+
+def _timeline(write_tone, tmp: str, line_start: float, freeze_cfg=None, music_frozen=False) -> dict:
+    music = os.path.join(tmp, "music.wav")
+    line = os.path.join(tmp, "line.wav")
+    if not os.path.exists(music):
+        write_tone(music, 4.0, 110.0)
+        write_tone(line, 1.0, 440.0)
+    music_track = {"id": "music", "role": "music", "clips": [{"file": music, "start": 0.0}]}
+    if music_frozen:
+        music_track["freeze"] = True
+    return {
+        "project": {"duration": 4},
+        "settings": {"track_freeze": freeze_cfg} if freeze_cfg else {},
+        "tracks": [
+            music_track,
+            {"id": "dialogue", "role": "dialogue", "clips": [{"file": line, "start": line_start}]},
+        ],
+    }
+
+
+def _render(write_json, tmp: str, name: str, timeline: dict, output_name: str = None) -> bytes:
+    timeline_path = write_json(os.path.join(tmp, f"{name}.json"), timeline)
+    output_path = os.path.join(tmp, f"{output_name or name}.wav")
+    TimelineRenderer().render(timeline_path, output_path)
+    with open(output_path, "rb") as f:
+        return f.read()
+
+
+def _stem_mtimes(stem_dir: str) -> dict:
+    return {name: os.stat(os.path.join(stem_dir, name)).st_mtime_ns for name in os.listdir(stem_dir)}
+
+
+def test_unchanged_track_reuses_its_stem(write_tone, write_json):
+    """After a dialogue edit only the dialogue track is re-rendered, and the mix matches a full render."""
+    with tempfile.TemporaryDirectory() as tmp:
+        freeze = {"enabled": True}
+        _render(write_json, tmp, "first", _timeline(write_tone, tmp, 0.5, freeze), output_name="out")
+        stem_dir = stem_dir_for(os.path.join(tmp, "out.wav"))
+        before = _stem_mtimes(stem_dir)
+        assert len(before) == 4  # PCM + metadata per track
+
+        edited = _render(write_json, tmp, "edited", _timeline(write_tone, tmp, 2.0, freeze), output_name="out")
+        after = _stem_mtimes(stem_dir)
+        music_files = [name for name in before if name.startswith("music")]
+        dialogue_files = [name for name in before if name.startswith("dialogue")]
+        assert all(after[name] == before[name] for name in music_files)
+        assert any(after[name] != before[name] for name in dialogue_files)
+
+        assert edited == _render(write_json, tmp, "reference", _timeline(write_tone, tmp, 2.0))
+
+
+def test_frozen_track_ignores_source_changes(write_tone, write_json):
+    """A track marked freeze keeps its stored stem after its source file is replaced."""
+    with tempfile.TemporaryDirectory() as tmp:
+        frozen_timeline = _timeline(write_tone, tmp, 0.5, music_frozen=True)
+        first = _render(write_json, tmp, "first", frozen_timeline, output_name="out")
+        write_tone(os.path.join(tmp, "music.wav"), 4.0, 220.0)
+
+        frozen = _render(write_json, tmp, "frozen", frozen_timeline, output_name="out")
+        assert frozen == first
+
+        thawed_timeline = _timeline(write_tone, tmp, 0.5, {"enabled": True})
+        thawed = _render(write_json, tmp, "thawed", thawed_timeline, output_name="out")
+        assert thawed != first
+
+
+def test_stem_key_tracks_settings_and_files(write_tone):
+    """The key changes with track settings and source files, but not with the freeze flag."""
+    with tempfile.TemporaryDirectory() as tmp:
+        track = _timeline(write_tone, tmp, 0.5)["tracks"][0]
+        key = track_stem_key(track, 4.0)
+
+        assert key == track_stem_key(dict(track, freeze=True), 4.0)
+        assert key != track_stem_key(dict(track, gain=-3), 4.0)
+        assert key != track_stem_key(track, 5.0)
+        ducking = {"mode": "audacity", "duck_amount": -6, "rules": [{"when": "dialogue", "duck": ["music"]}]}
+        assert key != track_stem_key(track, 4.0, role_ranges={"dialogue": [(0.5, 1.5)]}, default_ducking=ducking)
+
+        write_tone(os.path.join(tmp, "music.wav"), 3.0, 110.0)
+        assert key != track_stem_key(track, 4.0)
+
+
+def test_stem_key_tracks_engine_and_preset_versions(monkeypatch, write_tone):
+    """An engine upgrade or a re-pointed preset alias re-renders the stem."""
+    with tempfile.TemporaryDirectory() as tmp:
+        track = _timeline(write_tone, tmp, 0.5)["tracks"][0]
+        key = track_stem_key(track, 4.0)
+
+        monkeypatch.setattr(stem_cache, "__version__", "0.0.0-test")
+        assert key != track_stem_key(track, 4.0)
+        monkeypatch.undo()
+
+        monkeypatch.setitem(PRESET_ALIASES, "music_full", "music_full@v2")
+        assert key != track_stem_key(track, 4.0)
+
+
+def test_stem_key_only_tracks_ranges_that_duck_it():
+    """Moving a dialogue line changes the keys of tracks ducked under dialogue, not the others."""
+    ducking = {"mode": "audacity", "duck_amount": -6, "rules": [{"when": "dialogue", "duck": ["music", "sfx:riser"]}]}
+    before = {"dialogue": [(1.0, 2.0)], "sfx": [(3.0, 3.5)]}
+    after = {"dialogue": [(1.5, 2.5)], "sfx": [(3.0, 3.5)]}
+    tracks = {
+        "music": ({"id": "music", "role": "music", "clips": []}, True),
+        "riser": ({"id": "riser", "role": "sfx", "semantic_role": "riser", "clips": []}, True),
+        "impact": ({"id": "impact", "role": "sfx", "semantic_role": "impact", "clips": []}, False),
+        "ambience": ({"id": "ambience", "role": "ambience", "clips": []}, False),
+        "voice": ({"id": "voice", "role": "dialogue", "clips": []}, False),
+    }
+    for name, (track, ducked) in tracks.items():
+        track["clips"] = [{"file": f"{name}.wav", "start": 0.0}]
+        changed = track_stem_key(track, 4.0, before, ducking) != track_stem_key(track, 4.0, after, ducking)
+        assert changed == ducked, name
+
+
+class _LegacyTrackMixer(TrackMixer):
+    """A mixer written against process_track before it took a stem cache."""
+
+    def process_track(self, track, project_duration, role_ranges=None, default_ducking=None, default_compression=None):
+        return super().process_track(track, project_duration, role_ranges, default_ducking, default_compression)
+
+
+def test_injected_mixer_renders_without_stems(write_tone, write_json):
+    """A custom track mixer without the stem_cache parameter still renders, and no stems are stored."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline_path = write_json(os.path.join(tmp, "custom.json"), _timeline(write_tone, tmp, 1.0, {"enabled": True}))
+        output_path = os.path.join(tmp, "custom.wav")
+        clip_processor = ClipProcessor()
+        TimelineRenderer(clip_processor, _LegacyTrackMixer(clip_processor)).render(timeline_path, output_path)
+        assert AudioSegment.from_wav(output_path).max_dBFS > -60
+        assert not os.path.exists(stem_dir_for(output_path))
@@ -0,0 +1,89 @@
+"""
+Unit tests for header-only duration probing and the pre-flight steps using it.
+"""
+import os
+import tempfile
+import wave
+
+import numpy as np
+import pytest
+
+from audio_engine.autofix import auto_fix_overlaps
+from audio_engine.utils.metadata import MetadataProvider, probe_duration
+from audio_engine.validation import ValidationError, validate_timeline
+
+
+SAMPLE_RATE = 44100
+
+
+def _write_wav(path: str, seconds: float) -> None:
+    samples = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+
+
+def test_probe_wav_header_duration():
+    """WAV durations come from the header."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        _write_wav(path, 1.5)
+        assert abs(probe_duration(path) - 1.5) < 1e-6
+
+
+def test_provider_caches_and_prefetches():
+    """Prefetch fills the cache; missing files resolve to None."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(4):
+            path = os.path.join(tmp, f"{i}.wav")
+            _write_wav(path, 0.25 * (i + 1))
+            paths.append(path)
+
+        provider = MetadataProvider(max_workers=4)
+        provider.prefetch(paths + [os.path.join(tmp, "missing.wav")])
+        assert len(provider._cache) == 4
+        assert abs(provider.duration(paths[3]) - 1.0) < 1e-6
+        assert provider.duration(os.path.join(tmp, "missing.wav")) is None
+
+
+def test_auto_fix_overlaps_uses_probed_durations():
+    """Overlapping clips are pushed back by the probed duration plus the gap."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        _write_wav(path, 2.0)
+        track = {
+            "id": "t",
+            "clips": [
+                {"file": path, "start": 0.0},
+                {"file": path, "start": 1.0},
+            ],
+        }
+        auto_fix_overlaps(track, min_gap=0.5, metadata=MetadataProvider())
+        assert abs(track["clips"][1]["start"] - 2.5) < 1e-6
+
+
+def test_validate_timeline_reports_missing_file():
+    """A missing clip file is reported without decoding anything."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "a.wav")
+        _write_wav(path, 1.0)
+        timeline = {
+            "project": {"duration": 10.0},
+            "tracks": [
+                {
+                    "id": "t",
+                    "clips": [
+                        {"file": path, "start": 0.0},
+                        {"file": os.path.join(tmp, "missing.wav"), "start": 2.0},
+                    ],
+                }
+            ]
+        }
+        with pytest.raises(ValidationError, match="missing.wav"):
+            validate_timeline(timeline, metadata=MetadataProvider())
+
+        timeline["tracks"][0]["clips"].pop()
+        assert validate_timeline(timeline, metadata=MetadataProvider()) == []
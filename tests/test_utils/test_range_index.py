@@ -0,0 +1,39 @@
+"""
+Tests for RangeIndex prefix-sum coverage and overlap lookups.
+"""
+from audio_engine.utils.dialogue_density import compute_dialogue_density
+from audio_engine.utils.ranges import RangeIndex
+
+
+def test_range_index_coverage_matches_scan():
+    """Prefix-sum coverage equals a linear scan over the merged ranges."""
+    raw = [(5.0, 7.0), (0.0, 1.0), (0.5, 2.0), (10.0, 10.0), (12.0, 15.5)]
+    index = RangeIndex(raw)
+    assert index.ranges == [(0.0, 2.0), (5.0, 7.0), (12.0, 15.5)]
+    assert index.total == 7.5
+
+    for a, b in [(0, 20), (1, 6), (1.5, 1.6), (7, 12), (-5, 0.5), (14, 30)]:
+        expected = compute_dialogue_density(index.ranges, a, b) * (b - a)
+        assert abs(index.coverage(a, b) - expected) < 1e-9
+
+
+def test_range_index_overlapping():
+    """Overlap queries return only ranges touching the window."""
+    index = RangeIndex([(0.0, 1.0), (2.0, 3.0), (4.0, 5.0)])
+    assert index.overlapping(0.5, 2.5) == [(0.0, 1.0), (2.0, 3.0)]
+    assert index.overlapping(1.0, 2.0) == []
+    assert index.overlapping(10.0, 11.0) == []
+
+
+def test_dialogue_density_accepts_index():
+    """compute_dialogue_density gives the same answer for an index as for its ranges."""
+    ranges = [(0.0, 4.0), (6.0, 8.0)]
+    index = RangeIndex(ranges)
+    assert compute_dialogue_density(index, 0.0, 10.0) == compute_dialogue_density(ranges, 0.0, 10.0) == 0.6
+
+
+def test_sliding_density():
+    """Trailing-window density steps through the timeline."""
+    index = RangeIndex([(0.0, 5.0)])
+    values = index.sliding_density(window_sec=10.0, step_sec=5.0, end=20.0)
+    assert values == [(5.0, 1.0), (10.0, 0.5), (15.0, 0.0), (20.0, 0.0)]
@@ -0,0 +1,133 @@
+"""
+Tests for the memmapped shared asset store.
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pytest
+
+from audio_engine.exceptions import FileError
+from audio_engine.streaming import asset_store
+from audio_engine.streaming.asset_store import SharedAsset, SharedAssetStore, default_store_dir, get_asset_store
+from audio_engine.streaming.chunk_loader import ChunkLoader
+from audio_engine.streaming.chunk_processor import ChunkProcessor
+from audio_engine.streaming.clip_scheduler import ClipSlice
+
+
+def test_shared_chunks_match_direct_decode(write_noise):
+    """Chunks read through the store equal chunks decoded straight from the file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedAssetStore(os.path.join(tmp, "store"))
+        for channels in (1, 2):
+            path = os.path.join(tmp, f"src{channels}.wav")
+            write_noise(path, 2.0, seed=3, channels=channels, amplitude=0.2)
+            direct = ChunkLoader(path)
+            shared = ChunkLoader(path, asset_store=store)
+            for start, duration in [(0.0, 0.5), (0.37, 0.25), (1.8, 0.5), (2.5, 0.5)]:
+                expected, expected_meta = direct.get_chunk(start, duration, 22050, channels, 2)
+                samples, meta = shared.get_chunk(start, duration, 22050, channels, 2)
+                assert samples.shape == expected.shape
+                assert np.array_equal(samples, expected.astype(np.float32))
+                assert (meta.sample_rate, meta.channels) == (expected_meta.sample_rate, expected_meta.channels)
+            shared.close()
+
+
+def test_store_publishes_once_and_reuses_file(write_noise):
+    """A second store on the same directory maps the already published file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "src.wav")
+        write_noise(path, 1.0, seed=3, channels=1, amplitude=0.2)
+        root = os.path.join(tmp, "store")
+
+        first = SharedAssetStore(root).acquire(path, 22050, 1, 2)
+        published = os.listdir(root)
+        assert len(published) == 1 and published[0].endswith(".npy")
+        mtime = os.stat(first.npy_path).st_mtime_ns
+
+        other = SharedAssetStore(root)
+        second = other.acquire(path, 22050, 1, 2)
+        assert second.npy_path == first.npy_path
+        assert os.stat(second.npy_path).st_mtime_ns == mtime
+        assert other.acquire(path, 22050, 1, 2) is second
+        assert second.refs == 2
+
+
+def test_eviction_skips_mapped_files(write_noise):
+    """Over budget, only files no process has mapped are removed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "store")
+        store = SharedAssetStore(root, max_bytes=1)
+        paths = []
+        for i in range(2):
+            paths.append(os.path.join(tmp, f"src{i}.wav"))
+            write_noise(paths[-1], 0.5, seed=3, channels=1, amplitude=0.2)
+
+        held = store.acquire(paths[0], 22050, 1, 2)
+        released = store.acquire(paths[1], 22050, 1, 2)
+        store.release(released)
+        store.evict()
+
+        assert os.path.exists(held.npy_path)
+        assert not os.path.exists(released.npy_path)
+        store.release(held)
+        store.evict()
+        assert os.listdir(root) == []
+
+
+def test_concurrent_slices_share_one_mapping(write_noise):
+    """Two slices of one file decoded together acquire the mapping once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_noise(os.path.join(tmp, "src.wav"), 1.0, seed=3, channels=1, amplitude=0.2)
+        store = SharedAssetStore(os.path.join(tmp, "store"))
+        acquire = store.acquire
+
+        def slow_acquire(*args):
+            # Widen the window in which a second thread could also see no mapping
+            time.sleep(0.05)
+            return acquire(*args)
+
+        store.acquire = slow_acquire
+        processor = ChunkProcessor(max_workers=2, sample_rate=22050, channels=1, sample_width=2, asset_store=store)
+        slices = [ClipSlice("t", {}, path, start, 0.25, start) for start in (0.0, 0.5)]
+        decoded = processor._decode_active({"t": slices}, 0.0, 1.0)
+
+        assert all(audio is not None for _, audio in decoded.slices["t"])
+        assert [asset.refs for asset in store._open.values()] == [1]
+        processor.close()
+        assert store._open == {}
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="counts open file descriptors")
+def test_failed_mapping_closes_its_lock_fd(monkeypatch):
+    """A file evicted between the open and the load does not leak the lock descriptor."""
+    with tempfile.TemporaryDirectory() as tmp:
+        npy_path = os.path.join(tmp, "asset.npy")
+        np.save(npy_path, np.zeros((10, 1), dtype=np.float32))
+
+        def evicted(*args, **kwargs):
+            raise FileNotFoundError(npy_path)
+
+        monkeypatch.setattr(asset_store.np, "load", evicted)
+        before = len(os.listdir("/proc/self/fd"))
+        with pytest.raises(FileNotFoundError):
+            SharedAsset(npy_path, 22050, 2)
+        assert len(os.listdir("/proc/self/fd")) == before
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_store_dir_is_private(monkeypatch):
+    """The default store is per-user and 0o700; a directory others can write to is refused."""
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("XDG_CACHE_HOME", tmp)
+        store = SharedAssetStore()
+        assert store.root == default_store_dir() and store.root.startswith(tmp)
+        assert os.stat(store.root).st_mode & 0o777 == 0o700
+
+        shared = os.path.join(tmp, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with pytest.raises(FileError):
+            SharedAssetStore(shared)
+        assert get_asset_store({"enabled": True, "dir": shared}) is None
@@ -0,0 +1,91 @@
+"""
+Tests for multi-variant (per-language) renders.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from audio_engine.exceptions import TimelineError
+from audio_engine.renderer import TimelineRenderer
+
+
+def _timeline(write_tone, tmp: str) -> dict:
+    files = {"bed": (3.0, 110.0), "hit": (0.5, 880.0), "en": (0.8, 440.0), "de": (1.2, 330.0)}
+    for name, (seconds, freq) in files.items():
+        write_tone(os.path.join(tmp, f"{name}.wav"), seconds, freq)
+    return {
+        "project": {"duration": 3},
+        "settings": {
+            "ducking": {
+                "enabled": True, "mode": "audacity", "duck_amount": -10,
+                "fade_down_ms": 100, "fade_up_ms": 200, "min_pause_ms": 0,
+                "rules": [{"when": "voice", "duck": ["music"]}],
+            },
+        },
+        "tracks": [
+            {"id": "music", "role": "music", "clips": [{"file": os.path.join(tmp, "bed.wav"), "start": 0.0}]},
+            {"id": "sfx", "role": "sfx", "clips": [{"file": os.path.join(tmp, "hit.wav"), "start": 2.0}]},
+            {"id": "dialogue", "role": "voice", "clips": []},
+        ],
+        "variants": {
+            "en": {"tracks": {"dialogue": [{"file": os.path.join(tmp, "en.wav"), "start": 0.6}]}},
+            "de": {"tracks": {"dialogue": [{"file": os.path.join(tmp, "de.wav"), "start": 1.0}]}},
+        },
+    }
+
+
+def test_variant_matches_plain_render(write_tone, write_json, read_samples):
+    """Each variant sounds like a plain render of the timeline with its clips in place."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline = _timeline(write_tone, tmp)
+        timeline_path = write_json(os.path.join(tmp, "episode.json"), timeline)
+        outputs = TimelineRenderer().render_variants(timeline_path, os.path.join(tmp, "episode_{variant}.wav"))
+        assert sorted(outputs) == ["de", "en"]
+
+        for name, output_path in outputs.items():
+            plain = {key: value for key, value in timeline.items() if key != "variants"}
+            plain["tracks"] = [dict(track) for track in timeline["tracks"]]
+            plain["tracks"][2]["clips"] = timeline["variants"][name]["tracks"]["dialogue"]
+            reference_path = os.path.join(tmp, f"plain_{name}.wav")
+            TimelineRenderer().render(write_json(os.path.join(tmp, f"plain_{name}.json"), plain), reference_path)
+
+            variant = read_samples(output_path).astype(np.float64)
+            reference = read_samples(reference_path).astype(np.float64)
+            assert variant.shape == reference.shape
+            assert np.max(np.abs(variant - reference)) <= 0.002 * 32767
+
+
+def test_shared_tracks_are_processed_once(write_tone, write_json):
+    """Music and SFX clips are processed once for all variants; dialogue once per variant."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline_path = write_json(os.path.join(tmp, "episode.json"), _timeline(write_tone, tmp))
+        renderer = TimelineRenderer()
+        processed = []
+        process_clip = renderer.clip_processor.process_clip
+
+        def counting_process_clip(**kwargs):
+            processed.append(os.path.basename(kwargs["clip"]["file"]))
+            return process_clip(**kwargs)
+
+        renderer.clip_processor.process_clip = counting_process_clip
+        renderer.render_variants(timeline_path, os.path.join(tmp, "episode_{variant}.wav"))
+        assert sorted(processed) == ["bed.wav", "de.wav", "en.wav", "hit.wav"]
+
+        processed.clear()
+        renderer.render_variants(timeline_path, os.path.join(tmp, "episode_{variant}.wav"))
+        assert processed == []
+
+
+def test_output_template_needs_placeholder(write_tone, write_json):
+    """An output path without {variant} and a timeline without variants are rejected."""
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline = _timeline(write_tone, tmp)
+        timeline_path = write_json(os.path.join(tmp, "episode.json"), timeline)
+        with pytest.raises(TimelineError):
+            TimelineRenderer().render_variants(timeline_path, os.path.join(tmp, "episode.wav"))
+
+        timeline.pop("variants")
+        with pytest.raises(TimelineError):
+            TimelineRenderer().render_variants(write_json(timeline_path, timeline), os.path.join(tmp, "{variant}.wav"))